@@ -6,7 +6,7 @@ from fastapi import APIRouter
 from app.api.v1.endpoints import (
     auth, users, projects, phases, tasks, sprints, backlogs, bug_reports, time_logs, 
     dashboard, milestones, teams, reports, advanced_reports, task_dependencies, 
-    versions, tags, advanced_queries, planner, working_hours, time_off
+    versions, tags, advanced_queries, planner, working_hours, time_off, flow_metrics, exports
 )
 
 api_router = APIRouter()
@@ -25,6 +25,8 @@ api_router.include_router(milestones.router, prefix="/milestones", tags=["milest
 api_router.include_router(teams.router, prefix="/teams", tags=["teams"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(advanced_reports.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(flow_metrics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(task_dependencies.router, prefix="/dependencies", tags=["task-dependencies"])
 api_router.include_router(versions.router, prefix="/versions", tags=["versions"])
@@ -3,28 +3,51 @@ Advanced reporting endpoints with data export capabilities
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from sqlalchemy import func, text, select, literal, union_all
 from datetime import datetime, date, timedelta
-import io
-import csv
-import json
 
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
+from app.core.report_cache import cached_report
+from app.core.capacity import user_capacities
+from app.core.time_buckets import (
+    BUCKETS, CALENDARS, bucket_label, bucket_map, bucket_start, last_buckets_start
+)
+from app.core.export_stream import (
+    EXPORT_BATCH_ROWS, EXPORT_FORMATS, encode_records, encoded_chunks, gzip_chunks
+)
+from app.api.v1.endpoints.reports import (
+    get_accessible_projects, as_date, hours_to_minutes, time_log_type
+)
 from app.models.user import User
 from app.models.project import Project
 from app.models.task import Task
-from app.models.team import Team
+from app.models.sprint import Sprint
+from app.models.milestone import Milestone
+from app.models.phase import Phase
+from app.models.team import Team, team_members
 from app.models.time_log import TimeLog
 from app.models.completed_sp import CompletedStoryPoints
 from app.models.enums import UserRole, TaskStatus
 
 router = APIRouter()
 
+# Tables each cached analytics endpoint reads
+PRODUCTIVITY_TABLES = ("time_logs", "completed_story_points", "tasks", "projects", "teams", "team_members", "team_projects")
+BURNDOWN_TABLES = (
+    "tasks", "completed_story_points", "projects", "sprints", "milestones", "phases",
+    "teams", "team_members", "team_projects"
+)
+MAX_SERIES_DAYS = 3700
+WORKLOAD_TABLES = (
+    "time_logs", "tasks", "users", "teams", "team_members", "working_hours", "holidays", "time_off"
+)
+
 @router.get("/productivity-summary")
+@cached_report("analytics.productivity-summary", PRODUCTIVITY_TABLES, get_accessible_projects)
 def get_productivity_summary(
     period: str = Query("week", description="Period: day, week, month, quarter, year"),
     team_id: Optional[int] = Query(None, description="Filter by team"),
@@ -52,40 +75,25 @@ def get_productivity_summary(
         start_date = now - timedelta(days=7)  # Default to week
     
     # Get accessible projects
-    from app.api.v1.endpoints.reports import get_accessible_projects
     accessible_projects = get_accessible_projects(current_user, db)
-    
-    # Base queries
-    time_logs_query = db.query(TimeLog).join(Task).filter(
-        Task.project_id.in_(accessible_projects),
-        TimeLog.start_time >= start_date
-    )
-    
-    completed_sp_query = db.query(CompletedStoryPoints).filter(
-        CompletedStoryPoints.project_id.in_(accessible_projects),
-        CompletedStoryPoints.completed_at >= start_date
-    )
-    
-    # Apply filters
-    if team_id:
-        team_user_ids = db.query(User.id).join(Team.members).filter(Team.id == team_id).all()
-        user_ids = [uid[0] for uid in team_user_ids]
-        time_logs_query = time_logs_query.filter(TimeLog.user_id.in_(user_ids))
-        completed_sp_query = completed_sp_query.filter(CompletedStoryPoints.user_id.in_(user_ids))
-    
-    if project_id:
-        time_logs_query = time_logs_query.filter(Task.project_id == project_id)
-        completed_sp_query = completed_sp_query.filter(CompletedStoryPoints.project_id == project_id)
-    
-    # Execute queries
-    time_logs = time_logs_query.all()
-    completed_points = completed_sp_query.all()
+    time_log_filters, completed_filters = productivity_conditions(accessible_projects, team_id, project_id)
+    
+    # Aggregate in the database
+    time_totals = db.query(
+        func.coalesce(func.sum(TimeLog.hours), 0).label("hours"),
+        func.count(func.distinct(TimeLog.user_id)).label("users"),
+        func.count(func.distinct(Task.project_id)).label("projects")
+    ).join(Task, TimeLog.task_id == Task.id).filter(
+        *time_log_filters, TimeLog.date >= start_date
+    ).one()
+    total_story_points = db.query(
+        func.coalesce(func.sum(CompletedStoryPoints.story_points), 0)
+    ).filter(*completed_filters, CompletedStoryPoints.completed_at >= start_date).scalar()
     
     # Calculate metrics
-    total_hours = sum(log.duration_minutes or 0 for log in time_logs) / 60
-    total_story_points = sum(cp.story_points for cp in completed_points)
-    unique_users = len(set(log.user_id for log in time_logs))
-    unique_projects = len(set(log.task.project_id for log in time_logs if log.task))
+    total_hours = float(time_totals.hours)
+    unique_users = time_totals.users
+    unique_projects = time_totals.projects
     
     # Velocity calculation (story points per day)
     days_in_period = (now - start_date).days + 1
@@ -115,92 +123,138 @@ def get_productivity_summary(
         }
     }
 
-@router.get("/burndown-chart")
-def get_burndown_chart(
-    project_id: int = Query(..., description="Project ID for burndown chart"),
-    sprint_id: Optional[int] = Query(None, description="Optional sprint ID"),
+def productivity_conditions(accessible_projects: List[int], team_id: Optional[int], project_id: Optional[int]):
+    """Filters for time logs (joined to tasks) and completed story points"""
+    time_log_filters = [Task.project_id.in_(accessible_projects)]
+    completed_filters = [CompletedStoryPoints.project_id.in_(accessible_projects)]
+    if team_id:
+        team_user_ids = select(team_members.c.user_id).where(team_members.c.team_id == team_id)
+        time_log_filters.append(TimeLog.user_id.in_(team_user_ids))
+        completed_filters.append(CompletedStoryPoints.user_id.in_(team_user_ids))
+    if project_id:
+        time_log_filters.append(Task.project_id == project_id)
+        completed_filters.append(CompletedStoryPoints.project_id == project_id)
+    return time_log_filters, completed_filters
+
+@router.get("/productivity-series")
+@cached_report("analytics.productivity-series", PRODUCTIVITY_TABLES, get_accessible_projects)
+def get_productivity_series(
+    bucket: str = Query("week", description="Bucket size: day, week, month, quarter"),
+    calendar: str = Query("gregorian", description="Calendar for bucket boundaries: gregorian, jalali"),
+    periods: int = Query(12, ge=1, le=400, description="Number of buckets ending today (ignored with start_date)"),
+    start_date: Optional[date] = Query(None, description="Range start (default: derived from periods)"),
+    end_date: Optional[date] = Query(None, description="Range end (default: today)"),
+    team_id: Optional[int] = Query(None, description="Filter by team"),
+    project_id: Optional[int] = Query(None, description="Filter by project"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get burndown chart data for project or sprint"""
+    """Hours, completed story points and efficiency per calendar bucket
+    
+    One grouped query returns per-day totals for the whole range; the days
+    are then folded into buckets, so a year of months costs about the same
+    as a week of days.
+    """
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail="bucket must be one of: day, week, month, quarter")
+    if calendar not in CALENDARS:
+        raise HTTPException(status_code=400, detail="calendar must be one of: gregorian, jalali")
+    
+    end_date = end_date or date.today()
+    start_date = start_date or last_buckets_start(end_date, bucket, calendar, periods)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+    if (end_date - start_date).days > MAX_SERIES_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_SERIES_DAYS} days")
     
-    # Verify access to project
-    from app.api.v1.endpoints.reports import get_accessible_projects
     accessible_projects = get_accessible_projects(current_user, db)
+    time_log_filters, completed_filters = productivity_conditions(accessible_projects, team_id, project_id)
+    range_start = datetime.combine(start_date, datetime.min.time())
+    range_end = datetime.combine(end_date, datetime.max.time())
+    
+    hours_per_day = select(
+        func.date(TimeLog.date).label("day"),
+        TimeLog.hours.label("hours"),
+        literal(0).label("points")
+    ).join(Task, TimeLog.task_id == Task.id).where(
+        *time_log_filters, TimeLog.date.between(range_start, range_end)
+    )
+    points_per_day = select(
+        func.date(CompletedStoryPoints.completed_at).label("day"),
+        literal(0.0).label("hours"),
+        CompletedStoryPoints.story_points.label("points")
+    ).where(*completed_filters, CompletedStoryPoints.completed_at.between(range_start, range_end))
+    daily = union_all(hours_per_day, points_per_day).subquery()
+    rows = db.query(
+        daily.c.day, func.sum(daily.c.hours), func.sum(daily.c.points)
+    ).group_by(daily.c.day).all()
+    
+    buckets, day_index = bucket_map(start_date, end_date, bucket, calendar)
+    hours = [0.0] * len(buckets)
+    points = [0] * len(buckets)
+    for day, day_hours, day_points in rows:
+        position = day_index.get(as_date(day))
+        if position is not None:
+            hours[position] += day_hours or 0
+            points[position] += int(day_points or 0)
+    
+    series = []
+    for (first, last), bucket_hours, bucket_points in zip(buckets, hours, points):
+        days = (last - first).days + 1
+        series.append({
+            "label": bucket_label(bucket_start(first, bucket, calendar), bucket, calendar),
+            "start": first.isoformat(),
+            "end": last.isoformat(),
+            "hours": round(bucket_hours, 2),
+            "story_points": bucket_points,
+            "velocity_per_day": round(bucket_points / days, 2),
+            "efficiency_points_per_hour": round(bucket_points / bucket_hours, 2) if bucket_hours > 0 else 0
+        })
     
-    if project_id not in accessible_projects:
-        raise HTTPException(status_code=403, detail="Access denied to this project")
-    
-    # Get project
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Base query for tasks
-    tasks_query = db.query(Task).filter(Task.project_id == project_id)
-    if sprint_id:
-        tasks_query = tasks_query.filter(Task.sprint_id == sprint_id)
-    
-    tasks = tasks_query.all()
-    
-    # Calculate total story points
-    total_story_points = sum(task.story_points or 0 for task in tasks)
-    
-    # Get completion dates
-    completed_story_points = db.query(CompletedStoryPoints).filter(
-        CompletedStoryPoints.project_id == project_id
-    ).order_by(CompletedStoryPoints.completed_at).all()
-    
-    if sprint_id:
-        # Filter by sprint tasks
-        sprint_task_ids = [task.id for task in tasks]
-        completed_story_points = [
-            cp for cp in completed_story_points 
-            if cp.task_id in sprint_task_ids
-        ]
-    
-    # Generate burndown data
-    burndown_data = []
-    remaining_points = total_story_points
-    
-    # Group completions by date
-    completions_by_date = {}
-    for cp in completed_story_points:
-        date_key = cp.completed_at.date()
-        if date_key not in completions_by_date:
-            completions_by_date[date_key] = 0
-        completions_by_date[date_key] += cp.story_points
-    
-    # Calculate ideal burndown
-    start_date = min(task.created_at.date() for task in tasks) if tasks else date.today()
-    end_date = max(task.updated_at.date() for task in tasks) if tasks else date.today()
+    total_hours = sum(hours)
+    total_points = sum(points)
+    return {
+        "bucket": bucket,
+        "calendar": calendar,
+        "date_range": {"start": start_date.isoformat(), "end": end_date.isoformat()},
+        "series": series,
+        "totals": {
+            "hours": round(total_hours, 2),
+            "story_points": total_points,
+            "efficiency_points_per_hour": round(total_points / total_hours, 2) if total_hours > 0 else 0
+        },
+        "applied_filters": {
+            "team_id": team_id,
+            "project_id": project_id
+        }
+    }
+
+def burndown_series(start_date: date, end_date: date, total_story_points: int, completions_by_date: dict) -> dict:
+    """Burndown and burnup points for each day in one pass over the range"""
+    # Completions outside the range still count towards the totals
+    completed = sum(points for day, points in completions_by_date.items() if day < start_date)
+    if completions_by_date:
+        end_date = max(end_date, max(completions_by_date))
     total_days = (end_date - start_date).days + 1
     ideal_burn_rate = total_story_points / total_days if total_days > 0 else 0
     
-    # Generate daily burndown
+    burndown_data = []
     current_date = start_date
     while current_date <= end_date:
-        # Actual burndown
-        if current_date in completions_by_date:
-            remaining_points -= completions_by_date[current_date]
-        
-        # Ideal burndown
+        completed_today = completions_by_date.get(current_date, 0)
+        completed += completed_today
         days_passed = (current_date - start_date).days
-        ideal_remaining = total_story_points - (ideal_burn_rate * days_passed)
-        
         burndown_data.append({
             "date": current_date.isoformat(),
-            "actual_remaining": max(0, remaining_points),
-            "ideal_remaining": max(0, ideal_remaining),
-            "completed_today": completions_by_date.get(current_date, 0)
+            "actual_remaining": max(0, total_story_points - completed),
+            "ideal_remaining": max(0, total_story_points - (ideal_burn_rate * days_passed)),
+            "completed_today": completed_today,
+            "completed_total": completed,
+            "scope": total_story_points
         })
-        
         current_date += timedelta(days=1)
     
     return {
-        "project_id": project_id,
-        "sprint_id": sprint_id,
-        "project_name": project.name,
         "total_story_points": total_story_points,
         "burndown_data": burndown_data,
         "summary": {
@@ -208,97 +262,234 @@ def get_burndown_chart(
             "end_date": end_date.isoformat(),
             "total_days": total_days,
             "ideal_burn_rate": round(ideal_burn_rate, 2),
-            "current_remaining": max(0, remaining_points)
+            "current_remaining": max(0, total_story_points - completed)
         }
     }
 
+def completions_per_day(db: Session, conditions: list, group_column=None):
+    """Completed points per day (and per `group_column`) for tasks matching `conditions`"""
+    completed_day = func.date(CompletedStoryPoints.completed_at)
+    columns = [completed_day.label("day"), func.sum(CompletedStoryPoints.story_points).label("points")]
+    group_by = [completed_day]
+    if group_column is not None:
+        columns.insert(0, group_column.label("group_key"))
+        group_by.insert(0, group_column)
+    return db.query(*columns).select_from(CompletedStoryPoints).join(
+        Task, CompletedStoryPoints.task_id == Task.id
+    ).filter(*conditions).group_by(*group_by).all()
+
+@router.get("/burndown-chart")
+@cached_report("analytics.burndown-chart", BURNDOWN_TABLES, get_accessible_projects)
+def get_burndown_chart(
+    project_id: int = Query(..., description="Project ID for burndown chart"),
+    sprint_id: Optional[int] = Query(None, description="Optional sprint ID"),
+    milestone_id: Optional[int] = Query(None, description="Optional milestone ID (all of its sprints)"),
+    phase_id: Optional[int] = Query(None, description="Optional phase ID (all sprints of its milestones)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get burndown and burnup chart data for a project, sprint, milestone or phase"""
+    
+    # Verify access to project
+    accessible_projects = get_accessible_projects(current_user, db)
+    
+    if project_id not in accessible_projects:
+        raise HTTPException(status_code=403, detail="Access denied to this project")
+    
+    # Get project
+    project_name = db.query(Project.name).filter(Project.id == project_id).scalar()
+    if project_name is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Tasks in scope
+    conditions = [Task.project_id == project_id]
+    planned_start = planned_end = None
+    if sprint_id:
+        conditions.append(Task.sprint_id == sprint_id)
+        sprint = db.query(Sprint.start_date, Sprint.end_date).filter(
+            Sprint.id == sprint_id, Sprint.project_id == project_id
+        ).first()
+        if not sprint:
+            raise HTTPException(status_code=404, detail="Sprint not found")
+        planned_start, planned_end = as_date(sprint.start_date), as_date(sprint.end_date)
+    elif milestone_id:
+        conditions.append(Task.sprint_id.in_(select(Sprint.id).where(Sprint.milestone_id == milestone_id)))
+        due_date = db.query(Milestone.due_date).filter(
+            Milestone.id == milestone_id, Milestone.project_id == project_id
+        ).first()
+        if not due_date:
+            raise HTTPException(status_code=404, detail="Milestone not found")
+        planned_end = as_date(due_date[0])
+    elif phase_id:
+        conditions.append(Task.sprint_id.in_(
+            select(Sprint.id).join(Milestone, Sprint.milestone_id == Milestone.id).where(Milestone.phase_id == phase_id)
+        ))
+        phase = db.query(Phase.start_date, Phase.end_date).filter(
+            Phase.id == phase_id, Phase.project_id == project_id
+        ).first()
+        if not phase:
+            raise HTTPException(status_code=404, detail="Phase not found")
+        planned_start, planned_end = as_date(phase.start_date), as_date(phase.end_date)
+    
+    totals = db.query(
+        func.coalesce(func.sum(Task.story_points), 0).label("points"),
+        func.min(Task.created_at).label("first_created"),
+        func.max(Task.updated_at).label("last_updated")
+    ).filter(*conditions).one()
+    
+    completions_by_date = {
+        as_date(row.day): row.points for row in completions_per_day(db, conditions)
+    }
+    
+    start_date = planned_start or as_date(totals.first_created) or date.today()
+    end_date = planned_end or as_date(totals.last_updated) or date.today()
+    end_date = max(start_date, end_date)
+    
+    return {
+        "project_id": project_id,
+        "sprint_id": sprint_id,
+        "milestone_id": milestone_id,
+        "phase_id": phase_id,
+        "project_name": project_name,
+        **burndown_series(start_date, end_date, int(totals.points), completions_by_date)
+    }
+
+@router.get("/burndown-charts")
+@cached_report("analytics.burndown-charts", BURNDOWN_TABLES, get_accessible_projects)
+def get_sprint_burndown_charts(
+    sprint_ids: List[int] = Query(..., description="Sprint IDs, e.g. ?sprint_ids=1&sprint_ids=2"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Burndown and burnup charts for many sprints with a fixed number of queries"""
+    accessible_projects = get_accessible_projects(current_user, db)
+    sprints = db.query(
+        Sprint.id, Sprint.name, Sprint.project_id, Sprint.start_date, Sprint.end_date
+    ).filter(Sprint.id.in_(sprint_ids), Sprint.project_id.in_(accessible_projects)).order_by(Sprint.id).all()
+    found_ids = [sprint.id for sprint in sprints]
+    if not found_ids:
+        return {"charts": [], "missing_sprint_ids": sorted(set(sprint_ids))}
+    
+    conditions = [Task.sprint_id.in_(found_ids)]
+    totals = {
+        row.sprint_id: row for row in db.query(
+            Task.sprint_id,
+            func.coalesce(func.sum(Task.story_points), 0).label("points"),
+            func.min(Task.created_at).label("first_created"),
+            func.max(Task.updated_at).label("last_updated")
+        ).filter(*conditions).group_by(Task.sprint_id).all()
+    }
+    completions = {}
+    for row in completions_per_day(db, conditions, Task.sprint_id):
+        completions.setdefault(row.group_key, {})[as_date(row.day)] = row.points
+    
+    charts = []
+    for sprint in sprints:
+        total = totals.get(sprint.id)
+        start_date = as_date(sprint.start_date) or (as_date(total.first_created) if total else None) or date.today()
+        end_date = as_date(sprint.end_date) or (as_date(total.last_updated) if total else None) or date.today()
+        charts.append({
+            "sprint_id": sprint.id,
+            "sprint_name": sprint.name,
+            "project_id": sprint.project_id,
+            **burndown_series(
+                start_date, max(start_date, end_date), int(total.points) if total else 0,
+                completions.get(sprint.id, {})
+            )
+        })
+    
+    return {
+        "charts": charts,
+        "missing_sprint_ids": sorted(set(sprint_ids) - set(found_ids))
+    }
+
+TIME_LOG_EXPORT_COLUMNS = [
+    "date", "user", "project", "task", "duration_hours", "duration_minutes", "type", "description"
+]
+TIME_LOG_EXPORT_HEADER = [
+    "Date", "User", "Project", "Task", "Duration (Hours)", "Duration (Minutes)", "Type", "Description"
+]
+
+
+def time_log_export_records(db: Session, accessible_projects: List[int], project_id: Optional[int] = None,
+                            start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Time log export rows, fetched through a server-side cursor in batches"""
+    query = select(
+        TimeLog.date,
+        TimeLog.hours,
+        TimeLog.description,
+        User.first_name,
+        User.last_name,
+        Project.name.label("project_name"),
+        Task.title.label("task_title")
+    ).join(Task, TimeLog.task_id == Task.id).join(
+        Project, Task.project_id == Project.id
+    ).join(User, TimeLog.user_id == User.id).where(
+        Project.id.in_(accessible_projects)
+    ).order_by(TimeLog.date, TimeLog.id)
+
+    if project_id:
+        query = query.where(Task.project_id == project_id)
+    if start_date:
+        query = query.where(TimeLog.date >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        query = query.where(TimeLog.date <= datetime.combine(end_date, datetime.max.time()))
+
+    for row in db.execute(query.execution_options(yield_per=EXPORT_BATCH_ROWS)):
+        yield {
+            "date": row.date,
+            "user": f"{row.first_name} {row.last_name}",
+            "project": row.project_name,
+            "task": row.task_title,
+            "duration_hours": round(row.hours or 0, 2),
+            "duration_minutes": hours_to_minutes(row.hours),
+            "type": time_log_type(row.description),
+            "description": row.description or ""
+        }
+
+
 @router.get("/export/time-logs")
 def export_time_logs(
-    format: str = Query("csv", description="Export format: csv, json"),
+    format: str = Query("csv", description="Export format: csv, ndjson, json"),
     project_id: Optional[int] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    gzip: bool = Query(False, description="Gzip the file as it is streamed"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Export time logs data"""
+    """Export time logs data
+    
+    Rows are streamed from the database in batches and encoded as they
+    arrive, so the download starts immediately and memory use does not
+    grow with the number of rows.
+    """
+    format = format.lower()
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported format. Use 'csv', 'ndjson' or 'json'")
+    media_type, extension = EXPORT_FORMATS[format]
     
     # Get accessible projects
-    from app.api.v1.endpoints.reports import get_accessible_projects
     accessible_projects = get_accessible_projects(current_user, db)
     
-    # Build query
-    query = db.query(TimeLog).join(Task).join(Project).join(User).filter(
-        Project.id.in_(accessible_projects)
-    )
-    
-    if project_id:
-        query = query.filter(Task.project_id == project_id)
-    if start_date:
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        query = query.filter(TimeLog.start_time >= start_datetime)
-    if end_date:
-        end_datetime = datetime.combine(end_date, datetime.max.time())
-        query = query.filter(TimeLog.start_time <= end_datetime)
-    
-    time_logs = query.all()
+    records = time_log_export_records(db, accessible_projects, project_id, start_date, end_date)
+    chunks = encode_records(format, TIME_LOG_EXPORT_COLUMNS, TIME_LOG_EXPORT_HEADER, records)
     
-    if format.lower() == "csv":
-        # Generate CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            "Date", "User", "Project", "Task", "Duration (Hours)", 
-            "Duration (Minutes)", "Type", "Description"
-        ])
-        
-        # Write data
-        for log in time_logs:
-            writer.writerow([
-                log.start_time.strftime("%Y-%m-%d %H:%M:%S"),
-                f"{log.user.first_name} {log.user.last_name}",
-                log.task.project.name,
-                log.task.title,
-                round((log.duration_minutes or 0) / 60, 2),
-                log.duration_minutes or 0,
-                "Manual" if log.is_manual else "Timer",
-                log.description or ""
-            ])
-        
-        output.seek(0)
+    filename = f"time_logs.{extension}"
+    if gzip:
         return StreamingResponse(
-            io.StringIO(output.getvalue()),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=time_logs.csv"}
-        )
-    
-    elif format.lower() == "json":
-        # Generate JSON
-        data = []
-        for log in time_logs:
-            data.append({
-                "date": log.start_time.isoformat(),
-                "user": f"{log.user.first_name} {log.user.last_name}",
-                "project": log.task.project.name,
-                "task": log.task.title,
-                "duration_hours": round((log.duration_minutes or 0) / 60, 2),
-                "duration_minutes": log.duration_minutes or 0,
-                "type": "Manual" if log.is_manual else "Timer",
-                "description": log.description or ""
-            })
-        
-        return Response(
-            content=json.dumps(data, indent=2),
-            media_type="application/json",
-            headers={"Content-Disposition": "attachment; filename=time_logs.json"}
+            gzip_chunks(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f"attachment; filename={filename}.gz"}
         )
-    
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported format. Use 'csv' or 'json'")
+    return StreamingResponse(
+        encoded_chunks(chunks),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 @router.get("/workload-analysis")
+@cached_report("analytics.workload-analysis", WORKLOAD_TABLES, get_accessible_projects, per_user=True)
 def get_workload_analysis(
     period_days: int = Query(30, description="Analysis period in days"),
     team_id: Optional[int] = Query(None, description="Filter by team"),
@@ -315,7 +506,7 @@ def get_workload_analysis(
     start_date = end_date - timedelta(days=period_days)
     
     # Get users to analyze
-    users_query = db.query(User).filter(User.is_active)
+    users_query = db.query(User.id, User.first_name, User.last_name, User.role).filter(User.is_active)
     
     if team_id:
         users_query = users_query.join(Team.members).filter(Team.id == team_id)
@@ -325,54 +516,60 @@ def get_workload_analysis(
             Team.team_leader_id == current_user.id
         )
     
-    users = users_query.all()
+    users = users_query.distinct().all()
+    user_ids = [user.id for user in users]
+    
+    # Hours logged, active tasks and active story points for all users at once
+    hours_by_user = dict(db.query(TimeLog.user_id, func.sum(TimeLog.hours)).filter(
+        TimeLog.user_id.in_(user_ids),
+        TimeLog.date >= start_date,
+        TimeLog.date <= end_date
+    ).group_by(TimeLog.user_id).all()) if user_ids else {}
+    
+    active_by_user = {
+        row.assignee_id: row for row in db.query(
+            Task.assignee_id,
+            func.count(Task.id).label("active_tasks"),
+            func.coalesce(func.sum(Task.story_points), 0).label("active_story_points")
+        ).filter(
+            Task.assignee_id.in_(user_ids),
+            Task.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS])
+        ).group_by(Task.assignee_id).all()
+    } if user_ids else {}
+    
+    # Capacity from each user's working hours, minus holidays and approved time off
+    capacities = user_capacities(db, user_ids, start_date.date(), end_date.date())
     
     workload_analysis = []
     
     for user in users:
-        # Get time logs for the period
-        time_logs = db.query(TimeLog).filter(
-            TimeLog.user_id == user.id,
-            TimeLog.start_time >= start_date,
-            TimeLog.start_time <= end_date
-        ).all()
-        
-        total_hours = sum(log.duration_minutes or 0 for log in time_logs) / 60
-        working_days = period_days * 5 / 7  # Assume 5-day work week
-        avg_hours_per_day = total_hours / working_days if working_days > 0 else 0
-        
-        # Get active tasks
-        active_tasks = db.query(Task).filter(
-            Task.assignee_id == user.id,
-            Task.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS])
-        ).count()
-        
-        # Get story points in progress
-        active_story_points = db.query(func.sum(Task.story_points)).filter(
-            Task.assignee_id == user.id,
-            Task.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS]),
-            Task.story_points.isnot(None)
-        ).scalar() or 0
+        total_hours = float(hours_by_user.get(user.id) or 0)
+        capacity = capacities[user.id]
+        active = active_by_user.get(user.id)
+        avg_hours_per_day = total_hours / capacity.working_days if capacity.working_days else 0
+        utilization = total_hours / capacity.capacity_hours * 100 if capacity.capacity_hours else 0
         
         # Calculate workload level
-        if avg_hours_per_day < 4:
+        if utilization < 50:
             workload_level = "Low"
-        elif avg_hours_per_day < 6:
+        elif utilization < 75:
             workload_level = "Normal"
-        elif avg_hours_per_day < 8:
+        elif utilization < 100:
             workload_level = "High"
         else:
             workload_level = "Overloaded"
         
         workload_analysis.append({
+            "user_id": user.id,
             "user_name": f"{user.first_name} {user.last_name}",
             "user_role": user.role.value,
             "total_hours": round(total_hours, 2),
             "avg_hours_per_day": round(avg_hours_per_day, 2),
-            "active_tasks": active_tasks,
-            "active_story_points": int(active_story_points),
+            "active_tasks": active.active_tasks if active else 0,
+            "active_story_points": int(active.active_story_points) if active else 0,
+            **capacity.as_dict(),
             "workload_level": workload_level,
-            "utilization_percentage": round((avg_hours_per_day / 8) * 100, 1) if avg_hours_per_day <= 8 else 100
+            "utilization_percentage": round(min(utilization, 100), 1)
         })
     
     # Sort by workload level
@@ -12,7 +12,8 @@ from app.models.user import User
 from app.models.backlog import Backlog
 from app.models.project import Project
 from app.models.task import Task
-from app.schemas.backlog import BacklogCreate, BacklogUpdate, BacklogResponse
+from app.core.ranking import move_rank, rank_order
+from app.schemas.backlog import BacklogCreate, BacklogUpdate, BacklogResponse, BacklogMove
 
 router = APIRouter()
 
@@ -30,7 +31,7 @@ def get_backlogs(
     if project_id:
         query = query.filter(Backlog.project_id == project_id)
     
-    backlogs = query.offset(skip).limit(limit).all()
+    backlogs = query.order_by(Backlog.project_id, *rank_order(Backlog)).offset(skip).limit(limit).all()
     return backlogs
 
 @router.get("/{backlog_id}", response_model=BacklogResponse)
@@ -83,6 +84,29 @@ def update_backlog(
     db.refresh(backlog)
     return backlog
 
+@router.post("/{backlog_id}/move", response_model=BacklogResponse)
+def move_backlog(
+    backlog_id: int,
+    move: BacklogMove,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Reorder a backlog item; only the moved item's row is written"""
+    backlog = db.query(Backlog).filter(Backlog.id == backlog_id).first()
+    if not backlog:
+        raise HTTPException(status_code=404, detail="Backlog not found")
+    
+    try:
+        backlog.rank = move_rank(
+            db, Backlog, (Backlog.project_id == backlog.project_id,), backlog.id,
+            before_id=move.before_id, after_id=move.after_id
+        )
+    except LookupError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    db.commit()
+    db.refresh(backlog)
+    return backlog
+
 @router.delete("/{backlog_id}")
 def delete_backlog(
     backlog_id: int,
@@ -2,15 +2,31 @@
 Dashboard and reporting endpoints
 """
 
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, select, true, or_
+from starlette.concurrency import run_in_threadpool
+from starlette.status import WS_1008_POLICY_VIOLATION
 
 from app.core.database import get_db
-from app.core.auth import get_current_active_user
+from app.core.auth import get_current_active_user, verify_token
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.kanban_events import kanban_card, current_version
+from app.core.kanban_channel import kanban_hub
+from app.core.ranking import after_rank, rank_order
+from app.core.project_stats import STATUS_COLUMNS, load_project_stats
+from app.core.sections import Section, compose_sections, section_sessions
+from app.core.dashboard_snapshots import (
+    register_dashboard_builder, get_snapshot, snapshot_is_servable, snapshot_metadata, store_snapshot
+)
 from app.models.user import User
-from app.models.team import Team
+from app.models.team import Team, team_members, team_projects
 from app.models.project import Project
 from app.models.task import Task
 from app.models.sprint import Sprint
@@ -32,136 +48,165 @@ def can_access_user_data(current_user: User, target_user_id: int, db: Session) -
     # Team leaders can access their team members' data
     if current_user.role == UserRole.TEAM_LEADER:
         # Check if target user is in any team led by current user
-        led_teams = db.query(Team).filter(Team.team_leader_id == current_user.id).all()
-        for team in led_teams:
-            if any(member.id == target_user_id for member in team.members):
-                return True
+        return db.query(team_members.c.user_id).join(
+            Team, Team.id == team_members.c.team_id
+        ).filter(
+            Team.team_leader_id == current_user.id,
+            team_members.c.user_id == target_user_id
+        ).first() is not None
     
     return False
 
-@router.get("/dashboard")
-def get_dashboard_data(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-) -> Dict[str, Any]:
-    """Get comprehensive dashboard data for the current user"""
-    
-    # Get user's teams and projects
-    user_teams = db.query(Team).filter(
-        (Team.team_leader_id == current_user.id) | 
-        (Team.members.any(User.id == current_user.id))
-    ).all()
-    
-    # Get projects user has access to (through teams or direct assignment)
-    user_projects_query = db.query(Project)
-    if current_user.role not in [UserRole.ADMIN, UserRole.PROJECT_MANAGER]:
-        # Filter to projects accessible through teams
-        team_ids = [team.id for team in user_teams]
-        if team_ids:
-            user_projects_query = user_projects_query.join(Team.projects).filter(Team.id.in_(team_ids))
-        else:
-            user_projects_query = user_projects_query.filter(False)  # No access
-    
-    user_projects = user_projects_query.all()
-    project_ids = [p.id for p in user_projects]
-    
-    # Project statistics
-    total_projects = len(user_projects)
-    active_projects = len([p for p in user_projects if p.status == ProjectStatus.ACTIVE])
-    
-    # Task statistics - both assigned and in accessible projects
-    my_assigned_tasks = db.query(Task).filter(Task.assignee_id == current_user.id).all()
-    
-    if project_ids:
-        accessible_tasks = db.query(Task).filter(Task.project_id.in_(project_ids)).all()
-    else:
-        accessible_tasks = []
-    
-    # My task counts by status
-    my_todo = len([t for t in my_assigned_tasks if t.status == TaskStatus.TODO])
-    my_in_progress = len([t for t in my_assigned_tasks if t.status == TaskStatus.IN_PROGRESS])
-    my_review = len([t for t in my_assigned_tasks if t.status == TaskStatus.REVIEW])
-    my_done = len([t for t in my_assigned_tasks if t.status == TaskStatus.DONE])
-    my_blocked = len([t for t in my_assigned_tasks if t.status == TaskStatus.BLOCKED])
-    
-    # Story points statistics
-    my_total_story_points = sum(t.story_points or 0 for t in my_assigned_tasks)
-    my_completed_story_points = sum(t.story_points or 0 for t in my_assigned_tasks if t.status == TaskStatus.DONE)
-    
-    # Sprint statistics
-    if project_ids:
-        my_sprints = db.query(Sprint).filter(Sprint.project_id.in_(project_ids)).all()
-        active_sprints = len([s for s in my_sprints if s.status == SprintStatus.ACTIVE])
-        total_sprints = len(my_sprints)
-    else:
-        active_sprints = total_sprints = 0
-    
-    # Time log statistics
-    total_hours = db.query(func.sum(TimeLog.hours)).filter(
-        TimeLog.user_id == current_user.id
-    ).scalar() or 0
-    
-    # Recent time logs
-    recent_time_logs = db.query(TimeLog).filter(
-        TimeLog.user_id == current_user.id
-    ).order_by(TimeLog.created_at.desc()).limit(5).all()
-    
-    # Recent tasks
-    recent_tasks = db.query(Task).filter(
-        Task.assignee_id == current_user.id
-    ).order_by(Task.updated_at.desc()).limit(5).all()
-    
-    # Team information
-    team_info = []
-    for team in user_teams:
-        team_info.append({
-            "id": team.id,
-            "name": team.name,
-            "description": team.description,
-            "is_leader": team.team_leader_id == current_user.id,
-            "member_count": len(team.members),
-            "project_count": len(team.projects)
-        })
-    
+def user_team_ids(user_id: int):
+    """Subquery of the teams a user leads or belongs to"""
+    member_of = select(team_members.c.team_id).where(team_members.c.user_id == user_id)
+    return select(Team.id).where(or_(Team.team_leader_id == user_id, Team.id.in_(member_of)))
+
+def team_summaries(db: Session, user_id: int) -> list:
+    """Teams the user leads or belongs to, with member and project counts"""
+    member_count = select(func.count()).select_from(team_members).where(
+        team_members.c.team_id == Team.id
+    ).scalar_subquery()
+    project_count = select(func.count()).select_from(team_projects).where(
+        team_projects.c.team_id == Team.id
+    ).scalar_subquery()
+    return db.query(
+        Team.id,
+        Team.name,
+        Team.description,
+        Team.team_leader_id,
+        member_count.label("member_count"),
+        project_count.label("project_count")
+    ).filter(Team.id.in_(user_team_ids(user_id))).order_by(Team.id).all()
+
+def project_scope(role: UserRole, user_id: int):
+    """Condition on a project id column limiting it to the projects the user can see"""
+    def condition(column):
+        if role in [UserRole.ADMIN, UserRole.PROJECT_MANAGER]:
+            return true()
+        # Projects accessible through the user's teams
+        return column.in_(select(team_projects.c.project_id).where(
+            team_projects.c.team_id.in_(user_team_ids(user_id))
+        ))
+    return condition
+
+def project_counts(db: Session, scope) -> tuple:
+    """(total, active) accessible projects"""
+    row = db.query(
+        func.count(Project.id),
+        func.coalesce(func.sum(case((Project.status == ProjectStatus.ACTIVE, 1), else_=0)), 0)
+    ).filter(scope(Project.id)).one()
+    return row[0], int(row[1])
+
+def sprint_counts(db: Session, scope) -> tuple:
+    """(total, active) sprints in accessible projects"""
+    row = db.query(
+        func.count(Sprint.id),
+        func.coalesce(func.sum(case((Sprint.status == SprintStatus.ACTIVE, 1), else_=0)), 0)
+    ).filter(scope(Sprint.project_id)).one()
+    return row[0], int(row[1])
+
+def assigned_task_stats(db: Session, user_id: int) -> Dict[TaskStatus, tuple]:
+    """Assigned task count and story points per status"""
     return {
-        "user_info": {
-            "id": current_user.id,
-            "username": current_user.username,
-            "full_name": current_user.full_name,
-            "role": current_user.role.value,
-            "email": current_user.email
-        },
-        "projects": {
-            "total": total_projects,
-            "active": active_projects,
+        status: (count, int(points or 0))
+        for status, count, points in db.query(
+            Task.status, func.count(Task.id), func.sum(Task.story_points)
+        ).filter(Task.assignee_id == user_id).group_by(Task.status).all()
+    }
+
+def recent_tasks(db: Session, user_id: int, limit: int) -> list:
+    return db.query(
+        Task.id,
+        Task.title,
+        Task.status,
+        Task.priority,
+        Task.story_points,
+        Task.due_date,
+        Task.estimated_hours,
+        Task.actual_hours,
+        Project.name.label("project_name")
+    ).outerjoin(Project, Task.project_id == Project.id).filter(
+        Task.assignee_id == user_id
+    ).order_by(Task.updated_at.desc(), Task.id.desc()).limit(limit).all()
+
+def recent_time_logs(db: Session, user_id: int, limit: int) -> list:
+    return db.query(
+        TimeLog.id,
+        TimeLog.description,
+        TimeLog.hours,
+        TimeLog.date,
+        TimeLog.task_id,
+        Task.title.label("task_title")
+    ).outerjoin(Task, TimeLog.task_id == Task.id).filter(
+        TimeLog.user_id == user_id
+    ).order_by(TimeLog.created_at.desc(), TimeLog.id.desc()).limit(limit).all()
+
+def total_logged_hours(db: Session, user_id: int, since: datetime = None) -> float:
+    query = db.query(func.sum(TimeLog.hours)).filter(TimeLog.user_id == user_id)
+    if since is not None:
+        query = query.filter(TimeLog.date >= since)
+    return float(query.scalar() or 0)
+
+def task_status_section(db: Session, user_id: int, scope, prefix: str, total_key: str) -> Dict[str, Any]:
+    """Assigned task counts per status plus story point totals"""
+    stats = assigned_task_stats(db, user_id)
+    count = lambda status: stats.get(status, (0, 0))[0]  # noqa: E731
+    total = sum(task_count for task_count, _ in stats.values())
+    tasks = {
+        total_key: total,
+        f"{prefix}_todo": count(TaskStatus.TODO),
+        f"{prefix}_in_progress": count(TaskStatus.IN_PROGRESS),
+        f"{prefix}_review": count(TaskStatus.REVIEW),
+        f"{prefix}_completed": count(TaskStatus.DONE),
+        f"{prefix}_blocked": count(TaskStatus.BLOCKED),
+        "accessible_total": db.query(func.count(Task.id)).filter(scope(Task.project_id)).scalar()
+    }
+    total_points = sum(points for _, points in stats.values())
+    completed_points = stats.get(TaskStatus.DONE, (0, 0))[1]
+    return {"tasks": tasks, "total_points": total_points, "completed_points": completed_points}
+
+async def compute_dashboard(db: Session, current_user: User) -> Dict[str, Any]:
+    """Compute the dashboard for a user from live data
+    
+    Sections are independent COUNT/SUM aggregates or LIMITed lists, run
+    concurrently on separate connections; see app.core.sections.
+    """
+    user_id = current_user.id
+    scope = project_scope(current_user.role, user_id)
+    
+    def projects_section(session: Session):
+        total, active = project_counts(session, scope)
+        top_projects = session.query(Project.id, Project.name, Project.status).filter(
+            scope(Project.id)
+        ).order_by(Project.id).limit(10).all()  # Limit to 10 for dashboard
+        return {"projects": {
+            "total": total,
+            "active": active,
             "accessible_projects": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "status": p.status.value
-                } for p in user_projects[:10]  # Limit to 10 for dashboard
+                {"id": p.id, "name": p.name, "status": p.status.value} for p in top_projects
             ]
-        },
-        "tasks": {
-            "my_assigned_total": len(my_assigned_tasks),
-            "my_todo": my_todo,
-            "my_in_progress": my_in_progress,
-            "my_review": my_review,
-            "my_completed": my_done,
-            "my_blocked": my_blocked,
-            "accessible_total": len(accessible_tasks)
-        },
-        "story_points": {
-            "my_total": my_total_story_points,
-            "my_completed": my_completed_story_points,
-            "completion_rate": (my_completed_story_points / my_total_story_points * 100) if my_total_story_points > 0 else 0
-        },
-        "sprints": {
-            "total": total_sprints,
-            "active": active_sprints
-        },
-        "time_logs": {
-            "total_hours": float(total_hours),
+        }}
+    
+    def tasks_section(session: Session):
+        stats = task_status_section(session, user_id, scope, "my", "my_assigned_total")
+        total_points, completed_points = stats["total_points"], stats["completed_points"]
+        return {
+            "tasks": stats["tasks"],
+            "story_points": {
+                "my_total": total_points,
+                "my_completed": completed_points,
+                "completion_rate": (completed_points / total_points * 100) if total_points > 0 else 0
+            }
+        }
+    
+    def sprints_section(session: Session):
+        total, active = sprint_counts(session, scope)
+        return {"sprints": {"total": total, "active": active}}
+    
+    def time_logs_section(session: Session):
+        return {"time_logs": {
+            "total_hours": total_logged_hours(session, user_id),
             "recent_logs": [
                 {
                     "id": log.id,
@@ -169,34 +214,88 @@ def get_dashboard_data(
                     "hours": log.hours,
                     "date": log.date,
                     "task_id": log.task_id
-                } for log in recent_time_logs
+                } for log in recent_time_logs(session, user_id, 5)
             ]
-        },
-        "teams": {
+        }}
+    
+    def teams_section(session: Session):
+        user_teams = team_summaries(session, user_id)
+        return {"teams": {
             "total": len(user_teams),
-            "leading": len([t for t in user_teams if t.team_leader_id == current_user.id]),
-            "team_details": team_info
-        },
-        "recent_tasks": [
+            "leading": len([t for t in user_teams if t.team_leader_id == user_id]),
+            "team_details": [
+                {
+                    "id": team.id,
+                    "name": team.name,
+                    "description": team.description,
+                    "is_leader": team.team_leader_id == user_id,
+                    "member_count": team.member_count,
+                    "project_count": team.project_count
+                } for team in user_teams
+            ]
+        }}
+    
+    def recent_tasks_section(session: Session):
+        return {"recent_tasks": [
             {
                 "id": task.id,
                 "title": task.title,
                 "status": task.status.value,
                 "priority": task.priority.value,
                 "story_points": task.story_points,
-                "project_name": task.project.name if task.project else None
-            } for task in recent_tasks
-        ]
+                "project_name": task.project_name
+            } for task in recent_tasks(session, user_id, 5)
+        ]}
+    
+    user_info = {
+        "id": current_user.id,
+        "username": current_user.username,
+        "full_name": current_user.full_name,
+        "role": current_user.role.value,
+        "email": current_user.email
     }
+    sections = await compose_sections([
+        Section("projects", projects_section),
+        Section("tasks", tasks_section, keys=("tasks", "story_points")),
+        Section("sprints", sprints_section),
+        Section("time_logs", time_logs_section),
+        Section("teams", teams_section),
+        Section("recent_tasks", recent_tasks_section),
+    ], section_sessions(db), settings.DASHBOARD_SECTION_TIMEOUT_SECONDS)
+    return jsonable_encoder({"user_info": user_info, **sections})
 
-@router.get("/dashboard/user/{user_id}")
-def get_user_dashboard_data(
-    user_id: int,
+register_dashboard_builder(compute_dashboard)
+
+@router.get("/dashboard")
+async def get_dashboard_data(
+    live: bool = Query(False, description="Skip the stored snapshot and compute from live data"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
-    """Get comprehensive dashboard data for a specific user (with permission checks)"""
-    
+    """Get comprehensive dashboard data for the current user
+    
+    Served from the user's materialized snapshot while it is fresh enough;
+    the `snapshot` entry tells how old it is and whether newer writes are
+    waiting for the background refresh.
+    """
+    snapshot = None
+    if settings.DASHBOARD_SNAPSHOTS_ENABLED:
+        snapshot = await run_in_threadpool(get_snapshot, db, current_user.id)
+        if not live and snapshot_is_servable(snapshot):
+            return {**json.loads(snapshot.payload), "snapshot": snapshot_metadata(snapshot, "snapshot")}
+    
+    observed_dirty_since = snapshot.dirty_since if snapshot else None
+    computed_at = datetime.utcnow()
+    data = await compute_dashboard(db, current_user)
+    if not settings.DASHBOARD_SNAPSHOTS_ENABLED:
+        return data
+    if all(section["status"] == "ok" for section in data["sections"].values()):
+        snapshot = await run_in_threadpool(
+            store_snapshot, db, current_user.id, data, observed_dirty_since, computed_at
+        )
+    return {**data, "snapshot": snapshot_metadata(snapshot, "live") if snapshot else {"source": "live"}}
+
+def load_dashboard_user(db: Session, current_user: User, user_id: int) -> User:
     # Check permissions
     if not can_access_user_data(current_user, user_id, db):
         raise HTTPException(
@@ -208,118 +307,26 @@ def get_user_dashboard_data(
     target_user = db.query(User).filter(User.id == user_id).first()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    # Get user's teams and projects
-    user_teams = db.query(Team).filter(
-        (Team.team_leader_id == target_user.id) | 
-        (Team.members.any(User.id == target_user.id))
-    ).all()
-    
-    # Get projects user has access to (through teams or direct assignment)
-    user_projects_query = db.query(Project)
-    if target_user.role not in [UserRole.ADMIN, UserRole.PROJECT_MANAGER]:
-        # Filter to projects accessible through teams
-        team_ids = [team.id for team in user_teams]
-        if team_ids:
-            user_projects_query = user_projects_query.join(Team.projects).filter(Team.id.in_(team_ids))
-        else:
-            user_projects_query = user_projects_query.filter(False)  # No access
-    
-    user_projects = user_projects_query.all()
-    project_ids = [p.id for p in user_projects]
-    
-    # Project statistics
-    total_projects = len(user_projects)
-    active_projects = len([p for p in user_projects if p.status == ProjectStatus.ACTIVE])
-    
-    # Task statistics - both assigned and in accessible projects
-    assigned_tasks = db.query(Task).filter(Task.assignee_id == target_user.id).all()
-    created_tasks = db.query(Task).filter(Task.created_by_id == target_user.id).all()
-    
-    if project_ids:
-        accessible_tasks = db.query(Task).filter(Task.project_id.in_(project_ids)).all()
-    else:
-        accessible_tasks = []
-    
-    # Task counts by status
-    assigned_todo = len([t for t in assigned_tasks if t.status == TaskStatus.TODO])
-    assigned_in_progress = len([t for t in assigned_tasks if t.status == TaskStatus.IN_PROGRESS])
-    assigned_review = len([t for t in assigned_tasks if t.status == TaskStatus.REVIEW])
-    assigned_done = len([t for t in assigned_tasks if t.status == TaskStatus.DONE])
-    assigned_blocked = len([t for t in assigned_tasks if t.status == TaskStatus.BLOCKED])
-    
-    # Story points statistics
-    total_story_points = sum(t.story_points or 0 for t in assigned_tasks)
-    completed_story_points = sum(t.story_points or 0 for t in assigned_tasks if t.status == TaskStatus.DONE)
-    
-    # Sprint statistics
-    if project_ids:
-        user_sprints = db.query(Sprint).filter(Sprint.project_id.in_(project_ids)).all()
-        active_sprints = len([s for s in user_sprints if s.status == SprintStatus.ACTIVE])
-        total_sprints = len(user_sprints)
-    else:
-        active_sprints = total_sprints = 0
-    
-    # Time log statistics
-    total_hours = db.query(func.sum(TimeLog.hours)).filter(
-        TimeLog.user_id == target_user.id
-    ).scalar() or 0
-    
-    # Recent time logs (last 30 days)
-    from datetime import datetime, timedelta
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    recent_hours = db.query(func.sum(TimeLog.hours)).filter(
-        TimeLog.user_id == target_user.id,
-        TimeLog.date >= thirty_days_ago
-    ).scalar() or 0
-    
-    # Time logs grouped by project
-    time_by_project = db.query(
-        Project.name,
-        func.sum(TimeLog.hours).label('total_hours')
-    ).select_from(TimeLog).join(Task).join(Project).filter(
-        TimeLog.user_id == target_user.id
-    ).group_by(Project.id, Project.name).all()
-    
-    # Recent tasks and time logs
-    recent_tasks = db.query(Task).filter(
-        Task.assignee_id == target_user.id
-    ).order_by(Task.updated_at.desc()).limit(10).all()
-    
-    recent_time_logs = db.query(TimeLog).filter(
-        TimeLog.user_id == target_user.id
-    ).order_by(TimeLog.created_at.desc()).limit(10).all()
-    
-    # Team information with detailed stats
-    team_info = []
-    for team in user_teams:
-        team_info.append({
-            "id": team.id,
-            "name": team.name,
-            "description": team.description,
-            "is_leader": team.team_leader_id == target_user.id,
-            "member_count": len(team.members),
-            "project_count": len(team.projects),
-            "projects": [{"id": p.id, "name": p.name} for p in team.projects]
-        })
-    
-    # Performance metrics
-    avg_hours_per_task = (total_hours / len(assigned_tasks)) if assigned_tasks else 0
-    completion_rate = (assigned_done / len(assigned_tasks) * 100) if assigned_tasks else 0
-    
-    return {
-        "user_info": {
-            "id": target_user.id,
-            "username": target_user.username,
-            "full_name": target_user.full_name,
-            "role": target_user.role.value,
-            "email": target_user.email,
-            "is_active": target_user.is_active,
-            "created_at": target_user.created_at
-        },
-        "projects": {
-            "total": total_projects,
-            "active": active_projects,
+    return target_user
+
+@router.get("/dashboard/user/{user_id}")
+async def get_user_dashboard_data(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Get comprehensive dashboard data for a specific user (with permission checks)"""
+    target_user = await run_in_threadpool(load_dashboard_user, db, current_user, user_id)
+    scope = project_scope(target_user.role, user_id)
+    
+    def projects_section(session: Session):
+        total, active = project_counts(session, scope)
+        user_projects = session.query(
+            Project.id, Project.name, Project.status, Project.start_date, Project.end_date
+        ).filter(scope(Project.id)).order_by(Project.id).all()
+        return {"projects": {
+            "total": total,
+            "active": active,
             "accessible_projects": [
                 {
                     "id": p.id,
@@ -329,40 +336,57 @@ def get_user_dashboard_data(
                     "end_date": p.end_date
                 } for p in user_projects
             ]
-        },
-        "tasks": {
-            "assigned_total": len(assigned_tasks),
-            "created_total": len(created_tasks),
-            "assigned_todo": assigned_todo,
-            "assigned_in_progress": assigned_in_progress,
-            "assigned_review": assigned_review,
-            "assigned_completed": assigned_done,
-            "assigned_blocked": assigned_blocked,
-            "accessible_total": len(accessible_tasks),
-            "completion_rate": completion_rate
-        },
-        "story_points": {
-            "total_assigned": total_story_points,
-            "completed": completed_story_points,
-            "completion_rate": (completed_story_points / total_story_points * 100) if total_story_points > 0 else 0,
-            "average_per_task": (total_story_points / len(assigned_tasks)) if assigned_tasks else 0
-        },
-        "sprints": {
-            "total": total_sprints,
-            "active": active_sprints,
+        }}
+    
+    def tasks_section(session: Session):
+        stats = task_status_section(session, user_id, scope, "assigned", "assigned_total")
+        tasks = stats["tasks"]
+        assigned_total = tasks["assigned_total"]
+        tasks["created_total"] = session.query(func.count(Task.id)).filter(Task.created_by_id == user_id).scalar()
+        tasks["completion_rate"] = (tasks["assigned_completed"] / assigned_total * 100) if assigned_total else 0
+        total_points, completed_points = stats["total_points"], stats["completed_points"]
+        return {
+            "tasks": tasks,
+            "story_points": {
+                "total_assigned": total_points,
+                "completed": completed_points,
+                "completion_rate": (completed_points / total_points * 100) if total_points > 0 else 0,
+                "average_per_task": (total_points / assigned_total) if assigned_total else 0
+            }
+        }
+    
+    def sprints_section(session: Session):
+        total, active = sprint_counts(session, scope)
+        user_sprints = session.query(
+            Sprint.id, Sprint.name, Sprint.status, Project.name.label("project_name")
+        ).join(Project, Sprint.project_id == Project.id).filter(
+            scope(Sprint.project_id)
+        ).order_by(Sprint.id).limit(10).all()  # Limit to 10
+        return {"sprints": {
+            "total": total,
+            "active": active,
             "accessible_sprints": [
                 {
                     "id": s.id,
                     "name": s.name,
                     "status": s.status.value,
-                    "project_name": s.project.name
-                } for s in user_sprints[:10]  # Limit to 10
+                    "project_name": s.project_name
+                } for s in user_sprints
             ]
-        },
-        "time_logs": {
-            "total_hours": float(total_hours),
-            "recent_30_days_hours": float(recent_hours),
-            "average_hours_per_task": float(avg_hours_per_task),
+        }}
+    
+    def time_logs_section(session: Session):
+        # Time logs grouped by project
+        time_by_project = session.query(
+            Project.name,
+            func.sum(TimeLog.hours).label('total_hours')
+        ).select_from(TimeLog).join(Task).join(Project).filter(
+            TimeLog.user_id == user_id
+        ).group_by(Project.id, Project.name).all()
+        return {"time_logs": {
+            "total_hours": total_logged_hours(session, user_id),
+            # Recent time logs (last 30 days)
+            "recent_30_days_hours": total_logged_hours(session, user_id, since=datetime.now() - timedelta(days=30)),
             "hours_by_project": [
                 {
                     "project_name": project_name,
@@ -376,35 +400,88 @@ def get_user_dashboard_data(
                     "hours": log.hours,
                     "date": log.date,
                     "task_id": log.task_id,
-                    "task_title": log.task.title if log.task else None
-                } for log in recent_time_logs
+                    "task_title": log.task_title
+                } for log in recent_time_logs(session, user_id, 10)
             ]
-        },
-        "teams": {
+        }}
+    
+    def teams_section(session: Session):
+        user_teams = team_summaries(session, user_id)
+        team_ids = [team.id for team in user_teams]
+        # Projects of each team, in one query
+        team_project_lists = {team_id: [] for team_id in team_ids}
+        if team_ids:
+            for team_id, project_id, project_name in session.query(
+                team_projects.c.team_id, Project.id, Project.name
+            ).join(Project, Project.id == team_projects.c.project_id).filter(
+                team_projects.c.team_id.in_(team_ids)
+            ).order_by(Project.id).all():
+                team_project_lists[team_id].append({"id": project_id, "name": project_name})
+        return {"teams": {
             "total": len(user_teams),
-            "leading": len([t for t in user_teams if t.team_leader_id == target_user.id]),
-            "team_details": team_info
-        },
-        "recent_tasks": [
+            "leading": len([t for t in user_teams if t.team_leader_id == user_id]),
+            "team_details": [
+                {
+                    "id": team.id,
+                    "name": team.name,
+                    "description": team.description,
+                    "is_leader": team.team_leader_id == user_id,
+                    "member_count": team.member_count,
+                    "project_count": team.project_count,
+                    "projects": team_project_lists[team.id]
+                } for team in user_teams
+            ]
+        }}
+    
+    def recent_tasks_section(session: Session):
+        return {"recent_tasks": [
             {
                 "id": task.id,
                 "title": task.title,
                 "status": task.status.value,
                 "priority": task.priority.value,
                 "story_points": task.story_points,
-                "project_name": task.project.name if task.project else None,
+                "project_name": task.project_name,
                 "due_date": task.due_date,
                 "estimated_hours": task.estimated_hours,
                 "actual_hours": task.actual_hours
-            } for task in recent_tasks
-        ],
-        "performance_metrics": {
-            "completion_rate": completion_rate,
+            } for task in recent_tasks(session, user_id, 10)
+        ]}
+    
+    user_info = {
+        "id": target_user.id,
+        "username": target_user.username,
+        "full_name": target_user.full_name,
+        "role": target_user.role.value,
+        "email": target_user.email,
+        "is_active": target_user.is_active,
+        "created_at": target_user.created_at
+    }
+    data = await compose_sections([
+        Section("projects", projects_section),
+        Section("tasks", tasks_section, keys=("tasks", "story_points")),
+        Section("sprints", sprints_section),
+        Section("time_logs", time_logs_section),
+        Section("teams", teams_section),
+        Section("recent_tasks", recent_tasks_section),
+    ], section_sessions(db), settings.DASHBOARD_SECTION_TIMEOUT_SECONDS)
+    
+    # Performance metrics combine sections, so they are only available when those succeeded
+    tasks, time_logs, projects = data["tasks"], data["time_logs"], data["projects"]
+    if tasks is not None and time_logs is not None:
+        assigned_total = tasks["assigned_total"]
+        avg_hours_per_task = (time_logs["total_hours"] / assigned_total) if assigned_total else 0
+        time_logs["average_hours_per_task"] = float(avg_hours_per_task)
+        data["performance_metrics"] = {
+            "completion_rate": tasks["completion_rate"],
             "average_hours_per_task": float(avg_hours_per_task),
-            "tasks_per_project": len(assigned_tasks) / max(total_projects, 1),
-            "story_points_velocity": completed_story_points  # Could be enhanced with sprint-based calculation
+            "tasks_per_project": assigned_total / max(projects["total"] if projects else 0, 1),
+            "story_points_velocity": data["story_points"]["completed"]  # Could be enhanced with sprint-based calculation
         }
-    }
+    else:
+        data["performance_metrics"] = None
+    
+    return {"user_info": user_info, **data}
 
 @router.get("/reports/project/{project_id}")
 def get_project_report(
@@ -418,29 +495,16 @@ def get_project_report(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Task statistics by status
-    task_stats = db.query(Task.status, func.count(Task.id)).filter(
-        Task.project_id == project_id
-    ).group_by(Task.status).all()
-    
-    # Total story points
-    total_story_points = db.query(func.sum(Task.story_points)).filter(
-        Task.project_id == project_id
-    ).scalar() or 0
-    
-    completed_story_points = db.query(func.sum(Task.story_points)).filter(
-        Task.project_id == project_id,
-        Task.status == TaskStatus.DONE
-    ).scalar() or 0
-    
-    # Time tracking
-    total_estimated_hours = db.query(func.sum(Task.estimated_hours)).filter(
-        Task.project_id == project_id
-    ).scalar() or 0
-    
-    total_actual_hours = db.query(func.sum(Task.actual_hours)).filter(
-        Task.project_id == project_id
-    ).scalar() or 0
+    # Counters come from the maintained project_stats row
+    stats = load_project_stats(db, project_id)
+    task_stats = [
+        (task_status, getattr(stats, column)) for task_status, column in STATUS_COLUMNS.items()
+        if getattr(stats, column)
+    ]
+    total_story_points = stats.total_story_points
+    completed_story_points = stats.done_story_points
+    total_estimated_hours = stats.estimated_task_hours
+    total_actual_hours = stats.actual_task_hours
     
     # Sprint information
     sprints = db.query(Sprint).filter(Sprint.project_id == project_id).all()
@@ -477,59 +541,182 @@ def get_project_report(
         ]
     }
 
+KANBAN_COLUMNS = [
+    TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.REVIEW, TaskStatus.DONE, TaskStatus.BLOCKED
+]
+KANBAN_PAGE_SIZE = 20
+KANBAN_MAX_PAGE_SIZE = 100
+
+def kanban_card_columns():
+    """Card fields with the assignee joined; descriptions are left to the task detail view"""
+    return [
+        Task.id,
+        Task.title,
+        Task.status,
+        Task.priority,
+        Task.story_points,
+        Task.due_date,
+        Task.rank,
+        Task.assignee_id,
+        User.username.label("assignee_username"),
+        User.first_name.label("assignee_first_name"),
+        User.last_name.label("assignee_last_name")
+    ]
+
+def kanban_cursor(card: Dict[str, Any]) -> str:
+    return encode_cursor([card["rank"], card["id"]])
+
+def kanban_next_cursor(cards: list, total: int) -> Optional[str]:
+    return kanban_cursor(cards[-1]) if cards and len(cards) < total else None
+
+def load_kanban_project(db: Session, project_id: int) -> Project:
+    project = db.query(Project.id, Project.name).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
 @router.get("/kanban/{project_id}")
 def get_kanban_board(
     project_id: int,
+    limit: int = Query(KANBAN_PAGE_SIZE, ge=1, le=KANBAN_MAX_PAGE_SIZE, description="Cards per column"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
-    """Get kanban board data for a project"""
-    
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Get tasks grouped by status
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
-    
-    kanban_data = {
-        "todo": [],
-        "in_progress": [],
-        "review": [],
-        "done": [],
-        "blocked": []
+    """Get kanban board data for a project
+    
+    Returns every column's task count (the WIP count) and story points from
+    one grouped query, plus the first `limit` cards of each column from one
+    windowed query. Cards are in rank order (see app.core.ranking); further
+    cards are fetched per column with the column's `next_cursor`.
+    """
+    project = load_kanban_project(db, project_id)
+    # Read first: changes racing with the queries below arrive as patches
+    version = current_version(db, project_id)
+    
+    totals = {
+        status: (count, int(points or 0))
+        for status, count, points in db.query(
+            Task.status, func.count(Task.id), func.sum(Task.story_points)
+        ).filter(Task.project_id == project_id).group_by(Task.status).all()
     }
     
-    for task in tasks:
-        task_data = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "priority": task.priority.value,
-            "story_points": task.story_points,
-            "assignee": {
-                "id": task.assignee.id,
-                "username": task.assignee.username,
-                "full_name": task.assignee.full_name
-            } if task.assignee else None,
-            "due_date": task.due_date
+    ranked = db.query(
+        *kanban_card_columns(),
+        func.row_number().over(partition_by=Task.status, order_by=rank_order(Task)).label("position")
+    ).outerjoin(User, Task.assignee_id == User.id).filter(Task.project_id == project_id).subquery()
+    rows = db.query(ranked).filter(ranked.c.position <= limit).order_by(ranked.c.status, ranked.c.position).all()
+    
+    cards = {status: [] for status in KANBAN_COLUMNS}
+    for row in rows:
+        if row.status in cards:
+            cards[row.status].append(kanban_card(row))
+    
+    columns = {}
+    for status in KANBAN_COLUMNS:
+        count, points = totals.get(status, (0, 0))
+        columns[status.value] = {
+            "count": count,
+            "story_points": points,
+            "cards": cards[status],
+            "next_cursor": kanban_next_cursor(cards[status], count)
         }
-        
-        if task.status == TaskStatus.TODO:
-            kanban_data["todo"].append(task_data)
-        elif task.status == TaskStatus.IN_PROGRESS:
-            kanban_data["in_progress"].append(task_data)
-        elif task.status == TaskStatus.REVIEW:
-            kanban_data["review"].append(task_data)
-        elif task.status == TaskStatus.DONE:
-            kanban_data["done"].append(task_data)
-        elif task.status == TaskStatus.BLOCKED:
-            kanban_data["blocked"].append(task_data)
     
     return {
         "project": {
             "id": project.id,
             "name": project.name
         },
-        "columns": kanban_data
+        "version": version,
+        "columns": columns
+    }
+
+@router.get("/kanban/{project_id}/columns/{status}")
+def get_kanban_column(
+    project_id: int,
+    status: TaskStatus,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(KANBAN_PAGE_SIZE, ge=1, le=KANBAN_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Get the next page of cards in one kanban column"""
+    load_kanban_project(db, project_id)
+    
+    query = db.query(*kanban_card_columns()).outerjoin(User, Task.assignee_id == User.id).filter(
+        Task.project_id == project_id,
+        Task.status == status
+    )
+    if cursor:
+        try:
+            rank, after_id = decode_cursor(cursor, 2)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        query = query.filter(after_rank(Task, rank, after_id))
+    # One extra row tells whether another page follows
+    rows = query.order_by(*rank_order(Task)).limit(limit + 1).all()
+    cards = [kanban_card(row) for row in rows[:limit]]
+    
+    return {
+        "status": status.value,
+        "cards": cards,
+        "next_cursor": kanban_cursor(cards[-1]) if len(rows) > limit else None
     }
+
+def authorize_kanban_channel(token: str, project_id: int) -> bool:
+    """Whether the token's user may watch the project's board"""
+    try:
+        token_data = verify_token(token, ValueError("Invalid token"))
+    except ValueError:
+        return False
+    db = kanban_hub.session_factory()
+    try:
+        user = db.query(User.id, User.role, User.is_active).filter(User.username == token_data.username).first()
+        if user is None or not user.is_active:
+            return False
+        scope = project_scope(user.role, user.id)
+        return db.query(Project.id).filter(Project.id == project_id, scope(Project.id)).first() is not None
+    finally:
+        db.close()
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    # Client messages carry nothing; reading them surfaces the disconnect
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+@router.websocket("/kanban/{project_id}/ws")
+async def kanban_channel(
+    websocket: WebSocket,
+    project_id: int,
+    token: str = Query(..., description="Access token (browsers cannot set headers on WebSockets)"),
+    version: Optional[int] = Query(None, description="Board version the client has applied")
+):
+    """Live card-level patches for a project's kanban board
+    
+    Clients load the board over HTTP, subscribe with its `version`, and apply
+    the `patch` messages that follow; after a reconnect they subscribe with
+    the last version they applied. See app.core.kanban_channel for the
+    message types.
+    """
+    if not await run_in_threadpool(authorize_kanban_channel, token, project_id):
+        await websocket.close(code=WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscriber, messages = await kanban_hub.subscribe(project_id, version)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+    try:
+        for message in messages:
+            await websocket.send_json(message)
+        while True:
+            next_message = asyncio.ensure_future(subscriber.queue.get())
+            await asyncio.wait({next_message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_message.cancel()
+                break
+            message = subscriber.render(next_message.result())
+            if message is not None:
+                await websocket.send_json(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        kanban_hub.unsubscribe(subscriber)
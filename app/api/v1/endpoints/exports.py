@@ -0,0 +1,168 @@
+"""
+Background export jobs: queue a long export or report and download it later
+"""
+
+import json
+import os
+from datetime import date
+from typing import Callable, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.core.config import settings
+from app.core.export_jobs import (
+    register_export_kind, get_export_kinds, pending_job_count, submit_export_job, export_file_name
+)
+from app.core.export_stream import encode_records
+from app.api.v1.endpoints.reports import get_accessible_projects, get_story_points_report
+from app.api.v1.endpoints.advanced_reports import (
+    TIME_LOG_EXPORT_COLUMNS, TIME_LOG_EXPORT_HEADER, time_log_export_records, get_workload_analysis
+)
+from app.models.user import User
+from app.models.export_job import ExportJob
+from app.models.enums import ExportJobStatus, UserRole
+from app.schemas.export_job import ExportJobCreate, ExportJobResponse
+
+router = APIRouter()
+
+# Accepted parameters per kind and how to parse them
+KIND_PARAMETERS: Dict[str, Dict[str, Callable]] = {
+    "time_logs": {"project_id": int, "start_date": date.fromisoformat, "end_date": date.fromisoformat},
+    "story_points_report": {
+        "project_id": int, "user_id": int, "team_id": int,
+        "start_date": date.fromisoformat, "end_date": date.fromisoformat
+    },
+    "workload_analysis": {"period_days": int, "team_id": int},
+}
+
+
+def parse_parameters(kind: str, raw: dict) -> dict:
+    spec = KIND_PARAMETERS[kind]
+    unknown = set(raw) - set(spec)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {kind}: {', '.join(sorted(unknown))}")
+    return {name: spec[name](value) for name, value in raw.items() if value is not None}
+
+
+def produce_time_logs(db: Session, user: User, parameters: dict, format: str):
+    parameters = parse_parameters("time_logs", parameters)
+    records = time_log_export_records(db, get_accessible_projects(user, db), **parameters)
+    return encode_records(format, TIME_LOG_EXPORT_COLUMNS, TIME_LOG_EXPORT_HEADER, records)
+
+
+def produce_story_points_report(db: Session, user: User, parameters: dict, format: str):
+    filters = dict.fromkeys(KIND_PARAMETERS["story_points_report"])
+    filters.update(parse_parameters("story_points_report", parameters))
+    report = get_story_points_report(**filters, db=db, current_user=user)
+    yield json.dumps(jsonable_encoder(report))
+
+
+def produce_workload_analysis(db: Session, user: User, parameters: dict, format: str):
+    filters = {"period_days": 30, "team_id": None}
+    filters.update(parse_parameters("workload_analysis", parameters))
+    report = get_workload_analysis(**filters, db=db, current_user=user)
+    yield json.dumps(jsonable_encoder(report))
+
+
+register_export_kind("time_logs", ("csv", "ndjson", "json"), produce_time_logs)
+register_export_kind("story_points_report", ("json",), produce_story_points_report)
+register_export_kind("workload_analysis", ("json",), produce_workload_analysis)
+
+
+def job_response(job: ExportJob) -> ExportJobResponse:
+    return ExportJobResponse(
+        id=job.id,
+        kind=job.kind,
+        format=job.format,
+        parameters=json.loads(job.parameters or "{}"),
+        status=job.status,
+        error=job.error,
+        file_size=job.file_size,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+        download_url=f"{settings.API_V1_STR}/exports/{job.id}/download"
+        if job.status == ExportJobStatus.COMPLETED else None
+    )
+
+
+def get_owned_job(db: Session, job_id: int, current_user: User) -> ExportJob:
+    job = db.get(ExportJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job.user_id != current_user.id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied to this export job")
+    return job
+
+
+@router.post("/", response_model=ExportJobResponse, status_code=202)
+def create_export_job(
+    job_in: ExportJobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Queue an export or report; poll GET /exports/{id} for the result"""
+    kind = get_export_kinds().get(job_in.kind)
+    if kind is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export kind. Use one of: {', '.join(sorted(get_export_kinds()))}"
+        )
+    format = job_in.format.lower() if job_in.format else kind.formats[0]
+    if format not in kind.formats:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format for {kind.name}. Use one of: {', '.join(kind.formats)}"
+        )
+    try:
+        parse_parameters(kind.name, job_in.parameters)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if pending_job_count(db) >= settings.EXPORT_MAX_PENDING_JOBS:
+        raise HTTPException(status_code=429, detail="Too many exports in progress, try again later")
+
+    job = ExportJob(
+        user_id=current_user.id,
+        kind=kind.name,
+        format=format,
+        parameters=json.dumps(job_in.parameters),
+        status=ExportJobStatus.QUEUED
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    submit_export_job(job.id)
+    return job_response(job)
+
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+def get_export_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Status of an export job, with a download link once it has completed"""
+    return job_response(get_owned_job(db, job_id, current_user))
+
+
+@router.get("/{job_id}/download")
+def download_export(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Download a completed export as a gzip file"""
+    job = get_owned_job(db, job_id, current_user)
+    if job.status != ExportJobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status.value}")
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=410, detail="Export file has expired")
+    return FileResponse(job.file_path, media_type="application/gzip", filename=export_file_name(job))
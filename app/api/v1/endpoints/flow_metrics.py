@@ -0,0 +1,285 @@
+"""
+Flow metrics built on task status history: cycle time, lead time, time in
+status and cumulative flow
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, select, literal
+from datetime import datetime, date, timedelta
+
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.core.report_cache import cached_report
+from app.core.sql_analytics import seconds_between, percentile_summary
+from app.core.cfd_snapshots import backfill_cfd_snapshots
+from app.api.v1.endpoints.reports import get_accessible_projects
+from app.models.user import User
+from app.models.project import Project
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.task_status_history import TaskStatusHistory
+from app.models.cfd_snapshot import CFDSnapshot
+from app.models.enums import TaskStatus, UserRole
+
+router = APIRouter()
+
+FLOW_TABLES = ("task_status_history", "tasks", "projects", "sprints", "users", "teams", "team_members", "team_projects")
+GROUP_COLUMNS = {
+    "project": Task.project_id,
+    "sprint": Task.sprint_id,
+    "assignee": Task.assignee_id,
+}
+
+
+def task_conditions(accessible_projects, project_id, sprint_id, assignee_id) -> list:
+    conditions = [Task.project_id.in_(accessible_projects)]
+    if project_id:
+        conditions.append(Task.project_id == project_id)
+    if sprint_id:
+        conditions.append(Task.sprint_id == sprint_id)
+    if assignee_id:
+        conditions.append(Task.assignee_id == assignee_id)
+    return conditions
+
+
+def group_key_column(group_by: Optional[str]):
+    if group_by is None:
+        return literal("all")
+    if group_by not in GROUP_COLUMNS:
+        raise HTTPException(status_code=400, detail="group_by must be one of: project, sprint, assignee")
+    return GROUP_COLUMNS[group_by]
+
+
+def group_names(db: Session, group_by: Optional[str], keys) -> dict:
+    """Display names for the group keys in one query"""
+    ids = [key for key in keys if key is not None and key != "all"]
+    if not ids:
+        return {}
+    if group_by == "project":
+        return dict(db.query(Project.id, Project.name).filter(Project.id.in_(ids)).all())
+    if group_by == "sprint":
+        return dict(db.query(Sprint.id, Sprint.name).filter(Sprint.id.in_(ids)).all())
+    return {
+        user_id: f"{first_name} {last_name}"
+        for user_id, first_name, last_name in db.query(
+            User.id, User.first_name, User.last_name
+        ).filter(User.id.in_(ids)).all()
+    }
+
+
+def hours(seconds) -> Optional[float]:
+    return round(seconds / 3600, 2) if seconds is not None else None
+
+
+def summary_response(db: Session, metric: str, group_by: Optional[str], rows, filters: dict) -> dict:
+    names = group_names(db, group_by, [row.group_key for row in rows])
+    groups = [
+        {
+            "key": row.group_key,
+            "name": names.get(row.group_key, "Unassigned" if row.group_key is None else row.group_key),
+            "count": row.count,
+            "average_hours": hours(row.average),
+            "p50_hours": hours(row.p50),
+            "p85_hours": hours(row.p85),
+            "p95_hours": hours(row.p95)
+        }
+        for row in rows
+    ]
+    return {
+        "metric": metric,
+        "group_by": group_by,
+        "groups": groups,
+        "applied_filters": filters
+    }
+
+
+def completed_task_durations(db: Session, conditions: list, group_key, start_date, end_date, metric: str):
+    """Subquery of (group_key, seconds) for tasks currently DONE"""
+    done_at = func.max(case((TaskStatusHistory.to_status == TaskStatus.DONE, TaskStatusHistory.changed_at)))
+    started_at = func.min(case((TaskStatusHistory.to_status == TaskStatus.IN_PROGRESS, TaskStatusHistory.changed_at)))
+    per_task = select(
+        Task.id.label("task_id"),
+        group_key.label("group_key"),
+        Task.created_at.label("created_at"),
+        started_at.label("started_at"),
+        done_at.label("done_at")
+    ).join(TaskStatusHistory, TaskStatusHistory.task_id == Task.id).where(
+        *conditions, Task.status == TaskStatus.DONE
+    ).group_by(Task.id, group_key, Task.created_at).subquery()
+
+    start = per_task.c.created_at if metric == "lead_time" else per_task.c.started_at
+    query = select(
+        per_task.c.group_key,
+        seconds_between(db, start, per_task.c.done_at).label("seconds")
+    ).where(start.isnot(None), per_task.c.done_at.isnot(None))
+    if start_date:
+        query = query.where(per_task.c.done_at >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        query = query.where(per_task.c.done_at <= datetime.combine(end_date, datetime.max.time()))
+    return query.subquery()
+
+
+@router.get("/cycle-time")
+@cached_report("analytics.cycle-time", FLOW_TABLES, get_accessible_projects)
+def get_cycle_time(
+    project_id: Optional[int] = Query(None, description="Filter by project"),
+    sprint_id: Optional[int] = Query(None, description="Filter by sprint"),
+    assignee_id: Optional[int] = Query(None, description="Filter by assignee"),
+    start_date: Optional[date] = Query(None, description="Tasks completed from date"),
+    end_date: Optional[date] = Query(None, description="Tasks completed to date"),
+    group_by: Optional[str] = Query(None, description="Group by: project, sprint, assignee"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Time from a task first entering IN_PROGRESS until it was completed"""
+    conditions = task_conditions(get_accessible_projects(current_user, db), project_id, sprint_id, assignee_id)
+    durations = completed_task_durations(
+        db, conditions, group_key_column(group_by), start_date, end_date, "cycle_time"
+    )
+    filters = {"project_id": project_id, "sprint_id": sprint_id, "assignee_id": assignee_id,
+               "start_date": start_date, "end_date": end_date}
+    return summary_response(db, "cycle_time", group_by, percentile_summary(db, durations), filters)
+
+
+@router.get("/lead-time")
+@cached_report("analytics.lead-time", FLOW_TABLES, get_accessible_projects)
+def get_lead_time(
+    project_id: Optional[int] = Query(None, description="Filter by project"),
+    sprint_id: Optional[int] = Query(None, description="Filter by sprint"),
+    assignee_id: Optional[int] = Query(None, description="Filter by assignee"),
+    start_date: Optional[date] = Query(None, description="Tasks completed from date"),
+    end_date: Optional[date] = Query(None, description="Tasks completed to date"),
+    group_by: Optional[str] = Query(None, description="Group by: project, sprint, assignee"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Time from task creation until it was completed"""
+    conditions = task_conditions(get_accessible_projects(current_user, db), project_id, sprint_id, assignee_id)
+    durations = completed_task_durations(
+        db, conditions, group_key_column(group_by), start_date, end_date, "lead_time"
+    )
+    filters = {"project_id": project_id, "sprint_id": sprint_id, "assignee_id": assignee_id,
+               "start_date": start_date, "end_date": end_date}
+    return summary_response(db, "lead_time", group_by, percentile_summary(db, durations), filters)
+
+
+@router.get("/time-in-status")
+@cached_report("analytics.time-in-status", FLOW_TABLES, get_accessible_projects)
+def get_time_in_status(
+    project_id: Optional[int] = Query(None, description="Filter by project"),
+    sprint_id: Optional[int] = Query(None, description="Filter by sprint"),
+    assignee_id: Optional[int] = Query(None, description="Filter by assignee"),
+    start_date: Optional[date] = Query(None, description="Status entered from date"),
+    end_date: Optional[date] = Query(None, description="Status entered to date"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """How long tasks stay in each status
+
+    Each history row lasts until the task's next transition (LEAD over the
+    task's history); the current status counts up to now.
+    """
+    conditions = task_conditions(get_accessible_projects(current_user, db), project_id, sprint_id, assignee_id)
+    left_at = func.lead(TaskStatusHistory.changed_at).over(
+        partition_by=TaskStatusHistory.task_id,
+        order_by=(TaskStatusHistory.changed_at, TaskStatusHistory.id)
+    )
+    segments = select(
+        TaskStatusHistory.to_status.label("status"),
+        TaskStatusHistory.changed_at.label("entered_at"),
+        left_at.label("left_at")
+    ).join(Task, TaskStatusHistory.task_id == Task.id).where(*conditions).subquery()
+
+    query = select(
+        segments.c.status.label("group_key"),
+        seconds_between(db, segments.c.entered_at, func.coalesce(segments.c.left_at, func.now())).label("seconds")
+    )
+    if start_date:
+        query = query.where(segments.c.entered_at >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        query = query.where(segments.c.entered_at <= datetime.combine(end_date, datetime.max.time()))
+
+    rows = percentile_summary(db, query.subquery())
+    filters = {"project_id": project_id, "sprint_id": sprint_id, "assignee_id": assignee_id,
+               "start_date": start_date, "end_date": end_date}
+    statuses = [
+        {
+            "status": row.group_key.value if isinstance(row.group_key, TaskStatus) else row.group_key,
+            "count": row.count,
+            "average_hours": hours(row.average),
+            "p50_hours": hours(row.p50),
+            "p85_hours": hours(row.p85),
+            "p95_hours": hours(row.p95)
+        }
+        for row in rows
+    ]
+    return {"metric": "time_in_status", "statuses": statuses, "applied_filters": filters}
+
+
+@router.get("/cfd")
+def get_cumulative_flow(
+    project_id: int = Query(..., description="Project ID"),
+    sprint_id: Optional[int] = Query(None, description="Limit to one sprint of the project"),
+    start_date: Optional[date] = Query(None, description="From date (default: 30 days ago)"),
+    end_date: Optional[date] = Query(None, description="To date (default: today)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Cumulative flow diagram from the daily snapshots"""
+    if project_id not in get_accessible_projects(current_user, db):
+        raise HTTPException(status_code=403, detail="Access denied to this project")
+
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=30)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+
+    sprint_condition = CFDSnapshot.sprint_id == sprint_id if sprint_id else CFDSnapshot.sprint_id.is_(None)
+    rows = db.query(
+        CFDSnapshot.snapshot_date,
+        CFDSnapshot.status,
+        CFDSnapshot.task_count,
+        CFDSnapshot.story_points
+    ).filter(
+        CFDSnapshot.project_id == project_id,
+        sprint_condition,
+        CFDSnapshot.snapshot_date.between(start_date, end_date)
+    ).order_by(CFDSnapshot.snapshot_date).all()
+
+    statuses = [status.value for status in TaskStatus]
+    series = []
+    for row in rows:
+        if not series or series[-1]["date"] != row.snapshot_date.isoformat():
+            series.append({
+                "date": row.snapshot_date.isoformat(),
+                "task_counts": {status: 0 for status in statuses},
+                "story_points": {status: 0 for status in statuses}
+            })
+        series[-1]["task_counts"][row.status.value] = row.task_count
+        series[-1]["story_points"][row.status.value] = row.story_points
+
+    return {
+        "project_id": project_id,
+        "sprint_id": sprint_id,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "statuses": statuses,
+        "series": series
+    }
+
+
+@router.post("/cfd/backfill")
+def backfill_cumulative_flow(
+    start_date: Optional[date] = Query(None, description="First day to rebuild (default: first status change)"),
+    end_date: Optional[date] = Query(None, description="Last day to rebuild (default: yesterday)"),
+    overwrite: bool = Query(False, description="Rebuild days that already have snapshots"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Rebuild past CFD snapshots from task status history (admin only)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can backfill snapshots")
+    days = backfill_cfd_snapshots(db, start_date=start_date, end_date=end_date, overwrite=overwrite)
+    return {"days_written": days}
@@ -2,24 +2,85 @@
 Project management endpoints
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import enum
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session, load_only
 
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
+from app.core.project_stats import completion_percentage, load_project_stats
 from app.models.user import User
 from app.models.project import Project
+from app.models.phase import Phase
 from app.models.task import Task
 from app.models.sprint import Sprint
 from app.models.milestone import Milestone
 from app.models.time_log import TimeLog
 from app.models.team import Team
+from app.models.project_stats import ProjectStats
 from app.models.enums import TaskStatus, SprintStatus
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetailedResponse
 
 router = APIRouter()
 
+def project_user_stats(db: Session, project_id: int) -> List[dict]:
+    """Per-assignee statistics for a project, from one grouped query
+    
+    Task counts and story points are grouped over the user's assigned tasks;
+    hours are the time the user logged on any of the project's tasks.
+    """
+    logged_hours = select(
+        TimeLog.user_id,
+        func.sum(TimeLog.hours).label("total_hours")
+    ).join(Task, TimeLog.task_id == Task.id).where(
+        Task.project_id == project_id
+    ).group_by(TimeLog.user_id).subquery()
+    
+    status_counts = [
+        func.sum(case((Task.status == task_status, 1), else_=0)).label(task_status.value)
+        for task_status in (TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.REVIEW, TaskStatus.DONE)
+    ]
+    rows = db.query(
+        User.id, User.username, User.first_name, User.last_name, User.email, User.role,
+        func.count(Task.id).label("tasks_total"),
+        func.coalesce(func.sum(Task.story_points), 0).label("story_points"),
+        *status_counts,
+        func.coalesce(logged_hours.c.total_hours, 0).label("total_hours")
+    ).join(Task, Task.assignee_id == User.id).outerjoin(
+        logged_hours, logged_hours.c.user_id == User.id
+    ).filter(Task.project_id == project_id).group_by(
+        User.id, User.username, User.first_name, User.last_name, User.email, User.role,
+        logged_hours.c.total_hours
+    ).order_by(User.id).all()
+    
+    users_stats = []
+    for row in rows:
+        full_name = None
+        if row.first_name and row.last_name:
+            full_name = f"{row.first_name} {row.last_name}"
+        elif row.first_name:
+            full_name = row.first_name
+        
+        users_stats.append({
+            "user_id": row.id,
+            "username": row.username,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "full_name": full_name,
+            "email": row.email,
+            "role": row.role.value,
+            "total_hours": float(row.total_hours),
+            "total_story_points": int(row.story_points),
+            "tasks_completed": int(row.done or 0),
+            "tasks_in_progress": int(row.in_progress or 0),
+            "tasks_todo": int(row.todo or 0),
+            "tasks_review": int(row.review or 0),
+            "tasks_total": int(row.tasks_total)
+        })
+    return users_stats
+
 @router.get("/", response_model=List[ProjectResponse])
 def get_projects(
     skip: int = 0,
@@ -41,7 +102,6 @@ def get_projects(
     Returns projects with task counts and total spent time
     """
     from sqlalchemy.orm import joinedload
-    from sqlalchemy import func
     
     # Base query based on user role
     if current_user.role.value == 'admin':
@@ -81,84 +141,39 @@ def get_projects(
         query = query.filter(Project.status == status)
     # If show_closed=True and no specific status, show all projects including COMPLETED and ARCHIVED
     
-    projects = query.offset(skip).limit(limit).all()
-    
-    # Convert to response objects with expansions if requested
-    def calculate_completion_percentage(project):
-        try:
-            project_estimated_time = getattr(project, 'estimated_time', None)
-            if project_estimated_time is None or project_estimated_time == 0:
-                return 0.0
-            sprints = db.query(Sprint).filter(Sprint.project_id == project.id).all()
-            sprint_percentages = []
-            for sprint in sprints:
-                sprint_estimated_time = getattr(sprint, 'estimated_time', None)
-                if sprint_estimated_time is None or sprint_estimated_time == 0:
-                    continue
-                sprint_tasks = db.query(Task).filter(Task.sprint_id == sprint.id).all()
-                total_sprint_tasks = len(sprint_tasks)
-                if total_sprint_tasks == 0:
-                    continue
-                done_sprint_tasks = sum(1 for t in sprint_tasks if t.status == TaskStatus.DONE)
-                sprint_contribution = (sprint_estimated_time / project_estimated_time) * (done_sprint_tasks / total_sprint_tasks)
-                sprint_percentages.append(sprint_contribution)
-            if sprint_percentages:
-                return round(sum(sprint_percentages) * 100, 2)
-            else:
-                return 0.0
-        except Exception:
-            return 0.0
-
-    if expand:
-        result = []
-        for project in projects:
-            total_tasks = db.query(func.count(Task.id)).filter(Task.project_id == project.id).scalar() or 0
-            done_tasks = db.query(func.count(Task.id)).filter(
-                Task.project_id == project.id, 
-                Task.status == TaskStatus.DONE
-            ).scalar() or 0
-            total_spent_hours = db.query(func.coalesce(func.sum(TimeLog.hours), 0)).join(
-                Task, TimeLog.task_id == Task.id
-            ).filter(Task.project_id == project.id).scalar() or 0
-            completion_percentage = calculate_completion_percentage(project)
-            project_response = ProjectResponse.from_orm_with_expansions(
-                project, total_tasks, done_tasks, float(total_spent_hours), completion_percentage
-            )
-            result.append(project_response)
-        return result
-    else:
-        result = []
-        for project in projects:
-            total_tasks = db.query(func.count(Task.id)).filter(Task.project_id == project.id).scalar() or 0
-            done_tasks = db.query(func.count(Task.id)).filter(
-                Task.project_id == project.id, 
-                Task.status == TaskStatus.DONE
-            ).scalar() or 0
-            total_spent_hours = db.query(func.coalesce(func.sum(TimeLog.hours), 0)).join(
-                Task, TimeLog.task_id == Task.id
-            ).filter(Task.project_id == project.id).scalar() or 0
-            completion_percentage = calculate_completion_percentage(project)
-            project_data = ProjectResponse(
+    # Per-project metrics for the whole page come from the maintained project_stats rows
+    rows = query.outerjoin(ProjectStats, ProjectStats.project_id == Project.id).add_columns(
+        func.coalesce(ProjectStats.total_tasks, 0),
+        func.coalesce(ProjectStats.done_tasks, 0),
+        func.coalesce(ProjectStats.spent_hours, 0),
+        func.coalesce(ProjectStats.completion_percentage, 0)
+    ).order_by(Project.id).offset(skip).limit(limit).all()
+    
+    result = []
+    for project, total_tasks, done_tasks, total_spent_hours, completion in rows:
+        completion = float(completion)
+        if expand:
+            result.append(ProjectResponse.from_orm_with_expansions(
+                project, int(total_tasks), int(done_tasks), float(total_spent_hours), completion
+            ))
+        else:
+            result.append(ProjectResponse(
                 id=project.id,
                 name=project.name,
                 description=project.description,
+                estimated_hours=project.estimated_hours or 0.0,
                 start_date=project.start_date,
                 end_date=project.end_date,
                 status=project.status,
                 created_by_id=project.created_by_id,
                 created_at=project.created_at,
                 updated_at=project.updated_at,
-                total_tasks=total_tasks,
-                done_tasks=done_tasks,
-                total_spent_hours=float(total_spent_hours)
-            )
-            if hasattr(project_data, 'completion_percentage'):
-                project_data.completion_percentage = completion_percentage
-            else:
-                project_data = project_data.dict()
-                project_data['completion_percentage'] = completion_percentage
-            result.append(project_data)
-        return result
+                total_tasks=int(total_tasks),
+                done_tasks=int(done_tasks),
+                total_spent_hours=float(total_spent_hours),
+                completion_percentage=completion
+            ))
+    return result
 
 @router.get("/{project_id}", response_model=ProjectDetailedResponse)
 def get_project(
@@ -172,7 +187,6 @@ def get_project(
 ):
     """Get project by ID with comprehensive statistics and optional detailed lists"""
     from sqlalchemy.orm import joinedload
-    from sqlalchemy import func
     
     if expand:
         project = db.query(Project).options(
@@ -184,58 +198,78 @@ def get_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Calculate task statistics
-    task_stats = db.query(
-        func.count(Task.id).label('total'),
-        func.count(func.nullif(Task.status != TaskStatus.TODO, True)).label('todo'),
-        func.count(func.nullif(Task.status != TaskStatus.IN_PROGRESS, True)).label('in_progress'),
-        func.count(func.nullif(Task.status != TaskStatus.REVIEW, True)).label('review'),
-        func.count(func.nullif(Task.status != TaskStatus.DONE, True)).label('done')
-    ).filter(Task.project_id == project_id).first()
-    
-    total_tasks = task_stats.total or 0
-    todo_tasks = db.query(func.count(Task.id)).filter(Task.project_id == project_id, Task.status == TaskStatus.TODO).scalar() or 0
-    in_progress_tasks = db.query(func.count(Task.id)).filter(Task.project_id == project_id, Task.status == TaskStatus.IN_PROGRESS).scalar() or 0
-    review_tasks = db.query(func.count(Task.id)).filter(Task.project_id == project_id, Task.status == TaskStatus.REVIEW).scalar() or 0
-    done_tasks = db.query(func.count(Task.id)).filter(Task.project_id == project_id, Task.status == TaskStatus.DONE).scalar() or 0
+    # Task counts and completion come from the maintained project_stats row;
+    # sprints, milestones and phases come with their child counts and are
+    # summarized in Python
+    stats = load_project_stats(db, project_id)
+    total_tasks = stats.total_tasks
+    todo_tasks = stats.todo_tasks
+    in_progress_tasks = stats.in_progress_tasks
+    review_tasks = stats.review_tasks
+    done_tasks = stats.done_tasks
+    
+    sprint_tasks = select(
+        Task.sprint_id, func.count(Task.id).label("task_count")
+    ).where(
+        Task.sprint_id.in_(select(Sprint.id).where(Sprint.project_id == project_id))
+    ).group_by(Task.sprint_id).subquery()
+    sprint_rows = db.query(
+        Sprint, func.coalesce(sprint_tasks.c.task_count, 0)
+    ).outerjoin(sprint_tasks, sprint_tasks.c.sprint_id == Sprint.id).filter(
+        Sprint.project_id == project_id
+    ).order_by(Sprint.id).all()
+    
+    milestone_sprints = select(
+        Sprint.milestone_id, func.count(Sprint.id).label("sprint_count")
+    ).where(
+        Sprint.milestone_id.in_(select(Milestone.id).where(Milestone.project_id == project_id))
+    ).group_by(Sprint.milestone_id).subquery()
+    milestone_rows = db.query(
+        Milestone, func.coalesce(milestone_sprints.c.sprint_count, 0)
+    ).outerjoin(milestone_sprints, milestone_sprints.c.milestone_id == Milestone.id).filter(
+        Milestone.project_id == project_id
+    ).order_by(Milestone.id).all()
+    
+    phase_milestones = select(
+        Milestone.phase_id, func.count(Milestone.id).label("milestone_count")
+    ).where(
+        Milestone.phase_id.in_(select(Phase.id).where(Phase.project_id == project_id))
+    ).group_by(Milestone.phase_id).subquery()
+    phase_rows = db.query(
+        Phase, func.coalesce(phase_milestones.c.milestone_count, 0)
+    ).outerjoin(phase_milestones, phase_milestones.c.phase_id == Phase.id).filter(
+        Phase.project_id == project_id
+    ).order_by(Phase.id).all()
     
     # Calculate sprint statistics
-    total_sprints = db.query(func.count(Sprint.id)).filter(Sprint.project_id == project_id).scalar() or 0
-    planned_sprints = db.query(func.count(Sprint.id)).filter(Sprint.project_id == project_id, Sprint.status == SprintStatus.PLANNED).scalar() or 0
-    active_sprints = db.query(func.count(Sprint.id)).filter(Sprint.project_id == project_id, Sprint.status == SprintStatus.ACTIVE).scalar() or 0
-    completed_sprints = db.query(func.count(Sprint.id)).filter(Sprint.project_id == project_id, Sprint.status == SprintStatus.COMPLETED).scalar() or 0
-    
-    # Calculate sprint estimated hours
-    total_sprint_hours = db.query(func.coalesce(func.sum(Sprint.estimated_hours), 0)).filter(Sprint.project_id == project_id).scalar() or 0
-    planned_sprint_hours = db.query(func.coalesce(func.sum(Sprint.estimated_hours), 0)).filter(
-        Sprint.project_id == project_id, Sprint.status == SprintStatus.PLANNED
-    ).scalar() or 0
-    active_sprint_hours = db.query(func.coalesce(func.sum(Sprint.estimated_hours), 0)).filter(
-        Sprint.project_id == project_id, Sprint.status == SprintStatus.ACTIVE
-    ).scalar() or 0
-    completed_sprint_hours = db.query(func.coalesce(func.sum(Sprint.estimated_hours), 0)).filter(
-        Sprint.project_id == project_id, Sprint.status == SprintStatus.COMPLETED
-    ).scalar() or 0
+    sprint_counts = {sprint_status: 0 for sprint_status in SprintStatus}
+    sprint_hours = {sprint_status: 0.0 for sprint_status in SprintStatus}
+    for sprint, _ in sprint_rows:
+        if sprint.status in sprint_counts:
+            sprint_counts[sprint.status] += 1
+            sprint_hours[sprint.status] += sprint.estimated_hours or 0
+    total_sprints = len(sprint_rows)
+    planned_sprints = sprint_counts[SprintStatus.PLANNED]
+    active_sprints = sprint_counts[SprintStatus.ACTIVE]
+    completed_sprints = sprint_counts[SprintStatus.COMPLETED]
+    total_sprint_hours = sum(sprint.estimated_hours or 0 for sprint, _ in sprint_rows)
+    planned_sprint_hours = sprint_hours[SprintStatus.PLANNED]
+    active_sprint_hours = sprint_hours[SprintStatus.ACTIVE]
+    completed_sprint_hours = sprint_hours[SprintStatus.COMPLETED]
     
     # Calculate milestone statistics
-    total_milestones = db.query(func.count(Milestone.id)).filter(Milestone.project_id == project_id).scalar() or 0
-    completed_milestones = db.query(func.count(Milestone.id)).filter(
-        Milestone.project_id == project_id, 
-        Milestone.completed_at.isnot(None)
-    ).scalar() or 0
+    total_milestones = len(milestone_rows)
+    completed_milestones = sum(1 for milestone, _ in milestone_rows if milestone.completed_at is not None)
     pending_milestones = total_milestones - completed_milestones
-    
-    # Calculate milestone estimated hours
-    total_milestone_hours = db.query(func.coalesce(func.sum(Milestone.estimated_hours), 0)).filter(Milestone.project_id == project_id).scalar() or 0
-    completed_milestone_hours = db.query(func.coalesce(func.sum(Milestone.estimated_hours), 0)).filter(
-        Milestone.project_id == project_id, Milestone.completed_at.isnot(None)
-    ).scalar() or 0
+    total_milestone_hours = sum(milestone.estimated_hours or 0 for milestone, _ in milestone_rows)
+    completed_milestone_hours = sum(
+        milestone.estimated_hours or 0 for milestone, _ in milestone_rows if milestone.completed_at is not None
+    )
     pending_milestone_hours = total_milestone_hours - completed_milestone_hours
     
     # Calculate phase statistics
-    from app.models.phase import Phase
-    total_phases = db.query(func.count(Phase.id)).filter(Phase.project_id == project_id).scalar() or 0
-    total_phase_hours = db.query(func.coalesce(func.sum(Phase.estimated_hours), 0)).filter(Phase.project_id == project_id).scalar() or 0
+    total_phases = len(phase_rows)
+    total_phase_hours = sum(phase.estimated_hours or 0 for phase, _ in phase_rows)
     
     # Calculate percentages
     task_summary = {
@@ -283,112 +317,14 @@ def get_project(
     # Calculate user statistics if requested
     users_summary = None
     if include_users:
-        from sqlalchemy import func
-        
-        # Get all users who have tasks assigned in this project
-        project_users = db.query(User).join(Task, Task.assignee_id == User.id).filter(
-            Task.project_id == project_id
-        ).distinct().all()
-        
-        users_stats = []
-        total_project_hours = 0
-        total_project_story_points = 0
-        
-        for user in project_users:
-            # Get time statistics for this user
-            total_hours = db.query(func.coalesce(func.sum(TimeLog.hours), 0)).join(
-                Task, TimeLog.task_id == Task.id
-            ).filter(
-                TimeLog.user_id == user.id,
-                Task.project_id == project_id
-            ).scalar() or 0
-            
-            # Get story points for this user
-            total_story_points_query = db.query(func.coalesce(func.sum(Task.story_points), 0)).filter(
-                Task.assignee_id == user.id,
-                Task.project_id == project_id
-            ).scalar() or 0
-            
-            # Get task counts for this user
-            tasks_completed = db.query(func.count(Task.id)).filter(
-                Task.assignee_id == user.id,
-                Task.project_id == project_id,
-                Task.status == TaskStatus.DONE
-            ).scalar() or 0
-            
-            tasks_in_progress = db.query(func.count(Task.id)).filter(
-                Task.assignee_id == user.id,
-                Task.project_id == project_id,
-                Task.status == TaskStatus.IN_PROGRESS
-            ).scalar() or 0
-            
-            tasks_total = db.query(func.count(Task.id)).filter(
-                Task.assignee_id == user.id,
-                Task.project_id == project_id
-            ).scalar() or 0
-            
-            full_name = None
-            if user.first_name and user.last_name:
-                full_name = f"{user.first_name} {user.last_name}"
-            elif user.first_name:
-                full_name = user.first_name
-            
-            user_data = {
-                "user_id": user.id,
-                "username": user.username,
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "full_name": full_name,
-                "total_hours": float(total_hours),
-                "total_story_points": int(total_story_points_query),
-                "tasks_completed": int(tasks_completed),
-                "tasks_in_progress": int(tasks_in_progress),
-                "tasks_total": int(tasks_total)
-            }
-            users_stats.append(user_data)
-            total_project_hours += float(total_hours)
-            total_project_story_points += int(total_story_points_query)
-        
+        users_stats = project_user_stats(db, project_id)
         users_summary = {
-            "total_project_hours": round(total_project_hours, 2),
-            "total_project_story_points": total_project_story_points,
+            "total_project_hours": round(sum(user["total_hours"] for user in users_stats), 2),
+            "total_project_story_points": sum(user["total_story_points"] for user in users_stats),
             "active_users_count": len(users_stats),
             "users_stats": users_stats
         }
     
-    # Calculate project completion percentage based on sprints, estimated times, and done tasks
-    project_completion_percentage = 0.0
-    try:
-        # Get project estimated time
-        project_estimated_time = getattr(project, 'estimated_hours', None)
-        
-        if project_estimated_time is None or project_estimated_time == 0:
-            project_completion_percentage = 0.0
-            print(f"Sprinthas no estimated time")
-        else:
-            sprints = db.query(Sprint).filter(Sprint.project_id == project_id).all()
-            sprint_percentages = []
-            for sprint in sprints:
-                sprint_estimated_time = getattr(sprint, 'estimated_hours', None)
-                
-                if sprint_estimated_time is None or sprint_estimated_time == 0:
-                    
-                    continue
-                sprint_tasks = db.query(Task).filter(Task.sprint_id == sprint.id).all()
-                total_sprint_tasks = len(sprint_tasks)
-                if total_sprint_tasks == 0:
-                    continue
-                done_sprint_tasks = sum(1 for t in sprint_tasks if t.status == TaskStatus.DONE)
-                # Calculate sprint's contribution to project completion
-                sprint_contribution = (sprint_estimated_time / project_estimated_time) * (done_sprint_tasks / total_sprint_tasks)
-                sprint_percentages.append(sprint_contribution)
-            if sprint_percentages:
-                project_completion_percentage = round(sum(sprint_percentages) * 100, 2)
-            else:
-                project_completion_percentage = 0.0
-    except Exception:
-        project_completion_percentage = 0.0
-
     # Prepare base response data
     response_data = {
         "id": project.id,
@@ -406,7 +342,7 @@ def get_project(
         "milestone_summary": milestone_summary,
         "phase_summary": phase_summary,
         "users_summary": users_summary,
-        "completion_percentage": project_completion_percentage
+        "completion_percentage": stats.completion_percentage
     }
     
     # Add expanded user data if available
@@ -461,12 +397,8 @@ def get_project(
             }
             task_details.append(task_detail)
         
-        # Get detailed sprint information  
-        sprints = db.query(Sprint).filter(Sprint.project_id == project_id).all()
-        sprint_details = []
-        for sprint in sprints:
-            sprint_task_count = db.query(func.count(Task.id)).filter(Task.sprint_id == sprint.id).scalar() or 0
-            sprint_detail = {
+        sprint_details = [
+            {
                 "id": sprint.id,
                 "name": sprint.name,
                 "description": sprint.description,
@@ -476,17 +408,12 @@ def get_project(
                 "end_date": sprint.end_date,
                 "created_at": sprint.created_at,
                 "updated_at": sprint.updated_at,
-                "task_count": sprint_task_count
-            }
-            sprint_details.append(sprint_detail)
+                "task_count": task_count
+            } for sprint, task_count in sprint_rows
+        ]
         
-        # Get detailed milestone information
-        milestones = db.query(Milestone).filter(Milestone.project_id == project_id).all()
-        milestone_details = []
-        for milestone in milestones:
-            # Count sprints associated with this milestone
-            sprint_count = db.query(func.count(Sprint.id)).filter(Sprint.milestone_id == milestone.id).scalar() or 0
-            milestone_detail = {
+        milestone_details = [
+            {
                 "id": milestone.id,
                 "name": milestone.name,
                 "description": milestone.description,
@@ -497,16 +424,11 @@ def get_project(
                 "updated_at": milestone.updated_at,
                 "sprint_count": sprint_count,
                 "is_completed": milestone.completed_at is not None
-            }
-            milestone_details.append(milestone_detail)
+            } for milestone, sprint_count in milestone_rows
+        ]
         
-        # Get detailed phase information
-        phases = db.query(Phase).filter(Phase.project_id == project_id).all()
-        phase_details = []
-        for phase in phases:
-            # Count milestones associated with this phase
-            milestone_count = db.query(func.count(Milestone.id)).filter(Milestone.phase_id == phase.id).scalar() or 0
-            phase_detail = {
+        phase_details = [
+            {
                 "id": phase.id,
                 "name": phase.name,
                 "description": phase.description,
@@ -516,8 +438,8 @@ def get_project(
                 "created_at": phase.created_at,
                 "updated_at": phase.updated_at,
                 "milestone_count": milestone_count
-            }
-            phase_details.append(phase_detail)
+            } for phase, milestone_count in phase_rows
+        ]
         
         response_data["tasks"] = task_details
         response_data["sprints"] = sprint_details
@@ -705,6 +627,202 @@ def get_project_phases(
     else:
         return phases
 
+HIERARCHY_LEVELS = ("phases", "milestones", "sprints", "tasks")
+# Optional per-node fields; id, name and the rolled-up hours/completion are always included
+HIERARCHY_FIELDS = {
+    "phases": ("description", "start_date", "end_date"),
+    "milestones": ("description", "due_date", "completed_at"),
+    "sprints": ("description", "status", "start_date", "end_date"),
+    "tasks": ("description", "status", "priority", "story_points", "assignee_id", "due_date")
+}
+HIERARCHY_IN_BATCH_SIZE = 500
+
+def hierarchy_fields(fields: Optional[str]) -> Optional[set]:
+    """The requested optional fields (None: all), rejecting unknown names"""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set().union(*HIERARCHY_FIELDS.values())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown hierarchy fields: {', '.join(sorted(unknown))}")
+    return requested
+
+def level_fields(level: str, requested: Optional[set]) -> tuple:
+    return tuple(name for name in HIERARCHY_FIELDS[level] if requested is None or name in requested)
+
+def rows_in_batches(query, column, ids) -> list:
+    """query.filter(column IN ids), a bounded number of ids per statement"""
+    ids = sorted(set(ids))
+    rows = []
+    for start in range(0, len(ids), HIERARCHY_IN_BATCH_SIZE):
+        rows.extend(query.filter(column.in_(ids[start:start + HIERARCHY_IN_BATCH_SIZE])).all())
+    return rows
+
+def logged_hours_by_task(project_id: int):
+    """Grouped subquery of hours logged per task, for the project's tasks"""
+    return select(
+        TimeLog.task_id, func.sum(TimeLog.hours).label("hours")
+    ).join(Task, TimeLog.task_id == Task.id).where(Task.project_id == project_id).group_by(TimeLog.task_id).subquery()
+
+def hierarchy_node(obj, name: str, fields: tuple, estimated_hours: float, actual_hours: float,
+                   completion: float) -> Dict:
+    node = {"id": obj.id, "name": name}
+    for field in fields:
+        value = getattr(obj, field)
+        node[field] = value.value if isinstance(value, enum.Enum) else value
+    node["estimated_hours"] = round(estimated_hours or 0, 2)
+    node["actual_hours"] = round(actual_hours, 2)
+    node["completion_percentage"] = completion
+    return node
+
+def rollup_node(obj, fields: tuple, children: list, child_key: Optional[str]) -> tuple:
+    """(node, logged hours, completed sprint hours) of a phase, milestone or project
+    
+    `children` holds the same triples for the child nodes, which are nested
+    under `child_key` unless it is None (below the requested depth).
+    """
+    actual = sum(child[1] for child in children)
+    done = sum(child[2] for child in children)
+    node = hierarchy_node(obj, obj.name, fields, obj.estimated_hours, actual,
+                          completion_percentage(obj.estimated_hours, done))
+    if child_key is not None:
+        node[child_key] = [child[0] for child in children]
+    return node, actual, done
+
+def load_project_tasks(db: Session, project_id: int, sprint_ids: set, fields: tuple) -> Dict[Optional[int], list]:
+    """Task rows with their logged hours, grouped by sprint (None: outside the sprints in the tree)"""
+    logged = logged_hours_by_task(project_id)
+    rows = db.query(Task, func.coalesce(logged.c.hours, 0)).options(load_only(
+        Task.id, Task.title, Task.sprint_id, Task.status, Task.estimated_hours,
+        *[getattr(Task, name) for name in fields]
+    )).outerjoin(logged, logged.c.task_id == Task.id).filter(
+        Task.project_id == project_id
+    ).order_by(Task.id).all()
+    by_sprint = {}
+    for task, hours in rows:
+        key = task.sprint_id if task.sprint_id in sprint_ids else None
+        by_sprint.setdefault(key, []).append((task, float(hours)))
+    return by_sprint
+
+def task_totals(rows) -> tuple:
+    """(tasks, done tasks, logged hours, estimated hours) of loaded task rows"""
+    return (
+        len(rows), sum(1 for task, _ in rows if task.status == TaskStatus.DONE),
+        sum(hours for _, hours in rows), sum(task.estimated_hours or 0 for task, _ in rows)
+    )
+
+def project_task_totals(db: Session, project_id: int, sprint_ids: set) -> Dict[Optional[int], tuple]:
+    """task_totals per sprint (None: outside the sprints in the tree), without loading the tasks"""
+    logged = logged_hours_by_task(project_id)
+    totals = {}
+    for row in db.query(
+        Task.sprint_id,
+        func.count(Task.id),
+        func.sum(case((Task.status == TaskStatus.DONE, 1), else_=0)),
+        func.coalesce(func.sum(logged.c.hours), 0),
+        func.coalesce(func.sum(Task.estimated_hours), 0)
+    ).outerjoin(logged, logged.c.task_id == Task.id).filter(
+        Task.project_id == project_id
+    ).group_by(Task.sprint_id).all():
+        key = row[0] if row[0] in sprint_ids else None
+        previous = totals.get(key, (0, 0, 0.0, 0.0))
+        totals[key] = (previous[0] + row[1], previous[1] + int(row[2] or 0),
+                       previous[2] + float(row[3]), previous[3] + float(row[4]))
+    return totals
+
+@router.get("/{project_id}/hierarchy")
+def get_project_hierarchy(
+    project_id: int,
+    depth: int = Query(4, ge=0, le=4, description="Levels below the project: phases, milestones, sprints, tasks"),
+    fields: Optional[str] = Query(None, description="Comma-separated optional node fields to include (default: all)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    The project's phase -> milestone -> sprint -> task tree in one response
+    
+    Each level is loaded with one query (tasks by project, the rest in IN
+    batches of parent ids) and the tree is assembled in memory. Every node
+    carries its own estimate, the hours logged on the tasks below it and a
+    completion percentage: tasks are 0 or 100, sprints the share of done
+    tasks, and higher levels the estimated sprint hours completed over the
+    node's own estimate (as for the project completion percentage). Tasks
+    outside the tree's sprints (backlog work, or sprints not under a
+    milestone) are grouped in an `unscheduled` node beside the phases, so
+    the project's logged hours cover all of its tasks. Rollups always cover
+    the whole tree; `depth` only limits the nodes returned.
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    requested = hierarchy_fields(fields)
+    phase_fields, milestone_fields, sprint_fields, task_fields = (
+        level_fields(level, requested) for level in HIERARCHY_LEVELS
+    )
+    
+    phases = db.query(Phase).options(load_only(
+        Phase.id, Phase.name, Phase.estimated_hours, *[getattr(Phase, name) for name in phase_fields]
+    )).filter(Phase.project_id == project_id).order_by(Phase.id).all()
+    milestones = rows_in_batches(db.query(Milestone).options(load_only(
+        Milestone.id, Milestone.name, Milestone.phase_id, Milestone.estimated_hours,
+        *[getattr(Milestone, name) for name in milestone_fields]
+    )).order_by(Milestone.id), Milestone.phase_id, [phase.id for phase in phases])
+    sprints = rows_in_batches(db.query(Sprint).options(load_only(
+        Sprint.id, Sprint.name, Sprint.milestone_id, Sprint.estimated_hours,
+        *[getattr(Sprint, name) for name in sprint_fields]
+    )).order_by(Sprint.id), Sprint.milestone_id, [milestone.id for milestone in milestones])
+    sprint_ids = {sprint.id for sprint in sprints}
+    
+    task_nodes = {}
+    if depth >= 4:
+        totals = {}
+        for sprint_id, rows in load_project_tasks(db, project_id, sprint_ids, task_fields).items():
+            task_nodes[sprint_id] = [
+                hierarchy_node(task, task.title, task_fields, task.estimated_hours, hours,
+                               100.0 if task.status == TaskStatus.DONE else 0.0)
+                for task, hours in rows
+            ]
+            totals[sprint_id] = task_totals(rows)
+    else:
+        totals = project_task_totals(db, project_id, sprint_ids)
+    
+    # Assemble bottom-up as (node, logged hours, completed sprint hours)
+    sprint_nodes = {}
+    for sprint in sprints:
+        task_count, done_count, logged, _ = totals.get(sprint.id, (0, 0, 0.0, 0.0))
+        node = hierarchy_node(sprint, sprint.name, sprint_fields, sprint.estimated_hours, logged,
+                              round(done_count / task_count * 100, 2) if task_count else 0.0)
+        if depth >= 4:
+            node["tasks"] = task_nodes.get(sprint.id, [])
+        done = (sprint.estimated_hours or 0) * done_count / task_count if task_count else 0.0
+        sprint_nodes.setdefault(sprint.milestone_id, []).append((node, logged, done))
+    
+    milestone_nodes = {}
+    for milestone in milestones:
+        milestone_nodes.setdefault(milestone.phase_id, []).append(rollup_node(
+            milestone, milestone_fields, sprint_nodes.get(milestone.id, []), "sprints" if depth >= 3 else None
+        ))
+    phase_nodes = [
+        rollup_node(phase, phase_fields, milestone_nodes.get(phase.id, []), "milestones" if depth >= 2 else None)
+        for phase in phases
+    ]
+    # Unscheduled tasks have no sprint estimate, so they add logged hours but no completed hours
+    task_count, done_count, logged, estimated = totals.get(None, (0, 0, 0.0, 0.0))
+    unscheduled = {
+        "name": "Unscheduled",
+        "estimated_hours": round(estimated, 2),
+        "actual_hours": round(logged, 2),
+        "completion_percentage": round(done_count / task_count * 100, 2) if task_count else 0.0
+    }
+    if depth >= 4:
+        unscheduled["tasks"] = task_nodes.get(None, [])
+    root, _, _ = rollup_node(project, (), phase_nodes + [(unscheduled, logged, 0.0)], None)
+    if depth >= 1:
+        root["phases"] = [node for node, _, _ in phase_nodes]
+        root["unscheduled"] = unscheduled
+    root["depth"] = depth
+    return root
+
 @router.get("/{project_id}/users")
 def get_project_users(
     project_id: int,
@@ -712,97 +830,17 @@ def get_project_users(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all users working on a project with their statistics"""
-    from sqlalchemy import func
-    
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Get all users who have tasks assigned in this project
-    project_users = db.query(User).join(Task, Task.assignee_id == User.id).filter(
-        Task.project_id == project_id
-    ).distinct().all()
-    
-    users_stats = []
-    total_project_hours = 0
-    total_project_story_points = 0
-    
-    for user in project_users:
-        # Get time statistics for this user
-        total_hours = db.query(func.coalesce(func.sum(TimeLog.hours), 0)).join(
-            Task, TimeLog.task_id == Task.id
-        ).filter(
-            TimeLog.user_id == user.id,
-            Task.project_id == project_id
-        ).scalar() or 0
-        
-        # Get story points for this user
-        total_story_points_query = db.query(func.coalesce(func.sum(Task.story_points), 0)).filter(
-            Task.assignee_id == user.id,
-            Task.project_id == project_id
-        ).scalar() or 0
-        
-        # Get task counts for this user
-        tasks_completed = db.query(func.count(Task.id)).filter(
-            Task.assignee_id == user.id,
-            Task.project_id == project_id,
-            Task.status == TaskStatus.DONE
-        ).scalar() or 0
-        
-        tasks_in_progress = db.query(func.count(Task.id)).filter(
-            Task.assignee_id == user.id,
-            Task.project_id == project_id,
-            Task.status == TaskStatus.IN_PROGRESS
-        ).scalar() or 0
-        
-        tasks_todo = db.query(func.count(Task.id)).filter(
-            Task.assignee_id == user.id,
-            Task.project_id == project_id,
-            Task.status == TaskStatus.TODO
-        ).scalar() or 0
-        
-        tasks_review = db.query(func.count(Task.id)).filter(
-            Task.assignee_id == user.id,
-            Task.project_id == project_id,
-            Task.status == TaskStatus.REVIEW
-        ).scalar() or 0
-        
-        tasks_total = db.query(func.count(Task.id)).filter(
-            Task.assignee_id == user.id,
-            Task.project_id == project_id
-        ).scalar() or 0
-        
-        full_name = None
-        if user.first_name and user.last_name:
-            full_name = f"{user.first_name} {user.last_name}"
-        elif user.first_name:
-            full_name = user.first_name
-        
-        user_data = {
-            "user_id": user.id,
-            "username": user.username,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "full_name": full_name,
-            "email": user.email,
-            "role": user.role.value,
-            "total_hours": float(total_hours),
-            "total_story_points": int(total_story_points_query),
-            "tasks_completed": int(tasks_completed),
-            "tasks_in_progress": int(tasks_in_progress),
-            "tasks_todo": int(tasks_todo),
-            "tasks_review": int(tasks_review),
-            "tasks_total": int(tasks_total)
-        }
-        users_stats.append(user_data)
-        total_project_hours += float(total_hours)
-        total_project_story_points += int(total_story_points_query)
+    users_stats = project_user_stats(db, project_id)
     
     return {
         "project_id": project_id,
         "project_name": project.name,
-        "total_project_hours": round(total_project_hours, 2),
-        "total_project_story_points": total_project_story_points,
+        "total_project_hours": round(sum(user["total_hours"] for user in users_stats), 2),
+        "total_project_story_points": sum(user["total_story_points"] for user in users_stats),
         "active_users_count": len(users_stats),
         "users_stats": users_stats
     }
@@ -4,16 +4,17 @@ Comprehensive reporting endpoints for analytics and insights
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, case
 from datetime import datetime, date, timedelta
 
 from app.core.database import get_db
 from app.core.auth import get_current_active_user
+from app.core.report_cache import cached_report
 from app.models.user import User
 from app.models.project import Project
 from app.models.task import Task
-from app.models.team import Team
+from app.models.team import Team, team_members, team_projects
 from app.models.time_log import TimeLog
 from app.models.completed_sp import CompletedStoryPoints
 from app.models.enums import UserRole, TaskStatus
@@ -27,54 +28,103 @@ from app.schemas.reports import (
 
 router = APIRouter()
 
+# Tables each cached report reads; writes to them invalidate the cached result
+TIME_REPORT_TABLES = ("time_logs", "tasks", "projects", "users", "team_members", "team_projects", "teams")
+STORY_POINTS_REPORT_TABLES = (
+    "completed_story_points", "tasks", "projects", "users", "team_members", "team_projects", "teams"
+)
+TEAM_REPORT_TABLES = (
+    "teams", "team_members", "team_projects", "users", "time_logs", "completed_story_points", "tasks"
+)
+DASHBOARD_REPORT_TABLES = (
+    "time_logs", "completed_story_points", "tasks", "projects", "users", "teams", "team_members", "team_projects"
+)
+
+# Descriptions written by the live timer endpoints and the stale-timer sweeper
+TIMER_LOG_PREFIXES = ("Live timer session", "Auto-stopped timer session")
+
 def get_accessible_projects(user: User, db: Session) -> List[int]:
     """Get list of project IDs accessible by the user"""
     if user.role in [UserRole.ADMIN, UserRole.PROJECT_MANAGER]:
-        return [p.id for p in db.query(Project).all()]
+        return [project_id for (project_id,) in db.query(Project.id).all()]
     elif user.role == UserRole.TEAM_LEADER:
         # Get projects assigned to teams led by this user
-        teams = db.query(Team).filter(Team.team_leader_id == user.id).all()
-        project_ids = []
-        for team in teams:
-            project_ids.extend([p.id for p in team.projects])
-        return list(set(project_ids))
+        rows = db.query(team_projects.c.project_id).join(
+            Team, Team.id == team_projects.c.team_id
+        ).filter(Team.team_leader_id == user.id).distinct().all()
     else:
         # Regular users - only projects where they're team members
-        teams = db.query(Team).join(Team.members).filter(User.id == user.id).all()
-        project_ids = []
-        for team in teams:
-            project_ids.extend([p.id for p in team.projects])
-        return list(set(project_ids))
+        rows = db.query(team_projects.c.project_id).join(
+            team_members, team_members.c.team_id == team_projects.c.team_id
+        ).filter(team_members.c.user_id == user.id).distinct().all()
+    return [project_id for (project_id,) in rows]
 
-def apply_report_filters(query, filters: ReportFilters, time_log_alias=None):
-    """Apply common filters to queries"""
+def time_log_conditions(filters: ReportFilters, accessible_projects: List[int]) -> list:
+    """SQL conditions selecting the time logs covered by a report (TimeLog joined to Task)"""
+    conditions = [Task.project_id.in_(accessible_projects)]
     if filters.project_id:
-        if time_log_alias:
-            # For time log queries, filter through task
-            query = query.join(Task).filter(Task.project_id == filters.project_id)
-        else:
-            query = query.filter(Project.id == filters.project_id)
-    
+        conditions.append(Task.project_id == filters.project_id)
     if filters.user_id:
-        query = query.filter(User.id == filters.user_id)
-    
+        conditions.append(TimeLog.user_id == filters.user_id)
+    if filters.team_id:
+        conditions.append(TimeLog.user_id.in_(
+            select(team_members.c.user_id).where(team_members.c.team_id == filters.team_id)
+        ))
     if filters.start_date:
-        start_datetime = datetime.combine(filters.start_date, datetime.min.time())
-        if time_log_alias:
-            query = query.filter(TimeLog.start_time >= start_datetime)
-        else:
-            query = query.filter(Task.created_at >= start_datetime)
-    
+        conditions.append(TimeLog.date >= datetime.combine(filters.start_date, datetime.min.time()))
     if filters.end_date:
-        end_datetime = datetime.combine(filters.end_date, datetime.max.time())
-        if time_log_alias:
-            query = query.filter(TimeLog.start_time <= end_datetime)
-        else:
-            query = query.filter(Task.created_at <= end_datetime)
-    
-    return query
+        conditions.append(TimeLog.date <= datetime.combine(filters.end_date, datetime.max.time()))
+    return conditions
+
+def as_date(value) -> date:
+    """Normalise a SQL date() result (a string on SQLite) to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+def hours_to_minutes(hours) -> int:
+    return int(round((hours or 0) * 60))
+
+def time_log_type(description: Optional[str]) -> str:
+    """Time logs produced by the live timer carry a recognisable description"""
+    if description and description.startswith(TIMER_LOG_PREFIXES):
+        return "Timer"
+    return "Manual"
+
+def recent_time_log_reports(db: Session, conditions: list, limit: int) -> List[TimeLogReport]:
+    """Latest time logs matching `conditions`, selecting only the columns the report needs"""
+    rows = db.query(
+        TimeLog.date,
+        TimeLog.hours,
+        TimeLog.description,
+        User.first_name,
+        User.last_name,
+        Project.name.label("project_name"),
+        Task.title.label("task_title")
+    ).select_from(TimeLog).join(Task, TimeLog.task_id == Task.id).join(
+        Project, Task.project_id == Project.id
+    ).join(User, TimeLog.user_id == User.id).filter(*conditions).order_by(
+        TimeLog.date.desc(), TimeLog.id.desc()
+    ).limit(limit).all()
+    
+    return [
+        TimeLogReport(
+            date=row.date,
+            user_name=f"{row.first_name} {row.last_name}",
+            project_name=row.project_name,
+            task_title=row.task_title,
+            duration_minutes=hours_to_minutes(row.hours),
+            duration_hours=round(row.hours or 0, 2),
+            log_type=time_log_type(row.description),
+            description=row.description
+        )
+        for row in rows
+    ]
 
 @router.get("/time-logs", response_model=TimeReportResponse)
+@cached_report("reports.time-logs", TIME_REPORT_TABLES, get_accessible_projects)
 def get_time_report(
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
@@ -82,10 +132,15 @@ def get_time_report(
     start_date: Optional[date] = Query(None, description="Filter from date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="Filter to date (YYYY-MM-DD)"),
     include_details: bool = Query(True, description="Include detailed time logs"),
+    details_limit: int = Query(100, ge=1, le=1000, description="Number of most recent time logs to include"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get comprehensive time tracking report"""
+    """Get comprehensive time tracking report
+
+    All totals are computed with grouped SQL queries; only the most recent
+    `details_limit` logs are loaded as rows.
+    """
     filters = ReportFilters(
         project_id=project_id,
         user_id=user_id,
@@ -97,97 +152,73 @@ def get_time_report(
     # Get accessible projects for permission filtering
     accessible_projects = get_accessible_projects(current_user, db)
     
-    # Base query for time logs
-    time_logs_query = db.query(TimeLog).join(Task).join(Project).join(User)
-    
-    # Apply permission filtering
-    time_logs_query = time_logs_query.filter(Project.id.in_(accessible_projects))
+    conditions = time_log_conditions(filters, accessible_projects)
     
-    # Apply filters
-    if filters.project_id:
-        time_logs_query = time_logs_query.filter(Task.project_id == filters.project_id)
-    if filters.user_id:
-        time_logs_query = time_logs_query.filter(TimeLog.user_id == filters.user_id)
-    if filters.team_id:
-        # Filter by team members
-        team_user_ids = db.query(User.id).join(Team.members).filter(Team.id == filters.team_id).subquery()
-        time_logs_query = time_logs_query.filter(TimeLog.user_id.in_(team_user_ids))
-    if filters.start_date:
-        start_datetime = datetime.combine(filters.start_date, datetime.min.time())
-        time_logs_query = time_logs_query.filter(TimeLog.start_time >= start_datetime)
-    if filters.end_date:
-        end_datetime = datetime.combine(filters.end_date, datetime.max.time())
-        time_logs_query = time_logs_query.filter(TimeLog.start_time <= end_datetime)
-    
-    time_logs = time_logs_query.options(
-        joinedload(TimeLog.user),
-        joinedload(TimeLog.task).joinedload(Task.project)
-    ).all()
-    
-    # Calculate summary stats
-    total_minutes = sum(log.duration_minutes or 0 for log in time_logs)
-    total_hours = round(total_minutes / 60, 2)
-    
-    # Project time stats
-    project_stats = {}
-    for log in time_logs:
-        project_name = log.task.project.name
-        if project_name not in project_stats:
-            project_stats[project_name] = {
-                'total_minutes': 0,
-                'users': set(),
-                'tasks': set()
-            }
-        project_stats[project_name]['total_minutes'] += log.duration_minutes or 0
-        project_stats[project_name]['users'].add(log.user.id)
-        project_stats[project_name]['tasks'].add(log.task.id)
+    # Per-project totals
+    project_rows = db.query(
+        Project.id,
+        Project.name,
+        func.coalesce(func.sum(TimeLog.hours), 0).label("hours"),
+        func.count(TimeLog.id).label("entries"),
+        func.count(func.distinct(TimeLog.task_id)).label("task_count"),
+        func.count(func.distinct(TimeLog.user_id)).label("user_count")
+    ).select_from(TimeLog).join(Task, TimeLog.task_id == Task.id).join(
+        Project, Task.project_id == Project.id
+    ).filter(*conditions).group_by(Project.id, Project.name).all()
     
     project_time_stats = [
         ProjectTimeStats(
-            project_name=name,
-            total_minutes=stats['total_minutes'],
-            total_hours=round(stats['total_minutes'] / 60, 2),
-            task_count=len(stats['tasks']),
-            user_count=len(stats['users'])
+            project_id=row.id,
+            project_name=row.name,
+            total_minutes=hours_to_minutes(row.hours),
+            total_hours=round(row.hours, 2),
+            task_count=row.task_count,
+            user_count=row.user_count
         )
-        for name, stats in project_stats.items()
+        for row in project_rows
     ]
     
-    # User time stats
-    user_stats = {}
-    for log in time_logs:
-        user_name = f"{log.user.first_name} {log.user.last_name}"
-        if user_name not in user_stats:
-            user_stats[user_name] = {
-                'total_minutes': 0,
-                'projects': set(),
-                'tasks': set()
-            }
-        user_stats[user_name]['total_minutes'] += log.duration_minutes or 0
-        user_stats[user_name]['projects'].add(log.task.project.id)
-        user_stats[user_name]['tasks'].add(log.task.id)
+    # Per-user totals
+    user_rows = db.query(
+        User.id,
+        User.first_name,
+        User.last_name,
+        func.coalesce(func.sum(TimeLog.hours), 0).label("hours"),
+        func.count(func.distinct(TimeLog.task_id)).label("task_count"),
+        func.count(func.distinct(Task.project_id)).label("project_count")
+    ).select_from(TimeLog).join(Task, TimeLog.task_id == Task.id).join(
+        User, TimeLog.user_id == User.id
+    ).filter(*conditions).group_by(User.id, User.first_name, User.last_name).all()
     
     user_time_stats = [
         UserTimeStats(
-            user_name=name,
-            total_minutes=stats['total_minutes'],
-            total_hours=round(stats['total_minutes'] / 60, 2),
-            task_count=len(stats['tasks']),
-            project_count=len(stats['projects'])
+            user_id=row.id,
+            user_name=f"{row.first_name} {row.last_name}",
+            total_minutes=hours_to_minutes(row.hours),
+            total_hours=round(row.hours, 2),
+            task_count=row.task_count,
+            project_count=row.project_count
         )
-        for name, stats in user_stats.items()
+        for row in user_rows
     ]
     
     # Weekly trend (last 7 days)
-    weekly_data = []
     today = date.today()
+    trend_start = today - timedelta(days=6)
+    log_day = func.date(TimeLog.date)
+    day_rows = db.query(
+        log_day.label("day"),
+        func.coalesce(func.sum(TimeLog.hours), 0).label("hours")
+    ).select_from(TimeLog).join(Task, TimeLog.task_id == Task.id).filter(
+        *conditions,
+        TimeLog.date >= datetime.combine(trend_start, datetime.min.time())
+    ).group_by(log_day).all()
+    hours_by_day = {as_date(row.day): row.hours for row in day_rows}
+    
+    weekly_data = []
     for i in range(6, -1, -1):
         day = today - timedelta(days=i)
-        day_minutes = sum(
-            log.duration_minutes or 0 
-            for log in time_logs 
-            if log.start_time.date() == day
-        )
+        day_minutes = hours_to_minutes(hours_by_day.get(day, 0))
         weekly_data.append(WeeklyTrendData(
             date=day,
             hours=round(day_minutes / 60, 1),
@@ -197,25 +228,17 @@ def get_time_report(
     # Detailed logs
     detailed_logs = []
     if include_details:
-        for log in time_logs[-100:]:  # Last 100 entries
-            detailed_logs.append(TimeLogReport(
-                date=log.start_time,
-                user_name=f"{log.user.first_name} {log.user.last_name}",
-                project_name=log.task.project.name,
-                task_title=log.task.title,
-                duration_minutes=log.duration_minutes or 0,
-                duration_hours=round((log.duration_minutes or 0) / 60, 2),
-                log_type="Manual" if log.is_manual else "Timer",
-                description=log.description
-            ))
+        detailed_logs = recent_time_log_reports(db, conditions, details_limit)
+    
+    total_hours = sum(row.hours for row in project_rows)
     
     return TimeReportResponse(
         summary={
-            "total_hours": total_hours,
-            "total_minutes": total_minutes,
-            "entries_count": len(time_logs),
-            "projects_count": len(project_stats),
-            "users_count": len(user_stats)
+            "total_hours": round(total_hours, 2),
+            "total_minutes": hours_to_minutes(total_hours),
+            "entries_count": sum(row.entries for row in project_rows),
+            "projects_count": len(project_rows),
+            "users_count": len(user_rows)
         },
         project_stats=project_time_stats,
         user_stats=user_time_stats,
@@ -225,6 +248,7 @@ def get_time_report(
     )
 
 @router.get("/story-points", response_model=StoryPointsReportResponse)
+@cached_report("reports.story-points", STORY_POINTS_REPORT_TABLES, get_accessible_projects)
 def get_story_points_report(
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
@@ -234,7 +258,11 @@ def get_story_points_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get story points completion report"""
+    """Get story points completion report
+
+    Runs a fixed number of grouped queries regardless of how many projects
+    and users are involved; all groupings are keyed by id.
+    """
     filters = ReportFilters(
         project_id=project_id,
         user_id=user_id,
@@ -246,131 +274,136 @@ def get_story_points_report(
     # Get accessible projects
     accessible_projects = get_accessible_projects(current_user, db)
     
-    # Get completed story points
-    completed_query = db.query(CompletedStoryPoints).join(Project).join(User)
-    completed_query = completed_query.filter(Project.id.in_(accessible_projects))
-    
-    # Apply filters
+    completion_conditions = [CompletedStoryPoints.project_id.in_(accessible_projects)]
     if filters.project_id:
-        completed_query = completed_query.filter(CompletedStoryPoints.project_id == filters.project_id)
+        completion_conditions.append(CompletedStoryPoints.project_id == filters.project_id)
     if filters.user_id:
-        completed_query = completed_query.filter(CompletedStoryPoints.user_id == filters.user_id)
+        completion_conditions.append(CompletedStoryPoints.user_id == filters.user_id)
     if filters.team_id:
-        team_user_ids = db.query(User.id).join(Team.members).filter(Team.id == filters.team_id).subquery()
-        completed_query = completed_query.filter(CompletedStoryPoints.user_id.in_(team_user_ids))
+        completion_conditions.append(CompletedStoryPoints.user_id.in_(
+            select(team_members.c.user_id).where(team_members.c.team_id == filters.team_id)
+        ))
     if filters.start_date:
         start_datetime = datetime.combine(filters.start_date, datetime.min.time())
-        completed_query = completed_query.filter(CompletedStoryPoints.completed_at >= start_datetime)
+        completion_conditions.append(CompletedStoryPoints.completed_at >= start_datetime)
     if filters.end_date:
         end_datetime = datetime.combine(filters.end_date, datetime.max.time())
-        completed_query = completed_query.filter(CompletedStoryPoints.completed_at <= end_datetime)
-    
-    completed_points = completed_query.options(
-        joinedload(CompletedStoryPoints.project),
-        joinedload(CompletedStoryPoints.user),
-        joinedload(CompletedStoryPoints.task)
-    ).all()
-    
-    # Calculate project stats
-    project_stats = {}
-    for cp in completed_points:
-        project_name = cp.project.name
-        if project_name not in project_stats:
-            project_stats[project_name] = {
-                'completed_points': 0,
-                'completed_tasks': 0,
-                'total_planned': 0,
-                'active_tasks': 0
-            }
-        project_stats[project_name]['completed_points'] += cp.story_points
-        project_stats[project_name]['completed_tasks'] += 1
-    
-    # Get planned points for each project
-    for project_name in project_stats.keys():
-        project = db.query(Project).filter(Project.name == project_name).first()
-        if project:
-            # Get all tasks in project with story points
-            tasks = db.query(Task).filter(
-                Task.project_id == project.id,
-                Task.story_points.isnot(None)
-            ).all()
-            
-            project_stats[project_name]['total_planned'] = sum(t.story_points for t in tasks)
-            project_stats[project_name]['active_tasks'] = len([t for t in tasks if t.status != TaskStatus.DONE])
-    
-    project_story_stats = [
-        ProjectStoryStats(
-            project_name=name,
-            total_points_planned=stats['total_planned'],
-            total_points_completed=stats['completed_points'],
-            completion_rate=round((stats['completed_points'] / stats['total_planned'] * 100) if stats['total_planned'] > 0 else 0, 1),
-            active_tasks=stats['active_tasks'],
-            completed_tasks=stats['completed_tasks']
-        )
-        for name, stats in project_stats.items()
-    ]
+        completion_conditions.append(CompletedStoryPoints.completed_at <= end_datetime)
+    
+    # Completed points per project
+    completed_by_project = db.query(
+        Project.id,
+        Project.name,
+        func.coalesce(func.sum(CompletedStoryPoints.story_points), 0).label("points"),
+        func.count(CompletedStoryPoints.id).label("completions")
+    ).select_from(CompletedStoryPoints).join(
+        Project, CompletedStoryPoints.project_id == Project.id
+    ).filter(*completion_conditions).group_by(Project.id, Project.name).all()
+    
+    # Completed points per user
+    completed_by_user = db.query(
+        User.id,
+        User.first_name,
+        User.last_name,
+        func.coalesce(func.sum(CompletedStoryPoints.story_points), 0).label("points"),
+        func.count(CompletedStoryPoints.id).label("completions")
+    ).select_from(CompletedStoryPoints).join(
+        User, CompletedStoryPoints.user_id == User.id
+    ).filter(
+        *completion_conditions
+    ).group_by(User.id, User.first_name, User.last_name).all()
+    
+    project_ids = [row.id for row in completed_by_project]
+    user_ids = [row.id for row in completed_by_user]
+    active_task = case((Task.status != TaskStatus.DONE, 1), else_=0)
+    
+    # Planned points and active tasks, keyed by id
+    planned_by_project = {
+        row.project_id: row
+        for row in db.query(
+            Task.project_id,
+            func.coalesce(func.sum(Task.story_points), 0).label("planned"),
+            func.coalesce(func.sum(active_task), 0).label("active")
+        ).filter(
+            Task.project_id.in_(project_ids),
+            Task.story_points.isnot(None)
+        ).group_by(Task.project_id).all()
+    } if project_ids else {}
+    
+    planned_by_user = {
+        row.assignee_id: row
+        for row in db.query(
+            Task.assignee_id,
+            func.coalesce(func.sum(Task.story_points), 0).label("planned"),
+            func.coalesce(func.sum(active_task), 0).label("active")
+        ).filter(
+            Task.assignee_id.in_(user_ids),
+            Task.story_points.isnot(None),
+            Task.project_id.in_(accessible_projects)
+        ).group_by(Task.assignee_id).all()
+    } if user_ids else {}
+    
+    project_story_stats = []
+    for row in completed_by_project:
+        planned = planned_by_project.get(row.id)
+        total_planned = planned.planned if planned else 0
+        project_story_stats.append(ProjectStoryStats(
+            project_id=row.id,
+            project_name=row.name,
+            total_points_planned=total_planned,
+            total_points_completed=row.points,
+            completion_rate=round((row.points / total_planned * 100) if total_planned > 0 else 0, 1),
+            active_tasks=planned.active if planned else 0,
+            completed_tasks=row.completions
+        ))
     
-    # Calculate user performance
-    user_performance = {}
-    for cp in completed_points:
-        user_name = f"{cp.user.first_name} {cp.user.last_name}"
-        if user_name not in user_performance:
-            user_performance[user_name] = {
-                'completed_points': 0,
-                'completed_tasks': 0,
-                'planned_points': 0,
-                'active_tasks': 0
-            }
-        user_performance[user_name]['completed_points'] += cp.story_points
-        user_performance[user_name]['completed_tasks'] += 1
-    
-    # Get planned points for each user
-    for user_name in user_performance.keys():
-        user = db.query(User).filter(
-            func.concat(User.first_name, ' ', User.last_name) == user_name
-        ).first()
-        if user:
-            tasks = db.query(Task).filter(
-                Task.assignee_id == user.id,
-                Task.story_points.isnot(None),
-                Task.project_id.in_(accessible_projects)
-            ).all()
-            
-            user_performance[user_name]['planned_points'] = sum(t.story_points for t in tasks)
-            user_performance[user_name]['active_tasks'] = len([t for t in tasks if t.status != TaskStatus.DONE])
-    
-    user_story_performance = [
-        UserStoryPerformance(
-            user_name=name,
-            planned_points=stats['planned_points'],
-            completed_points=stats['completed_points'],
-            completion_rate=round((stats['completed_points'] / stats['planned_points'] * 100) if stats['planned_points'] > 0 else 0, 1),
-            active_tasks=stats['active_tasks'],
-            completed_tasks=stats['completed_tasks']
-        )
-        for name, stats in user_performance.items()
-    ]
+    user_story_performance = []
+    for row in completed_by_user:
+        planned = planned_by_user.get(row.id)
+        planned_points = planned.planned if planned else 0
+        user_story_performance.append(UserStoryPerformance(
+            user_id=row.id,
+            user_name=f"{row.first_name} {row.last_name}",
+            planned_points=planned_points,
+            completed_points=row.points,
+            completion_rate=round((row.points / planned_points * 100) if planned_points > 0 else 0, 1),
+            active_tasks=planned.active if planned else 0,
+            completed_tasks=row.completions
+        ))
+    
+    # Detailed completions (last 50 entries)
+    recent_completions = db.query(
+        CompletedStoryPoints.story_points,
+        CompletedStoryPoints.completed_at,
+        User.first_name,
+        User.last_name,
+        Project.name.label("project_name"),
+        Task.title.label("task_title")
+    ).select_from(CompletedStoryPoints).join(
+        Project, CompletedStoryPoints.project_id == Project.id
+    ).join(User, CompletedStoryPoints.user_id == User.id).outerjoin(
+        Task, CompletedStoryPoints.task_id == Task.id
+    ).filter(*completion_conditions).order_by(
+        CompletedStoryPoints.completed_at.desc(), CompletedStoryPoints.id.desc()
+    ).limit(50).all()
     
-    # Detailed completions
     detailed_completions = [
         StoryPointsReport(
-            user_name=f"{cp.user.first_name} {cp.user.last_name}",
-            project_name=cp.project.name,
-            task_title=cp.task.title if cp.task else "Unknown Task",
-            story_points=cp.story_points,
-            completed_at=cp.completed_at
+            user_name=f"{row.first_name} {row.last_name}",
+            project_name=row.project_name,
+            task_title=row.task_title or "Unknown Task",
+            story_points=row.story_points,
+            completed_at=row.completed_at
         )
-        for cp in completed_points[-50:]  # Last 50 entries
+        for row in recent_completions
     ]
     
-    total_completed = sum(cp.story_points for cp in completed_points)
-    
     return StoryPointsReportResponse(
         summary={
-            "total_story_points_completed": total_completed,
-            "completions_count": len(completed_points),
-            "projects_count": len(project_stats),
-            "users_count": len(user_performance)
+            "total_story_points_completed": sum(row.points for row in completed_by_project),
+            "completions_count": sum(row.completions for row in completed_by_project),
+            "projects_count": len(completed_by_project),
+            "users_count": len(completed_by_user)
         },
         project_stats=project_story_stats,
         user_performance=user_story_performance,
@@ -379,6 +412,7 @@ def get_story_points_report(
     )
 
 @router.get("/teams", response_model=TeamReportResponse)
+@cached_report("reports.teams", TEAM_REPORT_TABLES, get_accessible_projects, per_user=True)
 def get_team_report(
     team_id: Optional[int] = Query(None, description="Filter by specific team"),
     project_id: Optional[int] = Query(None, description="Filter by project"),
@@ -387,7 +421,11 @@ def get_team_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get team productivity report"""
+    """Get team productivity report
+
+    Every metric is one grouped query joined through team_members, so the
+    cost grows with the number of teams rather than their activity.
+    """
     if current_user.role not in [UserRole.ADMIN, UserRole.PROJECT_MANAGER, UserRole.TEAM_LEADER]:
         raise HTTPException(status_code=403, detail="Access denied")
     
@@ -399,86 +437,110 @@ def get_team_report(
     )
     
     # Get teams based on user role
-    teams_query = db.query(Team)
+    teams_query = db.query(
+        Team.id,
+        Team.name,
+        User.first_name.label("leader_first_name"),
+        User.last_name.label("leader_last_name")
+    ).outerjoin(User, Team.team_leader_id == User.id)
     if current_user.role == UserRole.TEAM_LEADER:
         teams_query = teams_query.filter(Team.team_leader_id == current_user.id)
     
     if filters.team_id:
         teams_query = teams_query.filter(Team.id == filters.team_id)
     
-    teams = teams_query.options(
-        joinedload(Team.team_leader),
-        joinedload(Team.members),
-        joinedload(Team.projects)
-    ).all()
+    teams = teams_query.order_by(Team.id).all()
+    team_ids = [team.id for team in teams]
+    
+    def per_team(query) -> dict:
+        return {row[0]: row[1] for row in query.all()} if team_ids else {}
+    
+    member_team = team_members.c.team_id
+    member_counts = per_team(
+        db.query(member_team, func.count(team_members.c.user_id))
+        .filter(member_team.in_(team_ids)).group_by(member_team)
+    )
+    project_counts = per_team(
+        db.query(team_projects.c.team_id, func.count(team_projects.c.project_id))
+        .filter(team_projects.c.team_id.in_(team_ids)).group_by(team_projects.c.team_id)
+    )
+    
+    # Hours logged by team members
+    hours_query = db.query(member_team, func.coalesce(func.sum(TimeLog.hours), 0)).select_from(
+        team_members
+    ).join(TimeLog, TimeLog.user_id == team_members.c.user_id).filter(member_team.in_(team_ids))
+    if filters.project_id:
+        hours_query = hours_query.join(Task, TimeLog.task_id == Task.id).filter(
+            Task.project_id == filters.project_id
+        )
+    if filters.start_date:
+        hours_query = hours_query.filter(TimeLog.date >= datetime.combine(filters.start_date, datetime.min.time()))
+    if filters.end_date:
+        hours_query = hours_query.filter(TimeLog.date <= datetime.combine(filters.end_date, datetime.max.time()))
+    hours_by_team = per_team(hours_query.group_by(member_team))
+    
+    # Story points completed by team members
+    points_query = db.query(
+        member_team,
+        func.coalesce(func.sum(CompletedStoryPoints.story_points), 0),
+        func.count(CompletedStoryPoints.id)
+    ).select_from(team_members).join(
+        CompletedStoryPoints, CompletedStoryPoints.user_id == team_members.c.user_id
+    ).filter(member_team.in_(team_ids))
+    if filters.project_id:
+        points_query = points_query.filter(CompletedStoryPoints.project_id == filters.project_id)
+    if filters.start_date:
+        points_query = points_query.filter(
+            CompletedStoryPoints.completed_at >= datetime.combine(filters.start_date, datetime.min.time())
+        )
+    if filters.end_date:
+        points_query = points_query.filter(
+            CompletedStoryPoints.completed_at <= datetime.combine(filters.end_date, datetime.max.time())
+        )
+    points_by_team = {
+        row[0]: (row[1], row[2]) for row in points_query.group_by(member_team).all()
+    } if team_ids else {}
+    
+    # Estimated tasks assigned to team members
+    task_counts = per_team(
+        db.query(member_team, func.count(Task.id)).select_from(team_members).join(
+            Task, Task.assignee_id == team_members.c.user_id
+        ).filter(member_team.in_(team_ids), Task.story_points.isnot(None)).group_by(member_team)
+    )
+    
+    total_projects = db.query(func.count(func.distinct(team_projects.c.project_id))).filter(
+        team_projects.c.team_id.in_(team_ids)
+    ).scalar() if team_ids else 0
     
     team_productivity = []
     for team in teams:
-        # Calculate team metrics
-        team_member_ids = [m.id for m in team.members]
-        
-        # Get time logs for team members
-        time_logs_query = db.query(TimeLog).filter(TimeLog.user_id.in_(team_member_ids))
-        
-        if filters.project_id:
-            time_logs_query = time_logs_query.join(Task).filter(Task.project_id == filters.project_id)
-        if filters.start_date:
-            start_datetime = datetime.combine(filters.start_date, datetime.min.time())
-            time_logs_query = time_logs_query.filter(TimeLog.start_time >= start_datetime)
-        if filters.end_date:
-            end_datetime = datetime.combine(filters.end_date, datetime.max.time())
-            time_logs_query = time_logs_query.filter(TimeLog.start_time <= end_datetime)
-        
-        team_time_logs = time_logs_query.all()
-        total_hours = sum(log.duration_minutes or 0 for log in team_time_logs) / 60
-        
-        # Get story points for team
-        story_points_query = db.query(CompletedStoryPoints).filter(
-            CompletedStoryPoints.user_id.in_(team_member_ids)
-        )
-        
-        if filters.project_id:
-            story_points_query = story_points_query.filter(CompletedStoryPoints.project_id == filters.project_id)
-        if filters.start_date:
-            start_datetime = datetime.combine(filters.start_date, datetime.min.time())
-            story_points_query = story_points_query.filter(CompletedStoryPoints.completed_at >= start_datetime)
-        if filters.end_date:
-            end_datetime = datetime.combine(filters.end_date, datetime.max.time())
-            story_points_query = story_points_query.filter(CompletedStoryPoints.completed_at <= end_datetime)
-        
-        team_story_points = story_points_query.all()
-        total_story_points = sum(sp.story_points for sp in team_story_points)
-        
-        # Calculate average completion rate
-        completed_tasks = len(team_story_points)
-        total_tasks = db.query(Task).filter(
-            Task.assignee_id.in_(team_member_ids),
-            Task.story_points.isnot(None)
-        ).count()
-        
+        total_story_points, completed_tasks = points_by_team.get(team.id, (0, 0))
+        total_tasks = task_counts.get(team.id, 0)
         avg_completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
         team_productivity.append(TeamProductivityReport(
+            team_id=team.id,
             team_name=team.name,
-            team_leader=f"{team.team_leader.first_name} {team.team_leader.last_name}",
-            member_count=len(team.members),
-            total_hours=round(total_hours, 2),
+            team_leader=f"{team.leader_first_name} {team.leader_last_name}",
+            member_count=member_counts.get(team.id, 0),
+            total_hours=round(hours_by_team.get(team.id, 0), 2),
             total_story_points=total_story_points,
-            projects_count=len(team.projects),
+            projects_count=project_counts.get(team.id, 0),
             avg_completion_rate=round(avg_completion_rate, 1)
         ))
     
     return TeamReportResponse(
         summary={
             "teams_count": len(teams),
-            "total_members": sum(len(team.members) for team in teams),
-            "total_projects": len(set(p.id for team in teams for p in team.projects))
+            "total_members": sum(member_counts.values()),
+            "total_projects": total_projects
         },
         team_productivity=team_productivity,
         applied_filters=filters
     )
 
 @router.get("/dashboard", response_model=DashboardReportResponse)
+@cached_report("reports.dashboard", DASHBOARD_REPORT_TABLES, get_accessible_projects)
 def get_dashboard_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -487,23 +549,23 @@ def get_dashboard_report(
     accessible_projects = get_accessible_projects(current_user, db)
     
     # Dashboard summary
-    total_hours = db.query(func.sum(TimeLog.duration_minutes)).join(Task).filter(
+    total_hours = db.query(func.sum(TimeLog.hours)).join(Task, TimeLog.task_id == Task.id).filter(
         Task.project_id.in_(accessible_projects)
     ).scalar() or 0
-    total_hours = round(total_hours / 60, 2)
+    total_hours = round(total_hours, 2)
     
     total_story_points = db.query(func.sum(CompletedStoryPoints.story_points)).filter(
         CompletedStoryPoints.project_id.in_(accessible_projects)
     ).scalar() or 0
     
     active_projects = len(accessible_projects)
-    active_tasks = db.query(Task).filter(
+    active_tasks = db.query(func.count(Task.id)).filter(
         Task.project_id.in_(accessible_projects),
         Task.status != TaskStatus.DONE
-    ).count()
+    ).scalar()
     
-    total_users = db.query(User).filter(User.is_active).count()
-    total_teams = db.query(Team).count()
+    total_users = db.query(func.count(User.id)).filter(User.is_active).scalar()
+    total_teams = db.query(func.count(Team.id)).scalar()
     
     dashboard_summary = DashboardSummary(
         total_hours_logged=total_hours,
@@ -515,71 +577,61 @@ def get_dashboard_report(
     )
     
     # Recent activities (last 10 time logs)
-    recent_logs = db.query(TimeLog).join(Task).join(Project).join(User).filter(
-        Project.id.in_(accessible_projects)
-    ).order_by(TimeLog.start_time.desc()).limit(10).options(
-        joinedload(TimeLog.user),
-        joinedload(TimeLog.task).joinedload(Task.project)
-    ).all()
-    
-    recent_activities = [
-        TimeLogReport(
-            date=log.start_time,
-            user_name=f"{log.user.first_name} {log.user.last_name}",
-            project_name=log.task.project.name,
-            task_title=log.task.title,
-            duration_minutes=log.duration_minutes or 0,
-            duration_hours=round((log.duration_minutes or 0) / 60, 2),
-            log_type="Manual" if log.is_manual else "Timer",
-            description=log.description
-        )
-        for log in recent_logs
-    ]
+    recent_activities = recent_time_log_reports(db, [Task.project_id.in_(accessible_projects)], 10)
     
     # Top performers (by completed story points in last 30 days)
     thirty_days_ago = datetime.now() - timedelta(days=30)
     top_performers_data = db.query(
-        User,
+        User.id,
+        User.first_name,
+        User.last_name,
         func.sum(CompletedStoryPoints.story_points).label('total_points'),
         func.count(CompletedStoryPoints.id).label('completed_tasks')
-    ).join(CompletedStoryPoints).filter(
+    ).join(CompletedStoryPoints, CompletedStoryPoints.user_id == User.id).filter(
         CompletedStoryPoints.project_id.in_(accessible_projects),
         CompletedStoryPoints.completed_at >= thirty_days_ago
-    ).group_by(User.id).order_by(func.sum(CompletedStoryPoints.story_points).desc()).limit(5).all()
+    ).group_by(User.id, User.first_name, User.last_name).order_by(
+        func.sum(CompletedStoryPoints.story_points).desc()
+    ).limit(5).all()
     
     top_performers = [
         UserStoryPerformance(
-            user_name=f"{user.first_name} {user.last_name}",
+            user_id=row.id,
+            user_name=f"{row.first_name} {row.last_name}",
             planned_points=0,  # Would need additional query
-            completed_points=int(total_points),
+            completed_points=int(row.total_points),
             completion_rate=100.0,  # Simplified for dashboard
             active_tasks=0,  # Would need additional query
-            completed_tasks=int(completed_tasks)
+            completed_tasks=int(row.completed_tasks)
         )
-        for user, total_points, completed_tasks in top_performers_data
+        for row in top_performers_data
     ]
     
-    # Project progress
+    # Project progress for the first 10 projects, in one grouped query
+    done = Task.status == TaskStatus.DONE
+    progress_rows = db.query(
+        Project.id,
+        Project.name,
+        func.count(Task.id).label("total_tasks"),
+        func.coalesce(func.sum(case((done, 1), else_=0)), 0).label("completed_tasks"),
+        func.coalesce(func.sum(Task.story_points), 0).label("planned_points"),
+        func.coalesce(func.sum(case((done, Task.story_points), else_=0)), 0).label("completed_points")
+    ).outerjoin(Task, Task.project_id == Project.id).filter(
+        Project.id.in_(accessible_projects[:10])
+    ).group_by(Project.id, Project.name).order_by(Project.id).all()
+    
     project_progress = []
-    for project_id in accessible_projects[:10]:  # Top 10 projects
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if project:
-            total_tasks = db.query(Task).filter(Task.project_id == project_id).count()
-            completed_tasks = db.query(Task).filter(
-                Task.project_id == project_id,
-                Task.status == TaskStatus.DONE
-            ).count()
-            
-            completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            
-            project_progress.append(ProjectStoryStats(
-                project_name=project.name,
-                total_points_planned=0,  # Simplified
-                total_points_completed=0,  # Simplified
-                completion_rate=round(completion_rate, 1),
-                active_tasks=total_tasks - completed_tasks,
-                completed_tasks=completed_tasks
-            ))
+    for row in progress_rows:
+        completion_rate = (row.completed_tasks / row.total_tasks * 100) if row.total_tasks > 0 else 0
+        project_progress.append(ProjectStoryStats(
+            project_id=row.id,
+            project_name=row.name,
+            total_points_planned=int(row.planned_points),
+            total_points_completed=int(row.completed_points),
+            completion_rate=round(completion_rate, 1),
+            active_tasks=row.total_tasks - row.completed_tasks,
+            completed_tasks=row.completed_tasks
+        ))
     
     return DashboardReportResponse(
         dashboard_summary=dashboard_summary,
@@ -14,9 +14,10 @@ from app.models.project import Project
 from app.models.team import Team, team_members
 from app.models.time_log import TimeLog
 from app.models.active_timer import ActiveTimer
-from app.models.enums import UserRole, SprintStatus
+from app.models.enums import UserRole, SprintStatus, TaskStatus
 from app.models.sprint import Sprint
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskStatusUpdate
+from app.core.ranking import move_rank
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskStatusUpdate, TaskMove
 
 router = APIRouter()
 
@@ -57,6 +58,14 @@ def can_create_tasks_in_project(user: User, project: Project, db: Session) -> bo
     
     return False
 
+def apply_task_status(db: Session, task: Task, new_status: TaskStatus):
+    """Set a task's status and cascade it to the task's subtasks"""
+    task.status = new_status
+    # تغییر وضعیت همه ساب‌تسک‌های این تسک
+    subtasks = db.query(Task).filter(Task.parent_task_id == task.id).all()
+    for subtask in subtasks:
+        subtask.status = new_status
+
 @router.get("/", response_model=List[TaskResponse])
 def get_tasks(
     skip: int = 0,
@@ -416,15 +425,55 @@ def update_task_status(
             detail="You don't have permission to update this task status"
         )
     
-    task.status = status_update.status
-    # تغییر وضعیت همه ساب‌تسک‌های این تسک
-    subtasks = db.query(Task).filter(Task.parent_task_id == task_id).all()
-    for subtask in subtasks:
-        subtask.status = status_update.status
+    apply_task_status(db, task, status_update.status)
     db.commit()
     db.refresh(task)
     return task
 
+@router.post("/{task_id}/move", response_model=TaskResponse)
+def move_task(
+    task_id: int,
+    move: TaskMove,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Move a task within its kanban column or to another one
+    
+    Within a column only the moved task's row is written: it gets a rank
+    between its new neighbours (see app.core.ranking). Moving to another
+    column changes the status like update_task_status, subtasks included.
+    """
+    task = db.query(Task).filter(Task.id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    # Same permissions as a status change
+    project = db.query(Project).filter(Project.id == task.project_id).first()
+    if not (
+        task.assignee_id == current_user.id or
+        current_user.role in [UserRole.ADMIN, UserRole.PROJECT_MANAGER] or
+        can_create_tasks_in_project(current_user, project, db)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to move this task"
+        )
+    
+    target_status = move.status or task.status
+    try:
+        rank = move_rank(
+            db, Task, (Task.project_id == task.project_id, Task.status == target_status), task.id,
+            before_id=move.before_id, after_id=move.after_id
+        )
+    except LookupError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if target_status != task.status:
+        apply_task_status(db, task, target_status)
+    task.rank = rank
+    db.commit()
+    db.refresh(task)
+    return TaskResponse.from_orm(task)
+
 
 # Subtask endpoints (using the new is_subtask field)
 @router.get("/{task_id}/subtasks", response_model=List[TaskResponse])
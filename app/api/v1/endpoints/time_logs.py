@@ -15,6 +15,7 @@ from app.models.task import Task
 from app.models.active_timer import ActiveTimer
 from app.schemas.time_log import TimeLogCreate, TimeLogUpdate, TimeLogResponse
 from app.schemas.active_timer import ActiveTimerResponse, TimerStartResponse, TimerStopResponse
+from app.core.timer_sweeper import stop_active_timer, sweep_stale_timers, purge_inactive_timers
 
 router = APIRouter()
 
@@ -198,7 +199,10 @@ def log_time(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Log time for a task with enhanced parameters"""
+    """Log time for a task with enhanced parameters
+
+    Send an `Idempotency-Key` header to make client retries safe.
+    """
     # Verify task exists
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
@@ -208,17 +212,7 @@ def log_time(
     if current_user.role.value == 'developer' and task.assignee_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    # Check for duplicate submissions (same user, task, duration within last 10 seconds)
-    from datetime import datetime, timedelta
-    recent_cutoff = datetime.utcnow() - timedelta(seconds=10)
-    recent_duplicate = db.query(TimeLog).filter(
-        TimeLog.task_id == task_id,
-        TimeLog.user_id == current_user.id,
-        TimeLog.hours == duration_minutes / 60.0  # Convert to hours
-    ).filter(TimeLog.created_at > recent_cutoff).first()
-    
-    if recent_duplicate:
-        raise HTTPException(status_code=409, detail="Duplicate time log detected")
+    # Duplicate submissions are handled by the Idempotency-Key middleware
     
     # Parse date if provided
     log_datetime = datetime.utcnow()
@@ -331,23 +325,8 @@ def stop_timer(
     elapsed_seconds = int((end_time - active_timer.start_time).total_seconds())
     elapsed_hours = elapsed_seconds / 3600
     
-    # Create time log entry
-    time_log = TimeLog(
-        task_id=active_timer.task_id,
-        user_id=current_user.id,
-        date=active_timer.start_time,
-        hours=elapsed_hours,
-        description=description or f"Live timer session: {elapsed_hours:.2f} hours"
-    )
-    
-    db.add(time_log)
-    
-    # Update task actual hours
-    task = db.query(Task).filter(Task.id == active_timer.task_id).first()
-    task.actual_hours = (task.actual_hours or 0) + elapsed_hours
-    
-    # Mark timer as inactive
-    active_timer.is_active = False
+    # Create time log entry, update task actual hours and mark timer as inactive
+    time_log = stop_active_timer(db, active_timer, end_time, description)
     
     db.commit()
     db.refresh(time_log)
@@ -360,6 +339,23 @@ def stop_timer(
         time_log_id=time_log.id
     )
 
+@router.post("/sweep-timers")
+def sweep_timers(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Run the stale-timer sweeper and inactive-timer purge immediately (admin only)"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    stopped = sweep_stale_timers(db)
+    purged = purge_inactive_timers(db)
+    return {
+        "message": "Timer sweep completed",
+        "stopped_timer_ids": stopped,
+        "purged_timers": purged
+    }
+
 @router.get("/user/me", response_model=List[TimeLogResponse])
 def get_my_time_logs(
     skip: int = 0,
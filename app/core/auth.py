@@ -71,6 +71,8 @@ def get_current_user(
     user = db.query(User).filter(User.username == token_data.username).first()
     if user is None:
         raise credentials_exception
+    # Lets session hooks attribute the records they write to the acting user
+    db.info["current_user_id"] = user.id
     return user
 
 def get_current_active_user(current_user: User = Depends(get_current_user)):
@@ -0,0 +1,122 @@
+"""
+Working capacity from users' schedules, holidays and approved time off
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.enums import TimeOffStatus
+from app.models.working_hours import WorkingHours, Holiday, TimeOff
+
+# Matches the WorkingHours column defaults (Thursday and Friday off, 8 hours a day)
+DEFAULT_WORK_WEEKDAYS = frozenset({0, 1, 2, 5, 6})
+DEFAULT_HOURS_PER_DAY = 8
+
+WEEKDAY_FLAGS = (
+    "monday_enabled", "tuesday_enabled", "wednesday_enabled", "thursday_enabled",
+    "friday_enabled", "saturday_enabled", "sunday_enabled"
+)
+
+
+class UserCapacity:
+    def __init__(self):
+        self.working_days = 0
+        self.capacity_hours = 0.0
+        self.holiday_days = 0
+        self.time_off_days = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "working_days": self.working_days,
+            "capacity_hours": round(self.capacity_hours, 2),
+            "holiday_days": self.holiday_days,
+            "time_off_days": self.time_off_days
+        }
+
+
+def _work_weekdays(schedule: WorkingHours) -> frozenset:
+    return frozenset(
+        weekday for weekday, flag in enumerate(WEEKDAY_FLAGS) if getattr(schedule, flag)
+    )
+
+
+def holiday_dates(db: Session, start_date: date, end_date: date) -> set:
+    """Holiday dates in the range, including yearly recurring ones"""
+    rows = db.query(Holiday.date, Holiday.is_recurring).filter(
+        or_(Holiday.date.between(start_date, end_date), Holiday.is_recurring.is_(True))
+    ).all()
+    dates = {row.date for row in rows if start_date <= row.date <= end_date}
+    recurring = {(row.date.month, row.date.day) for row in rows if row.is_recurring}
+    if recurring:
+        day = start_date
+        while day <= end_date:
+            if (day.month, day.day) in recurring:
+                dates.add(day)
+            day += timedelta(days=1)
+    return dates
+
+
+def user_capacities(db: Session, user_ids: Iterable[int], start_date: date, end_date: date) -> Dict[int, UserCapacity]:
+    """Working days and hours available to each user between two dates (inclusive)
+
+    Uses three queries however many users are involved: schedules that
+    overlap the range, holidays in the range, and approved time off that
+    overlaps it. Users without a schedule get the default working week.
+    """
+    user_ids = list(user_ids)
+    capacities = {user_id: UserCapacity() for user_id in user_ids}
+    if not user_ids or start_date > end_date:
+        return capacities
+
+    schedules: Dict[int, List[WorkingHours]] = {}
+    for schedule in db.query(WorkingHours).filter(
+        WorkingHours.user_id.in_(user_ids),
+        WorkingHours.effective_from <= end_date,
+        or_(WorkingHours.effective_to.is_(None), WorkingHours.effective_to >= start_date)
+    ).order_by(WorkingHours.effective_from.desc()).all():
+        schedules.setdefault(schedule.user_id, []).append(schedule)
+
+    holidays = holiday_dates(db, start_date, end_date)
+
+    time_off: Dict[int, List[tuple]] = {}
+    for row in db.query(TimeOff.user_id, TimeOff.start_date, TimeOff.end_date).filter(
+        TimeOff.user_id.in_(user_ids),
+        TimeOff.status == TimeOffStatus.APPROVED,
+        TimeOff.start_date <= end_date,
+        TimeOff.end_date >= start_date
+    ).all():
+        time_off.setdefault(row.user_id, []).append((row.start_date, row.end_date))
+
+    days = []
+    day = start_date
+    while day <= end_date:
+        days.append(day)
+        day += timedelta(days=1)
+
+    for user_id, capacity in capacities.items():
+        user_schedules = [
+            (schedule, _work_weekdays(schedule), schedule.work_hours_per_day or 0)
+            for schedule in schedules.get(user_id, [])
+        ]
+        leave = time_off.get(user_id, [])
+        for day in days:
+            # Latest schedule in effect that day wins
+            weekdays, hours = DEFAULT_WORK_WEEKDAYS, DEFAULT_HOURS_PER_DAY
+            for schedule, schedule_weekdays, schedule_hours in user_schedules:
+                if schedule.effective_from <= day and (schedule.effective_to is None or schedule.effective_to >= day):
+                    weekdays, hours = schedule_weekdays, schedule_hours
+                    break
+            if day.weekday() not in weekdays:
+                continue
+            if day in holidays:
+                capacity.holiday_days += 1
+                continue
+            if any(leave_start <= day <= leave_end for leave_start, leave_end in leave):
+                capacity.time_off_days += 1
+                continue
+            capacity.working_days += 1
+            capacity.capacity_hours += hours
+    return capacities
@@ -34,7 +34,58 @@ class Settings(BaseSettings):
     
     # API settings
     API_V1_STR: str = "/api/v1"
-    
+
+    # Background scheduler settings
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "True").lower() == "true"
+
+    # Live timer sweeper settings
+    TIMER_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("TIMER_SWEEP_INTERVAL_SECONDS", "300"))
+    TIMER_MAX_DURATION_HOURS: float = float(os.getenv("TIMER_MAX_DURATION_HOURS", "12"))
+    INACTIVE_TIMER_RETENTION_DAYS: int = int(os.getenv("INACTIVE_TIMER_RETENTION_DAYS", "7"))
+    TIMER_PURGE_BATCH_SIZE: int = int(os.getenv("TIMER_PURGE_BATCH_SIZE", "500"))
+
+    # Idempotency-Key settings
+    IDEMPOTENCY_KEY_TTL_HOURS: int = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT_SECONDS", "60"))
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1024"))
+
+    # Cumulative flow snapshot settings
+    CFD_SNAPSHOT_INTERVAL_SECONDS: int = int(os.getenv("CFD_SNAPSHOT_INTERVAL_SECONDS", "3600"))
+
+    # Report cache settings
+    REPORT_CACHE_ENABLED: bool = os.getenv("REPORT_CACHE_ENABLED", "True").lower() == "true"
+    REPORT_CACHE_TTL_SECONDS: int = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "300"))
+    REPORT_CACHE_MAX_STALE_SECONDS: int = int(os.getenv("REPORT_CACHE_MAX_STALE_SECONDS", "3600"))
+    REPORT_CACHE_SIZE: int = int(os.getenv("REPORT_CACHE_SIZE", "256"))
+
+    # Dashboard settings
+    DASHBOARD_SECTION_TIMEOUT_SECONDS: float = float(os.getenv("DASHBOARD_SECTION_TIMEOUT_SECONDS", "5"))
+    DASHBOARD_SNAPSHOTS_ENABLED: bool = os.getenv("DASHBOARD_SNAPSHOTS_ENABLED", "True").lower() == "true"
+    DASHBOARD_SNAPSHOT_REFRESH_INTERVAL_SECONDS: int = int(os.getenv("DASHBOARD_SNAPSHOT_REFRESH_INTERVAL_SECONDS", "30"))
+    DASHBOARD_SNAPSHOT_TTL_SECONDS: int = int(os.getenv("DASHBOARD_SNAPSHOT_TTL_SECONDS", "900"))
+    DASHBOARD_SNAPSHOT_MAX_STALE_SECONDS: int = int(os.getenv("DASHBOARD_SNAPSHOT_MAX_STALE_SECONDS", "300"))
+
+    # Kanban and backlog rank settings
+    RANK_REBALANCE_LENGTH: int = int(os.getenv("RANK_REBALANCE_LENGTH", "24"))
+    RANK_REBALANCE_INTERVAL_SECONDS: int = int(os.getenv("RANK_REBALANCE_INTERVAL_SECONDS", "3600"))
+
+    # Kanban WebSocket channel settings
+    KANBAN_POLL_INTERVAL_SECONDS: float = float(os.getenv("KANBAN_POLL_INTERVAL_SECONDS", "2"))
+    KANBAN_CATCH_UP_LIMIT: int = int(os.getenv("KANBAN_CATCH_UP_LIMIT", "500"))
+    KANBAN_SUBSCRIBER_QUEUE_SIZE: int = int(os.getenv("KANBAN_SUBSCRIBER_QUEUE_SIZE", "100"))
+    KANBAN_EVENT_RETENTION_HOURS: int = int(os.getenv("KANBAN_EVENT_RETENTION_HOURS", "24"))
+    KANBAN_EVENT_CLEANUP_INTERVAL_SECONDS: int = int(os.getenv("KANBAN_EVENT_CLEANUP_INTERVAL_SECONDS", "3600"))
+
+    # Project stats settings
+    PROJECT_STATS_CHECK_INTERVAL_SECONDS: int = int(os.getenv("PROJECT_STATS_CHECK_INTERVAL_SECONDS", "3600"))
+
+    # Background export job settings
+    EXPORT_DIR: str = os.getenv("EXPORT_DIR", "exports")
+    EXPORT_WORKERS: int = int(os.getenv("EXPORT_WORKERS", "2"))
+    EXPORT_MAX_PENDING_JOBS: int = int(os.getenv("EXPORT_MAX_PENDING_JOBS", "20"))
+    EXPORT_RETENTION_HOURS: int = int(os.getenv("EXPORT_RETENTION_HOURS", "24"))
+    EXPORT_CLEANUP_INTERVAL_SECONDS: int = int(os.getenv("EXPORT_CLEANUP_INTERVAL_SECONDS", "3600"))
+
     class Config:
         case_sensitive = True
 
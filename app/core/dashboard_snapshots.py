@@ -0,0 +1,245 @@
+"""
+Materialized per-user dashboards
+
+Each user's `/dashboard/dashboard` response is stored as a JSON snapshot
+with a version. Writes that touch a user's dashboard mark the user's
+snapshot dirty in the same transaction: changes to the user's tasks, time
+logs and teams, and changes to projects, sprints and tasks that the user
+can see (project and sprint totals and accessible task counts are shared
+by everyone with access to the project). A periodic job rebuilds dirty
+snapshots in the background. The endpoint serves the snapshot with
+staleness metadata and computes the dashboard live when the snapshot is
+missing, expired or has been dirty for too long.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import event, inspect, or_, select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.scheduler import register_periodic_job
+from app.models.dashboard_snapshot import DashboardSnapshot
+from app.models.enums import UserRole
+from app.models.project import Project
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.team import Team, team_members, team_projects
+from app.models.time_log import TimeLog
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_SNAPSHOT_JOB = "dashboard_snapshot_refresh"
+
+_builder: Optional[Callable] = None
+
+
+def register_dashboard_builder(builder: Callable):
+    """Set the coroutine function `builder(db, user)` that computes a dashboard"""
+    global _builder
+    _builder = builder
+
+
+def _history_values(state, key: str) -> set:
+    history = state.attrs[key].history
+    return {value for value in list(history.added) + list(history.deleted) + list(history.unchanged or ())
+            if value is not None}
+
+
+def _changed(state, keys) -> bool:
+    return any(state.attrs[key].history.has_changes() for key in keys)
+
+
+def _affected(session: Session) -> tuple:
+    """(users, projects, teams) whose dashboards change with the pending flush
+
+    Users with access to one of the projects, and the members and leaders
+    of the teams, are affected too. `projects` is None when a project or
+    team was deleted: its team links are gone, so every snapshot is marked.
+    """
+    users, projects, teams = set(), set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        state = inspect(obj)
+        touched = obj in session.new or obj in session.deleted
+        if isinstance(obj, Task):
+            # Recent tasks list any change; accessible task counts follow the project
+            if touched:
+                users.add(obj.assignee_id)
+                projects.add(obj.project_id)
+                continue
+            if session.is_modified(obj, include_collections=False):
+                users |= _history_values(state, "assignee_id")
+            if _changed(state, ("project_id",)):
+                projects |= _history_values(state, "project_id")
+        elif isinstance(obj, TimeLog):
+            users.add(obj.user_id)
+            users |= _history_values(state, "user_id")
+        elif isinstance(obj, Sprint):
+            if touched or _changed(state, ("project_id", "status")):
+                projects |= _history_values(state, "project_id")
+        elif isinstance(obj, Project):
+            if obj in session.deleted:
+                return users, None, teams
+            if touched or _changed(state, ("name", "status", "teams")):
+                projects.add(obj.id)
+        elif isinstance(obj, Team):
+            if obj in session.deleted:
+                return users, None, teams
+            members = state.attrs.members.history
+            users |= {member.id for member in list(members.added) + list(members.deleted)}
+            if touched or _changed(state, ("name", "description", "team_leader_id", "members", "projects")):
+                users |= _history_values(state, "team_leader_id")
+                teams.add(obj.id)
+        elif isinstance(obj, User):
+            if state.attrs.teams.history.has_changes() or state.attrs.role.history.has_changes():
+                users.add(obj.id)
+    users.discard(None)
+    projects.discard(None)
+    return users, projects, teams
+
+
+def _affected_user_conditions(users: set, projects: set, teams: set) -> list:
+    """Conditions on DashboardSnapshot.user_id selecting the affected users"""
+    conditions = [DashboardSnapshot.user_id.in_(users)] if users else []
+    if projects:
+        # Project totals and accessible task counts of admins and project managers cover every project
+        conditions.append(DashboardSnapshot.user_id.in_(
+            select(User.id).where(User.role.in_([UserRole.ADMIN, UserRole.PROJECT_MANAGER]))
+        ))
+    if projects or teams:
+        team_ids = select(Team.id).where(or_(
+            Team.id.in_(teams),
+            Team.id.in_(select(team_projects.c.team_id).where(team_projects.c.project_id.in_(projects)))
+        ))
+        conditions.append(DashboardSnapshot.user_id.in_(
+            select(team_members.c.user_id).where(team_members.c.team_id.in_(team_ids))
+        ))
+        conditions.append(DashboardSnapshot.user_id.in_(
+            select(Team.team_leader_id).where(Team.id.in_(team_ids))
+        ))
+    return conditions
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dirty_snapshots(session, flush_context):
+    users, projects, teams = _affected(session)
+    if projects is None:
+        conditions = [true()]
+    else:
+        conditions = _affected_user_conditions(users, projects, teams)
+    if not conditions:
+        return
+    # Plain SQL on the flushing connection: part of the same transaction
+    session.connection().execute(
+        update(DashboardSnapshot).where(
+            or_(*conditions),
+            DashboardSnapshot.dirty_since.is_(None)
+        ).values(dirty_since=datetime.utcnow())
+    )
+
+
+def get_snapshot(db: Session, user_id: int) -> Optional[DashboardSnapshot]:
+    return db.query(DashboardSnapshot).filter(DashboardSnapshot.user_id == user_id).first()
+
+
+def snapshot_is_servable(snapshot: Optional[DashboardSnapshot], now: Optional[datetime] = None) -> bool:
+    if snapshot is None:
+        return False
+    now = now or datetime.utcnow()
+    if snapshot.computed_at < now - timedelta(seconds=settings.DASHBOARD_SNAPSHOT_TTL_SECONDS):
+        return False
+    if snapshot.dirty_since is not None and \
+            snapshot.dirty_since < now - timedelta(seconds=settings.DASHBOARD_SNAPSHOT_MAX_STALE_SECONDS):
+        return False
+    return True
+
+
+def snapshot_metadata(snapshot: DashboardSnapshot, source: str, now: Optional[datetime] = None) -> dict:
+    now = now or datetime.utcnow()
+    return {
+        "source": source,
+        "version": snapshot.version,
+        "computed_at": snapshot.computed_at,
+        "age_seconds": round((now - snapshot.computed_at).total_seconds(), 1),
+        "stale": snapshot.dirty_since is not None,
+        "dirty_since": snapshot.dirty_since
+    }
+
+
+def store_snapshot(db: Session, user_id: int, payload: dict, observed_dirty_since: Optional[datetime],
+                   computed_at: datetime) -> Optional[DashboardSnapshot]:
+    """Save a freshly computed dashboard
+
+    The dirty mark is only cleared if it is the one observed before the
+    computation started; a write that landed meanwhile keeps it dirty.
+    """
+    snapshot = get_snapshot(db, user_id)
+    if snapshot is None:
+        snapshot = DashboardSnapshot(user_id=user_id, version=0)
+        db.add(snapshot)
+    elif snapshot.computed_at > computed_at:
+        # A newer rebuild already finished
+        return snapshot
+    snapshot.payload = json.dumps(payload)
+    snapshot.version += 1
+    snapshot.computed_at = computed_at
+    if snapshot.dirty_since is not None and snapshot.dirty_since == observed_dirty_since:
+        snapshot.dirty_since = None
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request created the snapshot first
+        db.rollback()
+        return get_snapshot(db, user_id)
+    return snapshot
+
+
+def rebuild_snapshot(db: Session, user: User) -> Optional[DashboardSnapshot]:
+    """Recompute and store a user's dashboard; partial results are not stored"""
+    snapshot = get_snapshot(db, user.id)
+    observed = snapshot.dirty_since if snapshot else None
+    computed_at = datetime.utcnow()
+    payload = asyncio.run(_builder(db, user))
+    if any(section["status"] != "ok" for section in payload.get("sections", {}).values()):
+        return None
+    return store_snapshot(db, user.id, payload, observed, computed_at)
+
+
+def refresh_dirty_snapshots(db: Session, limit: int = 100) -> int:
+    """Rebuild up to `limit` dirty snapshots, oldest first"""
+    if _builder is None:
+        return 0
+    users = db.query(User).join(DashboardSnapshot, DashboardSnapshot.user_id == User.id).filter(
+        DashboardSnapshot.dirty_since.isnot(None)
+    ).order_by(DashboardSnapshot.dirty_since).limit(limit).all()
+    rebuilt = 0
+    for user in users:
+        try:
+            if rebuild_snapshot(db, user) is not None:
+                rebuilt += 1
+        except Exception:  # noqa: BLE001 - keep refreshing the other users
+            db.rollback()
+            logger.exception("Dashboard snapshot for user %s failed", user.id)
+    return rebuilt
+
+
+def run_dashboard_snapshot_refresh() -> int:
+    db = SessionLocal()
+    try:
+        return refresh_dirty_snapshots(db)
+    finally:
+        db.close()
+
+
+def register_dashboard_snapshot_job():
+    """Register the snapshot refresh job with the background scheduler"""
+    register_periodic_job(
+        DASHBOARD_SNAPSHOT_JOB, settings.DASHBOARD_SNAPSHOT_REFRESH_INTERVAL_SECONDS, run_dashboard_snapshot_refresh
+    )
@@ -0,0 +1,191 @@
+"""
+Background export jobs
+
+Long exports and reports are queued as ExportJob rows and produced by a
+small in-process thread pool, so requests return at once instead of
+running into proxy timeouts. Each job streams its output through gzip into
+a file under EXPORT_DIR; the cleanup job removes finished jobs and their
+files once they expire. Endpoint modules register the kinds of job they
+can produce with `register_export_kind`.
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.export_stream import EXPORT_FORMATS, gzip_chunks
+from app.core.scheduler import register_periodic_job
+from app.models.enums import ExportJobStatus
+from app.models.export_job import ExportJob
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CLEANUP_JOB = "export_cleanup"
+PENDING_STATUSES = (ExportJobStatus.QUEUED, ExportJobStatus.RUNNING)
+
+
+class ExportKind:
+    """A kind of export: the formats it supports and how to produce its text chunks"""
+
+    def __init__(self, name: str, formats: Tuple[str, ...],
+                 produce: Callable[[Session, User, dict, str], Iterable[str]]):
+        self.name = name
+        self.formats = formats
+        self.produce = produce
+
+
+_kinds: Dict[str, ExportKind] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def register_export_kind(name: str, formats: Iterable[str],
+                         produce: Callable[[Session, User, dict, str], Iterable[str]]) -> ExportKind:
+    kind = ExportKind(name, tuple(formats), produce)
+    _kinds[name] = kind
+    return kind
+
+
+def get_export_kinds() -> Dict[str, ExportKind]:
+    return dict(_kinds)
+
+
+def pending_job_count(db: Session) -> int:
+    return db.query(ExportJob).filter(ExportJob.status.in_(PENDING_STATUSES)).count()
+
+
+def export_file_name(job: ExportJob) -> str:
+    return f"{job.kind}_{job.id}.{EXPORT_FORMATS[job.format][1]}.gz"
+
+
+def _executor_instance() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.EXPORT_WORKERS, thread_name_prefix="export")
+        return _executor
+
+
+def submit_export_job(job_id: int):
+    """Hand a queued job to the worker pool"""
+    _executor_instance().submit(run_export_job, job_id)
+
+
+def run_export_job(job_id: int, session_factory: Callable[[], Session] = SessionLocal):
+    """Produce a queued job's file; a job already claimed by another worker is skipped"""
+    db = session_factory()
+    partial_path = None
+    try:
+        claimed = db.query(ExportJob).filter(
+            ExportJob.id == job_id,
+            ExportJob.status == ExportJobStatus.QUEUED
+        ).update({"status": ExportJobStatus.RUNNING, "started_at": datetime.utcnow()},
+                 synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return
+
+        job = db.get(ExportJob, job_id)
+        try:
+            kind = _kinds[job.kind]
+            user = db.get(User, job.user_id)
+            parameters = json.loads(job.parameters or "{}")
+
+            os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+            path = os.path.join(settings.EXPORT_DIR, export_file_name(job))
+            partial_path = path + ".part"
+            with open(partial_path, "wb") as output:
+                for chunk in gzip_chunks(kind.produce(db, user, parameters, job.format)):
+                    output.write(chunk)
+            os.replace(partial_path, path)
+            partial_path = None
+
+            job.status = ExportJobStatus.COMPLETED
+            job.file_path = path
+            job.file_size = os.path.getsize(path)
+        except Exception as exc:  # noqa: BLE001 - the failure is reported on the job
+            logger.exception("Export job %s failed", job_id)
+            db.rollback()
+            job = db.get(ExportJob, job_id)
+            job.status = ExportJobStatus.FAILED
+            # HTTPException from a report endpoint carries its message in `detail`
+            job.error = str(getattr(exc, "detail", None) or exc)[:2000]
+
+        job.finished_at = datetime.utcnow()
+        job.expires_at = job.finished_at + timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+        db.commit()
+    finally:
+        if partial_path and os.path.exists(partial_path):
+            os.remove(partial_path)
+        db.close()
+
+
+def resume_queued_exports(session_factory: Callable[[], Session] = SessionLocal) -> int:
+    """Resubmit jobs that were still queued when the process last stopped"""
+    db = session_factory()
+    try:
+        job_ids = [job_id for (job_id,) in db.query(ExportJob.id).filter(
+            ExportJob.status == ExportJobStatus.QUEUED
+        ).order_by(ExportJob.id).all()]
+    finally:
+        db.close()
+    for job_id in job_ids:
+        submit_export_job(job_id)
+    return len(job_ids)
+
+
+def purge_expired_exports(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete expired jobs and their files
+
+    Jobs left running longer than the retention period (their worker died
+    with the process) are marked failed so they stop counting as pending.
+    """
+    now = now or datetime.utcnow()
+    retention = timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    db.query(ExportJob).filter(
+        ExportJob.status == ExportJobStatus.RUNNING,
+        ExportJob.started_at < now - retention
+    ).update({
+        "status": ExportJobStatus.FAILED,
+        "error": "Interrupted before completion",
+        "finished_at": now,
+        "expires_at": now + retention
+    }, synchronize_session=False)
+
+    expired = db.query(ExportJob).filter(ExportJob.expires_at < now).all()
+    for job in expired:
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        db.delete(job)
+    db.commit()
+    return len(expired)
+
+
+def run_export_cleanup() -> int:
+    db = SessionLocal()
+    try:
+        return purge_expired_exports(db)
+    finally:
+        db.close()
+
+
+def register_export_cleanup():
+    """Register the retention job with the background scheduler"""
+    register_periodic_job(EXPORT_CLEANUP_JOB, settings.EXPORT_CLEANUP_INTERVAL_SECONDS, run_export_cleanup)
+
+
+def shutdown_export_workers():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
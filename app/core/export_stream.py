@@ -0,0 +1,105 @@
+"""
+Chunked CSV / NDJSON / JSON encoders for streamed exports
+
+Rows are consumed lazily and emitted in batches, so memory stays flat no
+matter how many rows the source cursor yields.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List
+
+EXPORT_BATCH_ROWS = 1000
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "json": ("application/json", "json"),
+}
+
+
+def _json_default(value: Any):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value: Any):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def csv_chunks(header: List[str], rows: Iterable[list], batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    # Send the header before the first batch so the download starts at once
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= batch_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(records: Iterable[Dict[str, Any]], batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[str]:
+    batch = []
+    for record in records:
+        batch.append(json.dumps(record, default=_json_default))
+        if len(batch) >= batch_rows:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+
+def json_array_chunks(records: Iterable[Dict[str, Any]], batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[str]:
+    """A single JSON array, written incrementally"""
+    yield "["
+    separator = ""
+    batch = []
+    for record in records:
+        batch.append(separator + json.dumps(record, default=_json_default))
+        separator = ","
+        if len(batch) >= batch_rows:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+    yield "]"
+
+
+def encode_records(format: str, columns: List[str], header: List[str],
+                   records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode `records` (dicts keyed by `columns`) in one of EXPORT_FORMATS"""
+    if format == "csv":
+        return csv_chunks(header, ([record[column] for column in columns] for record in records))
+    if format == "ndjson":
+        return ndjson_chunks(records)
+    return json_array_chunks(records)
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip a text stream on the fly"""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encoded_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
@@ -0,0 +1,351 @@
+"""
+Idempotency-Key support for mutating endpoints
+
+Clients may send an `Idempotency-Key` header on the routes listed in
+IDEMPOTENT_ROUTES. The first request with a given key is executed normally and
+its successful response is stored (in an in-process LRU and the
+`idempotency_keys` table); retries with the same key and the same request are
+answered from that cache without running the endpoint again.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+
+from jose import JWTError, jwt
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.core.scheduler import register_periodic_job
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAY_HEADER = "idempotent-replayed"
+MAX_KEY_LENGTH = 255
+IDEMPOTENCY_CLEANUP_JOB = "idempotency_cleanup"
+
+# (method, path without trailing slash) pairs that honour the Idempotency-Key header
+IDEMPOTENT_ROUTES = {
+    ("POST", f"{settings.API_V1_STR}/time-logs"),
+    ("POST", f"{settings.API_V1_STR}/time-logs/log-time"),
+    ("POST", f"{settings.API_V1_STR}/time-logs/start-timer"),
+    ("POST", f"{settings.API_V1_STR}/time-logs/stop-timer"),
+    ("POST", f"{settings.API_V1_STR}/tasks"),
+}
+
+
+class CachedResponse:
+    """A stored response that can be replayed for a retried request"""
+
+    def __init__(self, request_hash: str, status_code: Optional[int], content_type: Optional[str],
+                 body: Optional[str], created_at: datetime):
+        self.request_hash = request_hash
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = body
+        self.created_at = created_at
+
+    @property
+    def is_complete(self) -> bool:
+        return self.status_code is not None
+
+
+class IdempotencyStore:
+    """In-memory LRU in front of the idempotency_keys table"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, owner: str, key: str, entry: CachedResponse):
+        with self._lock:
+            self._entries[(owner, key)] = entry
+            self._entries.move_to_end((owner, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _cached(self, owner: str, key: str) -> Optional[CachedResponse]:
+        ttl = timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+        with self._lock:
+            entry = self._entries.get((owner, key))
+            if entry is None:
+                return None
+            if entry.created_at < datetime.utcnow() - ttl:
+                del self._entries[(owner, key)]
+                return None
+            self._entries.move_to_end((owner, key))
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def claim(self, db: Session, owner: str, key: str, method: str, path: str,
+              request_hash: str) -> Optional[CachedResponse]:
+        """Claim the key for a new request
+
+        Returns None when the caller now owns the key and should execute the
+        request, otherwise the existing (possibly in-flight) entry.
+        """
+        cached = self._cached(owner, key)
+        if cached is not None:
+            return cached
+
+        now = datetime.utcnow()
+        record = IdempotencyKey(
+            owner=owner, key=key, method=method, path=path,
+            request_hash=request_hash, created_at=now
+        )
+        db.add(record)
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+
+        existing = db.query(IdempotencyKey).filter(
+            IdempotencyKey.owner == owner,
+            IdempotencyKey.key == key
+        ).first()
+        if existing is None:
+            # Purged between our insert and lookup; treat as fresh
+            return self.claim(db, owner, key, method, path, request_hash)
+
+        created_at = existing.created_at.replace(tzinfo=None) if existing.created_at else now
+        expired = created_at < now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+        abandoned = (
+            existing.status_code is None and
+            created_at < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+        )
+        if expired or abandoned:
+            existing.request_hash = request_hash
+            existing.method = method
+            existing.path = path
+            existing.status_code = None
+            existing.content_type = None
+            existing.response_body = None
+            existing.created_at = now
+            existing.completed_at = None
+            db.commit()
+            return None
+
+        entry = CachedResponse(
+            existing.request_hash, existing.status_code, existing.content_type,
+            existing.response_body, created_at
+        )
+        if entry.is_complete:
+            self._remember(owner, key, entry)
+        return entry
+
+    def complete(self, db: Session, owner: str, key: str, request_hash: str,
+                 status_code: int, content_type: Optional[str], body: str):
+        """Store the response for a claimed key"""
+        record = db.query(IdempotencyKey).filter(
+            IdempotencyKey.owner == owner,
+            IdempotencyKey.key == key
+        ).first()
+        if record is None:
+            return
+        now = datetime.utcnow()
+        record.status_code = status_code
+        record.content_type = content_type
+        record.response_body = body
+        record.completed_at = now
+        db.commit()
+        created_at = record.created_at.replace(tzinfo=None) if record.created_at else now
+        self._remember(owner, key, CachedResponse(request_hash, status_code, content_type, body, created_at))
+
+    def release(self, db: Session, owner: str, key: str):
+        """Drop an in-flight claim so the client can retry (used for failed requests)"""
+        db.query(IdempotencyKey).filter(
+            IdempotencyKey.owner == owner,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None)
+        ).delete(synchronize_session=False)
+        db.commit()
+
+
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_CACHE_SIZE)
+
+
+def _request_owner(headers: Headers) -> Optional[str]:
+    """Username from a valid bearer token; requests without one are not deduplicated"""
+    authorization = headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+def _request_hash(method: str, path: str, query_string: bytes, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query_string, body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _session_provider(app) -> Callable:
+    """Honour dependency overrides of get_db so the store shares the endpoints' database"""
+    overrides = getattr(app, "dependency_overrides", {}) or {}
+    return overrides.get(get_db, get_db)
+
+
+def _run_with_session(app, func, *args):
+    generator = _session_provider(app)()
+    db = next(generator)
+    try:
+        return func(db, *args)
+    finally:
+        generator.close()
+
+
+async def _send_json(send, status_code: int, payload: dict):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware that replays stored responses for retried requests"""
+
+    def __init__(self, app, routes=None, store: IdempotencyStore = None):
+        self.app = app
+        self.routes = routes if routes is not None else IDEMPOTENT_ROUTES
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"].rstrip("/") or "/"
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if (method, path) not in self.routes or not key:
+            await self.app(scope, receive, send)
+            return
+
+        if len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, {"detail": f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"})
+            return
+
+        owner = _request_owner(headers)
+        if owner is None:
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        request_hash = _request_hash(method, path, scope.get("query_string", b""), body)
+        app = scope.get("app")
+        existing = await run_in_threadpool(
+            _run_with_session, app, self.store.claim, owner, key, method, path, request_hash
+        )
+
+        if existing is not None:
+            if existing.request_hash != request_hash:
+                await _send_json(send, 422, {"detail": "Idempotency-Key was already used for a different request"})
+            elif not existing.is_complete:
+                await _send_json(send, 409, {"detail": "A request with this Idempotency-Key is already in progress"})
+            else:
+                await self._replay(send, existing)
+            return
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        content_type = None
+        chunks = []
+
+        async def capture_send(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except Exception:
+            await run_in_threadpool(_run_with_session, app, self.store.release, owner, key)
+            raise
+
+        if 200 <= status_code < 300:
+            await run_in_threadpool(
+                _run_with_session, app, self.store.complete, owner, key, request_hash,
+                status_code, content_type, b"".join(chunks).decode("utf-8", errors="replace")
+            )
+        else:
+            await run_in_threadpool(_run_with_session, app, self.store.release, owner, key)
+
+    async def _replay(self, send, entry: CachedResponse):
+        body = (entry.body or "").encode("utf-8")
+        headers = [(b"content-length", str(len(body)).encode()), (REPLAY_HEADER.encode(), b"true")]
+        if entry.content_type:
+            headers.append((b"content-type", entry.content_type.encode()))
+        await send({"type": "http.response.start", "status": entry.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def purge_expired_idempotency_keys(db: Session, now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+    """Delete idempotency records older than the TTL in batches"""
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    purged = 0
+    while True:
+        ids = [row.id for row in db.query(IdempotencyKey.id).filter(
+            IdempotencyKey.created_at < cutoff
+        ).limit(batch_size).all()]
+        if not ids:
+            break
+        db.query(IdempotencyKey).filter(IdempotencyKey.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        purged += len(ids)
+        if len(ids) < batch_size:
+            break
+    return purged
+
+
+def run_idempotency_cleanup() -> int:
+    db = SessionLocal()
+    try:
+        return purge_expired_idempotency_keys(db)
+    finally:
+        db.close()
+
+
+def register_idempotency_cleanup():
+    """Register the expired-key purge with the background scheduler"""
+    register_periodic_job(IDEMPOTENCY_CLEANUP_JOB, 3600, run_idempotency_cleanup)
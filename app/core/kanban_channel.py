@@ -0,0 +1,174 @@
+"""
+In-process fan-out of kanban patches to WebSocket subscribers
+
+Subscribers are plain asyncio queues grouped by project: an idle one costs
+a queue and a parked coroutine, with no thread or database connection.
+When a commit records kanban events (app.core.kanban_events), the hub reads
+the new events of that project once and puts one patch message on every
+subscriber queue. Writes made by other worker processes are picked up by a
+single poll per worker that checks the latest version of all subscribed
+projects in one query.
+
+Messages:
+
+* {"type": "hello", "version": N} - subscribed; patches follow from N
+* {"type": "patch", "version": N, "ops": [...]} - apply in order
+* {"type": "resync", "version": N} - reload the board over HTTP, then
+  continue from N (the client's cursor was too old or it fell behind)
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.kanban_events import (
+    current_version, oldest_version, events_since, latest_versions, register_commit_listener
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    def __init__(self, project_id: int, version: int):
+        self.project_id = project_id
+        self.version = version  # Last version delivered to the client
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.KANBAN_SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, message: Dict[str, Any]):
+        """Queue a message; a subscriber that falls behind is told to resync instead"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "version": message["version"]})
+
+    def render(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The message as this client should see it, or None if it already has it all"""
+        if message["type"] == "patch":
+            ops = [op for version, op in message["events"] if version > self.version]
+            if not ops:
+                return None
+            self.version = message["version"]
+            return {"type": "patch", "version": self.version, "ops": ops}
+        if message["type"] == "resync":
+            self.version = message["version"]
+        return message
+
+
+class KanbanHub:
+    def __init__(self):
+        self.session_factory: Callable[[], Session] = SessionLocal
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._versions: Dict[int, int] = {}  # Last version broadcast per project
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poller: Optional[asyncio.Task] = None
+
+    def subscriber_count(self, project_id: Optional[int] = None) -> int:
+        if project_id is not None:
+            return len(self._subscribers.get(project_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _read(self, func, *args):
+        db = self.session_factory()
+        try:
+            return func(db, *args)
+        finally:
+            db.close()
+
+    def _catch_up(self, db: Session, project_id: int, since: Optional[int]) -> Tuple[int, bool, list]:
+        """(current version, resync needed, events after `since`)"""
+        version = current_version(db, project_id)
+        if since is None or since >= version:
+            return version, False, []
+        if since < oldest_version(db, project_id) - 1:
+            # Events after the cursor have been purged
+            return version, True, []
+        events = events_since(db, project_id, since, settings.KANBAN_CATCH_UP_LIMIT + 1)
+        if len(events) > settings.KANBAN_CATCH_UP_LIMIT:
+            return version, True, []
+        return version, False, events
+
+    async def subscribe(self, project_id: int, since: Optional[int]) -> Tuple[Subscriber, List[Dict[str, Any]]]:
+        """Register a subscriber and return the messages that bring it up to date"""
+        self._loop = asyncio.get_running_loop()
+        if project_id not in self._versions:
+            self._versions[project_id] = await run_in_threadpool(self._read, current_version, project_id)
+        subscriber = Subscriber(project_id, since or 0)
+        # Registered before catching up so that no broadcast falls in between;
+        # events seen by both are delivered once
+        self._subscribers.setdefault(project_id, set()).add(subscriber)
+        if self._poller is None or self._poller.done() or self._poller.get_loop() is not self._loop:
+            self._poller = asyncio.create_task(self._poll())
+        version, resync, events = await run_in_threadpool(self._read, self._catch_up, project_id, since)
+        if resync:
+            subscriber.version = version
+            return subscriber, [{"type": "resync", "version": version}]
+        messages = []
+        if events:
+            messages.append(subscriber.render({"type": "patch", "version": events[-1][0], "events": events}))
+        subscriber.version = max(subscriber.version, version)
+        messages.append({"type": "hello", "version": subscriber.version})
+        return subscriber, messages
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self._subscribers.get(subscriber.project_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.project_id]
+                self._versions.pop(subscriber.project_id, None)
+
+    def notify(self, project_ids):
+        """Called after commit, from any thread"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        for project_id in project_ids:
+            if project_id in self._subscribers:
+                loop.call_soon_threadsafe(lambda project_id=project_id: asyncio.ensure_future(
+                    self.broadcast(project_id)
+                ))
+
+    async def broadcast(self, project_id: int):
+        """Push a project's events after the last broadcast version to its subscribers"""
+        lock = self._locks.setdefault(project_id, asyncio.Lock())
+        async with lock:
+            since = self._versions.get(project_id)
+            if since is None or project_id not in self._subscribers:
+                return
+            events = await run_in_threadpool(
+                self._read, events_since, project_id, since, settings.KANBAN_CATCH_UP_LIMIT
+            )
+            if not events:
+                return
+            self._versions[project_id] = events[-1][0]
+            message = {"type": "patch", "version": events[-1][0], "events": events}
+            for subscriber in list(self._subscribers.get(project_id, ())):
+                subscriber.offer(message)
+
+    async def _poll(self):
+        """Pick up events written by other workers"""
+        while self._subscribers:
+            await asyncio.sleep(settings.KANBAN_POLL_INTERVAL_SECONDS)
+            project_ids = list(self._subscribers)
+            if not project_ids:
+                break
+            try:
+                latest = await run_in_threadpool(self._read, latest_versions, project_ids)
+            except Exception:  # noqa: BLE001 - keep polling
+                logger.exception("Kanban version poll failed")
+                continue
+            for project_id, version in latest.items():
+                if version > self._versions.get(project_id, 0):
+                    await self.broadcast(project_id)
+
+
+kanban_hub = KanbanHub()
+register_commit_listener(kanban_hub.notify)
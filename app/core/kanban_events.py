@@ -0,0 +1,242 @@
+"""
+Card-level kanban change log
+
+Every flush that creates, edits, moves or deletes a task appends compact
+patch operations to `kanban_events`, in the same transaction as the change.
+Events are numbered by a per-project board version: a client that has
+applied everything up to version N asks for the project's events with
+version > N. Versions come from the project's `kanban_board_versions` row,
+which the writing transaction updates and so keeps locked until it commits.
+Concurrent writers to one board therefore get versions in commit order, and
+a reader never sees version N + 1 before N (autoincrement ids, by contrast,
+are allocated before commit and can become visible out of order).
+After commit the touched projects are handed to the in-process WebSocket
+hub (app.core.kanban_channel), which pushes the new events to subscribers.
+"""
+
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.scheduler import register_periodic_job
+from app.models.enums import TaskStatus
+from app.models.kanban_board_version import KanbanBoardVersion
+from app.models.kanban_event import KanbanEvent
+from app.models.task import Task
+from app.models.user import User
+
+KANBAN_EVENT_CLEANUP_JOB = "kanban_event_cleanup"
+PENDING_PROJECTS_KEY = "kanban_pending_projects"
+
+CARD_FIELDS = ("title", "priority", "story_points", "due_date", "assignee_id")
+POSITION_FIELDS = ("status", "rank")
+
+_commit_listeners = []
+
+
+def register_commit_listener(listener):
+    """Call `listener(project_ids)` after each commit that recorded kanban events"""
+    _commit_listeners.append(listener)
+
+
+def kanban_card(row) -> Dict[str, Any]:
+    """A card as shown on the board, from a row (or namespace) with task and assignee fields"""
+    return {
+        "id": row.id,
+        "title": row.title,
+        "priority": row.priority.value,
+        "story_points": row.story_points,
+        "assignee": {
+            "id": row.assignee_id,
+            "username": row.assignee_username,
+            "full_name": f"{row.assignee_first_name} {row.assignee_last_name}"
+            if row.assignee_first_name and row.assignee_last_name else row.assignee_username
+        } if row.assignee_id else None,
+        "due_date": row.due_date,
+        "rank": row.rank
+    }
+
+
+def _changed(state, keys) -> bool:
+    return any(state.attrs[key].history.has_changes() for key in keys)
+
+
+def _card_ops(session: Session) -> List[Tuple[int, Optional[int], str, Task]]:
+    """(project_id, task_id, op, task) for the task changes in the flush"""
+    changes = []
+    for task in session.new:
+        if isinstance(task, Task):
+            changes.append((task.project_id, task.id, "created", task))
+    for task in session.dirty:
+        if not isinstance(task, Task):
+            continue
+        state = inspect(task)
+        project_history = state.attrs.project_id.history
+        if project_history.has_changes() and project_history.deleted:
+            changes.append((project_history.deleted[0], task.id, "deleted", task))
+            changes.append((task.project_id, task.id, "created", task))
+        elif _changed(state, POSITION_FIELDS):
+            changes.append((task.project_id, task.id, "moved", task))
+        elif _changed(state, CARD_FIELDS):
+            changes.append((task.project_id, task.id, "updated", task))
+    for task in session.deleted:
+        # Read without loading: the row is already gone
+        if isinstance(task, Task) and task.__dict__.get("project_id") is not None:
+            changes.append((task.__dict__["project_id"], task.id, "deleted", task))
+    return changes
+
+
+def _allocate_versions(connection: Connection, project_id: int, count: int) -> int:
+    """Reserve `count` versions of a project's board; returns the last one"""
+    table = KanbanBoardVersion.__table__
+    bump = update(table).where(table.c.project_id == project_id).values(version=table.c.version + count)
+    if connection.execute(bump).rowcount == 0:
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(table).values(project_id=project_id, version=count))
+            return count
+        except IntegrityError:
+            # Another writer created the row first
+            connection.execute(bump)
+    return connection.execute(select(table.c.version).where(table.c.project_id == project_id)).scalar_one()
+
+
+def _insert_events(session: Session, rows: List[Dict[str, Any]]):
+    if not rows:
+        return
+    connection = session.connection()
+    by_project: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_project.setdefault(row["project_id"], []).append(row)
+    # Sorted, so that writers to several boards lock their rows in the same order
+    for project_id in sorted(by_project):
+        project_rows = by_project[project_id]
+        last = _allocate_versions(connection, project_id, len(project_rows))
+        for offset, row in enumerate(project_rows):
+            row["version"] = last - len(project_rows) + 1 + offset
+    connection.execute(KanbanEvent.__table__.insert(), rows)
+    session.info.setdefault(PENDING_PROJECTS_KEY, set()).update(row["project_id"] for row in rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_card_events(session, flush_context):
+    changes = _card_ops(session)
+    if not changes:
+        return
+    assignee_ids = {task.assignee_id for _, _, op, task in changes if op != "deleted" and task.assignee_id}
+    assignees = {}
+    if assignee_ids:
+        assignees = {row.id: row for row in session.connection().execute(
+            select(User.id, User.username, User.first_name, User.last_name).where(User.id.in_(assignee_ids))
+        )}
+    rows = []
+    for project_id, task_id, op, task in changes:
+        patch = {"op": op, "id": task_id}
+        if op != "deleted":
+            assignee = assignees.get(task.assignee_id)
+            patch["status"] = (task.status or TaskStatus.TODO).value
+            patch["card"] = kanban_card(SimpleNamespace(
+                id=task.id, title=task.title, priority=task.priority, story_points=task.story_points,
+                due_date=task.due_date, rank=task.rank, assignee_id=task.assignee_id,
+                assignee_username=assignee.username if assignee else None,
+                assignee_first_name=assignee.first_name if assignee else None,
+                assignee_last_name=assignee.last_name if assignee else None
+            ))
+        rows.append({
+            "project_id": project_id,
+            "task_id": task_id,
+            "op": op,
+            "payload": json.dumps(jsonable_encoder(patch)),
+            "created_at": datetime.utcnow()
+        })
+    _insert_events(session, rows)
+
+
+def record_column_reset(db: Session, conditions: tuple):
+    """Tell subscribers to reload the task columns matching `conditions` (after bulk rank changes)"""
+    columns = db.query(Task.project_id, Task.status).filter(*conditions).distinct().all()
+    _insert_events(db, [
+        {
+            "project_id": project_id,
+            "task_id": None,
+            "op": "reset",
+            "payload": json.dumps({"op": "reset", "status": status.value}),
+            "created_at": datetime.utcnow()
+        } for project_id, status in columns
+    ])
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_subscribers(session):
+    projects = session.info.pop(PENDING_PROJECTS_KEY, None)
+    if projects:
+        for listener in _commit_listeners:
+            listener(projects)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(PENDING_PROJECTS_KEY, None)
+
+
+def current_version(db: Session, project_id: int) -> int:
+    """Latest version of a project's board"""
+    return db.query(KanbanBoardVersion.version).filter(
+        KanbanBoardVersion.project_id == project_id
+    ).scalar() or 0
+
+
+def oldest_version(db: Session, project_id: int) -> int:
+    """Oldest version of a project's board still in the log (one past the latest if all were purged)"""
+    oldest = db.query(func.min(KanbanEvent.version)).filter(KanbanEvent.project_id == project_id).scalar()
+    return oldest if oldest is not None else current_version(db, project_id) + 1
+
+
+def events_since(db: Session, project_id: int, version: int, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+    """(version, patch operation) for a project's events after `version`, oldest first"""
+    rows = db.query(KanbanEvent.version, KanbanEvent.payload).filter(
+        KanbanEvent.project_id == project_id,
+        KanbanEvent.version > version
+    ).order_by(KanbanEvent.version).limit(limit).all()
+    return [(row.version, json.loads(row.payload)) for row in rows]
+
+
+def latest_versions(db: Session, project_ids) -> Dict[int, int]:
+    """Latest board version per project, for the given projects"""
+    return dict(db.query(KanbanBoardVersion.project_id, KanbanBoardVersion.version).filter(
+        KanbanBoardVersion.project_id.in_(project_ids)
+    ).all())
+
+
+def purge_kanban_events(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete events past the retention period; clients older than that resync"""
+    now = now or datetime.utcnow()
+    deleted = db.query(KanbanEvent).filter(
+        KanbanEvent.created_at < now - timedelta(hours=settings.KANBAN_EVENT_RETENTION_HOURS)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def run_kanban_event_cleanup() -> int:
+    db = SessionLocal()
+    try:
+        return purge_kanban_events(db)
+    finally:
+        db.close()
+
+
+def register_kanban_event_cleanup():
+    """Register the event retention job with the background scheduler"""
+    register_periodic_job(
+        KANBAN_EVENT_CLEANUP_JOB, settings.KANBAN_EVENT_CLEANUP_INTERVAL_SECONDS, run_kanban_event_cleanup
+    )
@@ -0,0 +1,306 @@
+"""
+Denormalized per-project counters
+
+`project_stats` holds one row per project: task counts per status, story
+points, task and logged hours, and the sprint-weighted completion
+percentage. Every flush that changes one of their inputs (tasks, sprints,
+time logs or the project's estimate) recomputes the rows of the affected
+projects on the flushing connection, in the same transaction as the
+change, so read paths are a primary-key lookup.
+
+Bulk Query.update()/delete() statements bypass the flush, and concurrent
+writers to one project can each recompute from their own snapshot. A
+periodic consistency check recomputes every project and repairs rows that
+drifted.
+"""
+
+import logging
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Float, bindparam, case, cast, delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.scheduler import register_periodic_job
+from app.models.enums import TaskStatus
+from app.models.project import Project
+from app.models.project_stats import ProjectStats
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.time_log import TimeLog
+
+logger = logging.getLogger(__name__)
+
+PROJECT_STATS_CHECK_JOB = "project_stats_check"
+PREVIOUS_PROJECTS_KEY = "project_stats_previous_projects"
+
+TASK_FIELDS = ("project_id", "sprint_id", "status", "story_points", "estimated_hours", "actual_hours")
+SPRINT_FIELDS = ("project_id", "estimated_hours")
+TIME_LOG_FIELDS = ("task_id", "hours")
+OWNER_KEYS = {Task: "project_id", Sprint: "project_id", TimeLog: "task_id"}
+
+STATUS_COLUMNS = {
+    TaskStatus.TODO: "todo_tasks",
+    TaskStatus.IN_PROGRESS: "in_progress_tasks",
+    TaskStatus.REVIEW: "review_tasks",
+    TaskStatus.DONE: "done_tasks",
+    TaskStatus.BLOCKED: "blocked_tasks"
+}
+COUNT_COLUMNS = ("total_tasks", *STATUS_COLUMNS.values(), "total_story_points", "done_story_points")
+TASK_HOUR_COLUMNS = ("estimated_task_hours", "actual_task_hours")
+COUNTER_COLUMNS = (*COUNT_COLUMNS, *TASK_HOUR_COLUMNS, "spent_hours", "completion_percentage")
+
+
+def completion_percentage(estimated_hours: float, done_hours: float) -> float:
+    """Share of the project's estimated hours covered by completed sprint work"""
+    if not estimated_hours:
+        return 0.0
+    return round(float(done_hours or 0) / estimated_hours * 100, 2)
+
+
+def empty_project_stats(project_id: int) -> ProjectStats:
+    """Zeroed (transient) stats, for projects whose row has not been written yet"""
+    return ProjectStats(project_id=project_id, **{column: 0 for column in COUNTER_COLUMNS})
+
+
+def load_project_stats(db: Session, project_id: int) -> ProjectStats:
+    return db.get(ProjectStats, project_id) or empty_project_stats(project_id)
+
+
+def _scoped(statement, column, project_ids: Optional[Iterable[int]]):
+    return statement if project_ids is None else statement.where(column.in_(project_ids))
+
+
+def compute_project_stats(connection: Connection, project_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+    """Counter values recomputed from the source tables, for the given projects (default: all)
+
+    Completion is the sum over sprints with estimated hours and tasks of
+    estimated_hours * done_tasks / tasks, over the project's estimate.
+    """
+    if project_ids is not None:
+        project_ids = list(project_ids)
+    done = case((Task.status == TaskStatus.DONE, 1), else_=0)
+    task_totals = _scoped(select(
+        Task.project_id,
+        func.count(Task.id).label("total_tasks"),
+        *[
+            func.sum(case((Task.status == task_status, 1), else_=0)).label(column)
+            for task_status, column in STATUS_COLUMNS.items()
+        ],
+        func.sum(Task.story_points).label("total_story_points"),
+        func.sum(case((Task.status == TaskStatus.DONE, Task.story_points), else_=0)).label("done_story_points"),
+        func.sum(Task.estimated_hours).label("estimated_task_hours"),
+        func.sum(Task.actual_hours).label("actual_task_hours")
+    ), Task.project_id, project_ids).group_by(Task.project_id).subquery()
+
+    spent_hours = _scoped(select(
+        Task.project_id,
+        func.sum(TimeLog.hours).label("spent_hours")
+    ).join(Task, TimeLog.task_id == Task.id), Task.project_id, project_ids).group_by(Task.project_id).subquery()
+
+    sprint_tasks = _scoped(select(
+        Sprint.project_id,
+        Sprint.estimated_hours,
+        func.count(Task.id).label("tasks"),
+        func.sum(done).label("done")
+    ).join(Task, Task.sprint_id == Sprint.id).where(Sprint.estimated_hours > 0), Sprint.project_id, project_ids).group_by(
+        Sprint.id, Sprint.project_id, Sprint.estimated_hours
+    ).subquery()
+    sprint_progress = select(
+        sprint_tasks.c.project_id,
+        func.sum(sprint_tasks.c.estimated_hours * cast(sprint_tasks.c.done, Float) / sprint_tasks.c.tasks).label("done_hours")
+    ).group_by(sprint_tasks.c.project_id).subquery()
+
+    rows = connection.execute(_scoped(select(
+        Project.id,
+        Project.estimated_hours,
+        *[task_totals.c[column] for column in COUNT_COLUMNS + TASK_HOUR_COLUMNS],
+        spent_hours.c.spent_hours,
+        sprint_progress.c.done_hours
+    ).outerjoin(task_totals, task_totals.c.project_id == Project.id).outerjoin(
+        spent_hours, spent_hours.c.project_id == Project.id
+    ).outerjoin(
+        sprint_progress, sprint_progress.c.project_id == Project.id
+    ), Project.id, project_ids))
+
+    stats = {}
+    for row in rows:
+        values = {column: int(getattr(row, column) or 0) for column in COUNT_COLUMNS}
+        for column in TASK_HOUR_COLUMNS + ("spent_hours",):
+            values[column] = float(getattr(row, column) or 0)
+        values["completion_percentage"] = completion_percentage(row.estimated_hours, row.done_hours)
+        stats[row.id] = values
+    return stats
+
+
+def _write_stats(connection: Connection, stats: Dict[int, Dict[str, Any]]):
+    """Update existing rows in place and insert the missing ones
+
+    A concurrent writer may insert one of the missing rows first; the
+    inserts run in a savepoint and fall back to row-by-row inserts or
+    updates when one collides.
+    """
+    if not stats:
+        return
+    now = datetime.utcnow()
+    existing = set(connection.execute(
+        select(ProjectStats.project_id).where(ProjectStats.project_id.in_(list(stats)))
+    ).scalars())
+    updates = [{"_project_id": project_id, **values, "updated_at": now}
+               for project_id, values in stats.items() if project_id in existing]
+    inserts = [{"project_id": project_id, **values, "updated_at": now}
+               for project_id, values in stats.items() if project_id not in existing]
+    if inserts:
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(ProjectStats.__table__), inserts)
+        except IntegrityError:
+            for row in inserts:
+                try:
+                    with connection.begin_nested():
+                        connection.execute(insert(ProjectStats.__table__), row)
+                except IntegrityError:
+                    updates.append({"_project_id": row.pop("project_id"), **row})
+    if updates:
+        connection.execute(
+            update(ProjectStats.__table__).where(ProjectStats.project_id == bindparam("_project_id")),
+            updates
+        )
+
+
+def refresh_project_stats(connection: Connection, project_ids: Optional[Iterable[int]] = None):
+    """Recompute and store the counters of the given projects (default: all)"""
+    _write_stats(connection, compute_project_stats(connection, project_ids))
+
+
+def _changed(state, keys) -> bool:
+    return any(state.attrs[key].history.has_changes() for key in keys)
+
+
+def _history_values(state, key: str) -> set:
+    """Current and previous values of an attribute, without loading it"""
+    history = state.attrs[key].history
+    return {value for value in list(history.added) + list(history.deleted) + list(history.unchanged or ())
+            if value is not None}
+
+
+def _owner_values(session: Session, obj, state, key: str) -> set:
+    values = _history_values(state, key)
+    if not values and obj not in session.deleted:
+        # Expired and unchanged: the flushed row still holds the value
+        values = {getattr(obj, key)} - {None}
+    return values
+
+
+def _owner_projects_query(model, ids):
+    if model is TimeLog:
+        return select(Task.project_id).join(TimeLog, TimeLog.task_id == Task.id).where(TimeLog.id.in_(ids))
+    return select(model.project_id).where(model.id.in_(ids))
+
+
+@event.listens_for(Session, "before_flush")
+def _capture_previous_projects(session, flush_context, instances):
+    """Projects that rows are moved out of when their old owner was never loaded"""
+    moved = {}
+    for obj in session.dirty:
+        key = OWNER_KEYS.get(type(obj))
+        if key is None:
+            continue
+        history = inspect(obj).attrs[key].history
+        if history.added and not history.deleted:
+            moved.setdefault(type(obj), []).append(obj.id)
+    for model, ids in moved.items():
+        session.info.setdefault(PREVIOUS_PROJECTS_KEY, set()).update(
+            session.connection().execute(_owner_projects_query(model, ids)).scalars()
+        )
+
+
+def _affected_projects(session: Session):
+    """(projects to recompute, deleted projects) for the pending flush"""
+    projects, task_ids, deleted = session.info.pop(PREVIOUS_PROJECTS_KEY, set()), set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        state = inspect(obj)
+        touched = obj in session.new or obj in session.deleted
+        if isinstance(obj, Task):
+            if touched or _changed(state, TASK_FIELDS):
+                projects |= _owner_values(session, obj, state, "project_id")
+        elif isinstance(obj, Sprint):
+            if touched or _changed(state, SPRINT_FIELDS):
+                projects |= _owner_values(session, obj, state, "project_id")
+        elif isinstance(obj, TimeLog):
+            if touched or _changed(state, TIME_LOG_FIELDS):
+                task_ids |= _owner_values(session, obj, state, "task_id")
+        elif isinstance(obj, Project):
+            if obj in session.deleted:
+                deleted.add(obj.id)
+            elif touched or _changed(state, ("estimated_hours",)):
+                projects.add(obj.id)
+    if task_ids:
+        projects |= set(session.connection().execute(
+            select(Task.project_id).where(Task.id.in_(task_ids))
+        ).scalars())
+    projects.discard(None)
+    return projects - deleted, deleted
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_affected_stats(session, flush_context):
+    projects, deleted = _affected_projects(session)
+    # Plain SQL on the flushing connection: part of the same transaction
+    connection = session.connection()
+    if deleted:
+        connection.execute(delete(ProjectStats.__table__).where(ProjectStats.project_id.in_(deleted)))
+    if projects:
+        refresh_project_stats(connection, projects)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_previous_projects(session):
+    session.info.pop(PREVIOUS_PROJECTS_KEY, None)
+
+
+def _matches(row, values: Dict[str, Any]) -> bool:
+    return all(math.isclose(getattr(row, column), value, abs_tol=1e-6) for column, value in values.items())
+
+
+def check_project_stats(db: Session, repair: bool = True) -> List[int]:
+    """Compare every project's stored counters with a recomputation
+
+    Returns the ids of projects whose row is missing, orphaned or out of
+    date; with `repair`, those rows are rewritten (or deleted) and committed.
+    """
+    connection = db.connection()
+    expected = compute_project_stats(connection)
+    stored = {row.project_id: row for row in connection.execute(select(ProjectStats.__table__))}
+    drifted = {project_id: values for project_id, values in expected.items()
+               if project_id not in stored or not _matches(stored[project_id], values)}
+    orphaned = set(stored) - set(expected)
+    if repair and (drifted or orphaned):
+        _write_stats(connection, drifted)
+        if orphaned:
+            connection.execute(delete(ProjectStats.__table__).where(ProjectStats.project_id.in_(orphaned)))
+        db.commit()
+    return sorted(set(drifted) | orphaned)
+
+
+def run_project_stats_check() -> List[int]:
+    db = SessionLocal()
+    try:
+        repaired = check_project_stats(db)
+        if repaired:
+            logger.warning("Repaired project stats of %s projects: %s", len(repaired), repaired[:20])
+        return repaired
+    finally:
+        db.close()
+
+
+def register_project_stats_check():
+    """Register the project stats consistency check with the background scheduler"""
+    register_periodic_job(
+        PROJECT_STATS_CHECK_JOB, settings.PROJECT_STATS_CHECK_INTERVAL_SECONDS, run_project_stats_check
+    )
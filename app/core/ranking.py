@@ -0,0 +1,209 @@
+"""
+Rank-based ordering of kanban cards and backlog items
+
+Tasks are ordered within their (project, status) column and backlog items
+within their project by a LexoRank-style string rank: base-36 digits read
+as a fraction, compared as plain strings. Moving an item computes a rank
+between its new neighbours and updates only that row. Ranks grow longer
+when items are repeatedly dropped into the same gap, so a periodic job
+respaces columns whose longest rank passes RANK_REBALANCE_LENGTH (and
+ranks rows that predate the column).
+
+Until then unranked rows sort first. Databases disagree on where NULLs
+sort, so every query orders by rank_order() and pages with after_rank().
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, event, func, inspect, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.kanban_events import record_column_reset
+from app.core.scheduler import register_periodic_job
+from app.models.backlog import Backlog
+from app.models.enums import TaskStatus
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+RANK_REBALANCE_JOB = "rank_rebalance"
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(ALPHABET)
+_DIGITS = {char: index for index, char in enumerate(ALPHABET)}
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """A rank sorting strictly between `before` and `after` (None is open-ended)
+
+    Ranks never end in "0", so there is always room below any rank.
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"No rank between {before!r} and {after!r}")
+    before = before or ""
+    rank = ""
+    position = 0
+    while True:
+        low = _DIGITS[before[position]] if position < len(before) else 0
+        high = _DIGITS[after[position]] if after is not None and position < len(after) else BASE
+        if high - low > 1:
+            return rank + ALPHABET[(low + high) // 2]
+        rank += ALPHABET[low]
+        if high - low == 1:
+            # The prefix is already below `after`; only `before` still bounds it
+            after = None
+        position += 1
+
+
+def spaced_ranks(count: int) -> List[str]:
+    """`count` evenly spaced ranks of equal (minimal) length"""
+    width = 1
+    while BASE ** width <= count:
+        width += 1
+    step = BASE ** width // (count + 1)
+    ranks = []
+    for index in range(1, count + 1):
+        value, digits = step * index, []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(ALPHABET[digit])
+        ranks.append("".join(reversed(digits)).rstrip("0"))
+    return ranks
+
+
+def rank_order(model) -> tuple:
+    """ORDER BY clauses for a column: unranked rows first, then by rank and id"""
+    return model.rank.is_(None).desc(), model.rank, model.id
+
+
+def after_rank(model, rank: Optional[str], item_id: int):
+    """Rows sorting after (rank, item_id) in rank_order()"""
+    if rank is None:
+        return or_(model.rank.isnot(None), and_(model.rank.is_(None), model.id > item_id))
+    return or_(model.rank > rank, and_(model.rank == rank, model.id > item_id))
+
+
+def _task_column(task: Task) -> tuple:
+    return Task.project_id == task.project_id, Task.status == (task.status or TaskStatus.TODO)
+
+
+def _backlog_column(backlog: Backlog) -> tuple:
+    return (Backlog.project_id == backlog.project_id,)
+
+
+def _column_key(obj) -> tuple:
+    if isinstance(obj, Task):
+        return Task, obj.project_id, obj.status or TaskStatus.TODO
+    return Backlog, obj.project_id
+
+
+def last_rank(db: Session, model, conditions: tuple, exclude_id: Optional[int] = None) -> Optional[str]:
+    query = db.query(func.max(model.rank)).filter(*conditions)
+    if exclude_id is not None:
+        query = query.filter(model.id != exclude_id)
+    return query.scalar()
+
+
+def move_rank(db: Session, model, conditions: tuple, item_id: int,
+              before_id: Optional[int] = None, after_id: Optional[int] = None) -> str:
+    """Rank placing an item right after `after_id`, right before `before_id`, or at the end of a column
+
+    The anchor must be in the column. If its neighbourhood has no room
+    (duplicate or missing ranks) the column is respaced first.
+    """
+    for attempt in range(2):
+        others = db.query(model).filter(*conditions, model.id != item_id)
+        anchor_id = after_id if after_id is not None else before_id
+        anchor_rank = None
+        if anchor_id is not None:
+            anchor = others.with_entities(model.rank).filter(model.id == anchor_id).first()
+            if anchor is None:
+                raise LookupError("The anchor item is not in the target column")
+            anchor_rank = anchor.rank
+        try:
+            if anchor_id is not None and anchor_rank is None:
+                raise ValueError("Unranked anchor")
+            if after_id is not None:
+                following = others.with_entities(func.min(model.rank)).filter(model.rank > anchor_rank).scalar()
+                return rank_between(anchor_rank, following)
+            if before_id is not None:
+                preceding = others.with_entities(func.max(model.rank)).filter(model.rank < anchor_rank).scalar()
+                return rank_between(preceding, anchor_rank)
+            return rank_between(others.with_entities(func.max(model.rank)).scalar(), None)
+        except ValueError:
+            if attempt:
+                raise
+            rebalance_column(db, model, conditions)
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_ranks(session, flush_context, instances):
+    """Append new items, and tasks that change column, to the end of their column"""
+    moved = [
+        obj for obj in session.dirty
+        if isinstance(obj, Task) and inspect(obj).attrs.status.history.has_changes()
+        and not inspect(obj).attrs.rank.history.has_changes()
+    ]
+    with session.no_autoflush:
+        # Tasks moved together keep their relative order
+        moved.sort(key=lambda task: (task.rank is not None, task.rank or "", task.id))
+    created = [obj for obj in session.new if isinstance(obj, (Task, Backlog)) and obj.rank is None]
+    appended: Dict[tuple, Optional[str]] = {}
+    for obj in moved + created:
+        key = _column_key(obj)
+        if key not in appended:
+            conditions = _task_column(obj) if isinstance(obj, Task) else _backlog_column(obj)
+            with session.no_autoflush:
+                appended[key] = last_rank(session, type(obj), conditions, exclude_id=obj.id)
+        obj.rank = appended[key] = rank_between(appended[key], None)
+
+
+def rebalance_column(db: Session, model, conditions: tuple) -> int:
+    """Respace every rank in a column, keeping the current order (unranked rows first)"""
+    ids = [row.id for row in db.query(model.id).filter(*conditions).order_by(*rank_order(model)).all()]
+    if ids:
+        db.execute(update(model), [
+            {"id": item_id, "rank": rank} for item_id, rank in zip(ids, spaced_ranks(len(ids)))
+        ])
+        if model is Task:
+            record_column_reset(db, conditions)
+    return len(ids)
+
+
+def rebalance_ranks(db: Session, max_length: Optional[int] = None) -> int:
+    """Rebalance the columns with over-long or missing ranks; returns the number of columns"""
+    max_length = max_length or settings.RANK_REBALANCE_LENGTH
+    needs_rebalance = lambda model: (  # noqa: E731
+        func.max(func.length(model.rank)) > max_length
+    ) | (func.count(model.id) > func.count(model.rank))
+    task_columns = db.query(Task.project_id, Task.status).group_by(
+        Task.project_id, Task.status
+    ).having(needs_rebalance(Task)).all()
+    backlog_columns = db.query(Backlog.project_id).group_by(Backlog.project_id).having(
+        needs_rebalance(Backlog)
+    ).all()
+    for project_id, status in task_columns:
+        rebalance_column(db, Task, (Task.project_id == project_id, Task.status == status))
+        db.commit()
+    for (project_id,) in backlog_columns:
+        rebalance_column(db, Backlog, (Backlog.project_id == project_id,))
+        db.commit()
+    return len(task_columns) + len(backlog_columns)
+
+
+def run_rank_rebalance() -> int:
+    db = SessionLocal()
+    try:
+        rebalanced = rebalance_ranks(db)
+        if rebalanced:
+            logger.info("Rebalanced ranks in %s columns", rebalanced)
+        return rebalanced
+    finally:
+        db.close()
+
+
+def register_rank_rebalance_job():
+    """Register the rank rebalance job with the background scheduler"""
+    register_periodic_job(RANK_REBALANCE_JOB, settings.RANK_REBALANCE_INTERVAL_SECONDS, run_rank_rebalance)
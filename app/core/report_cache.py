@@ -0,0 +1,205 @@
+"""
+Result cache for report and analytics endpoints
+
+Entries are keyed by (endpoint, normalized filters, hash of the caller's
+accessible project ids) and remember the version of every table the report
+reads. Committed writes bump per-table version counters, which makes the
+matching entries stale. A stale entry is recomputed by the first caller that
+sees it while concurrent callers keep getting the stale value
+(stale-while-revalidate), so a recompute never blocks more than one request.
+
+Counters live in process memory; each worker keeps its own cache.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+PENDING_TABLES_KEY = "report_cache_tables"
+
+
+class TableVersions:
+    """Monotonic per-table write counters"""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, tables: Iterable[str]):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        with self._lock:
+            return tuple((table, self._versions.get(table, 0)) for table in sorted(tables))
+
+
+table_versions = TableVersions()
+
+
+class CacheEntry:
+    def __init__(self, value: Any, versions: tuple, created_at: float):
+        self.value = value
+        self.versions = versions
+        self.created_at = created_at
+
+
+class ReportCache:
+    """LRU of report results with single-flight revalidation"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 300, max_stale_seconds: int = 3600,
+                 versions: TableVersions = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.versions = versions or table_versions
+        self._entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self._computing: Dict[tuple, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: tuple, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: tuple, tables: Iterable[str], compute: Callable[[], Any]) -> Any:
+        tables = tuple(tables)
+        while True:
+            versions = self.versions.snapshot(tables)
+            now = time.monotonic()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    age = now - entry.created_at
+                    if entry.versions == versions and age < self.ttl_seconds:
+                        self._entries.move_to_end(key)
+                        return entry.value
+                    if age >= self.max_stale_seconds:
+                        entry = None
+                in_flight = self._computing.get(key)
+                if in_flight is None:
+                    in_flight = self._computing[key] = threading.Event()
+                    break
+                if entry is not None:
+                    # Someone is already revalidating; serve the stale result
+                    return entry.value
+            # Cold miss with a computation in progress: wait for it, then re-check
+            in_flight.wait(self.ttl_seconds)
+
+        try:
+            value = compute()
+            self._store(key, CacheEntry(value, versions, time.monotonic()))
+            return value
+        finally:
+            with self._lock:
+                self._computing.pop(key, None)
+            in_flight.set()
+
+
+report_cache = ReportCache(
+    settings.REPORT_CACHE_SIZE, settings.REPORT_CACHE_TTL_SECONDS, settings.REPORT_CACHE_MAX_STALE_SECONDS
+)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(_normalize(item) for item in value))
+    return value
+
+
+def project_set_hash(project_ids: Iterable[int]) -> str:
+    joined = ",".join(str(project_id) for project_id in sorted(set(project_ids)))
+    return hashlib.sha1(joined.encode()).hexdigest()
+
+
+def report_cache_key(endpoint: str, filters: Dict[str, Any], project_ids: Iterable[int],
+                     user_id: Optional[int] = None) -> tuple:
+    normalized = tuple(sorted(
+        (name, _normalize(value)) for name, value in filters.items() if value is not None
+    ))
+    return (endpoint, normalized, project_set_hash(project_ids), user_id)
+
+
+def cached_report(endpoint: str, tables: Iterable[str], scope: Callable, per_user: bool = False):
+    """Cache an endpoint's result
+
+    `scope(current_user, db)` returns the caller's accessible project ids.
+    Set `per_user` when the result also depends on who is asking (for
+    example, team leaders only see their own teams).
+    """
+    tables = tuple(tables)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.REPORT_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            db = kwargs["db"]
+            current_user = kwargs["current_user"]
+            filters = {name: value for name, value in kwargs.items() if name not in ("db", "current_user")}
+            key = report_cache_key(
+                endpoint, filters, scope(current_user, db),
+                current_user.id if per_user else None
+            )
+            return report_cache.get_or_compute(key, tables, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def _changed_tables(session: Session) -> set:
+    tables = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        state = inspect(obj)
+        tables.add(state.mapper.persist_selectable.name)
+        for relationship in state.mapper.relationships:
+            if relationship.secondary is not None and state.attrs[relationship.key].history.has_changes():
+                tables.add(relationship.secondary.name)
+    return tables
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    # new/dirty/deleted still describe the flushed changes at this point
+    session.info.setdefault(PENDING_TABLES_KEY, set()).update(_changed_tables(session))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    # Query.update()/delete() and session.execute(insert(...)) bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            orm_execute_state.session.info.setdefault(PENDING_TABLES_KEY, set()).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    tables = session.info.pop(PENDING_TABLES_KEY, None)
+    if tables:
+        table_versions.bump(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tables(session):
+    session.info.pop(PENDING_TABLES_KEY, None)
@@ -0,0 +1,89 @@
+"""
+Lightweight in-process scheduler for periodic maintenance jobs
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """A named callable that runs every `interval_seconds`"""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], None]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.next_run = time.monotonic() + interval_seconds
+        self.last_error: Optional[str] = None
+
+    def run(self):
+        """Run the job once, recording (but never raising) failures"""
+        try:
+            self.func()
+            self.last_error = None
+        except Exception as exc:  # noqa: BLE001 - a failing job must not kill the scheduler
+            self.last_error = str(exc)
+            logger.exception("Periodic job %s failed", self.name)
+        finally:
+            self.next_run = time.monotonic() + self.interval_seconds
+
+
+_jobs: Dict[str, PeriodicJob] = {}
+_lock = threading.Lock()
+_stop_event = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def register_periodic_job(name: str, interval_seconds: float, func: Callable[[], None]) -> PeriodicJob:
+    """Register (or replace) a periodic job"""
+    job = PeriodicJob(name, interval_seconds, func)
+    with _lock:
+        _jobs[name] = job
+    return job
+
+
+def get_registered_jobs() -> Dict[str, PeriodicJob]:
+    """Return a snapshot of the registered jobs"""
+    with _lock:
+        return dict(_jobs)
+
+
+def run_job_now(name: str) -> bool:
+    """Run a registered job immediately in the caller's thread"""
+    with _lock:
+        job = _jobs.get(name)
+    if job is None:
+        return False
+    job.run()
+    return True
+
+
+def _run_loop(tick_seconds: float):
+    while not _stop_event.wait(tick_seconds):
+        now = time.monotonic()
+        for job in list(get_registered_jobs().values()):
+            if job.next_run <= now:
+                job.run()
+
+
+def start_scheduler(tick_seconds: float = 1.0):
+    """Start the scheduler thread if it is not already running"""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop_event.clear()
+    _thread = threading.Thread(target=_run_loop, args=(tick_seconds,), name="scheduler", daemon=True)
+    _thread.start()
+
+
+def stop_scheduler(timeout: float = 5.0):
+    """Signal the scheduler thread to stop and wait for it"""
+    global _thread
+    _stop_event.set()
+    if _thread is not None:
+        _thread.join(timeout)
+    _thread = None
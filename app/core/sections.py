@@ -0,0 +1,88 @@
+"""
+Concurrent composition of independent response sections
+
+A composite endpoint (such as the dashboard) describes its parts as
+Sections. `compose_sections` runs each one in the threadpool on its own
+session, so each section gets its own pooled connection and they run
+concurrently. Every section has a timeout, and a failing or slow section
+only blanks out its own keys. Latency then follows the slowest section
+rather than the sum of all of them.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+SECTIONS_KEY = "sections"
+
+
+class Section:
+    """A named part of a composite response
+
+    `func(session)` returns a dict that is merged into the response; `keys`
+    are set to None when the section fails or times out.
+    """
+
+    def __init__(self, name: str, func: Callable[[Session], Dict[str, Any]], keys: Iterable[str] = None,
+                 timeout: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.keys = tuple(keys) if keys is not None else (name,)
+        self.timeout = timeout
+
+
+def section_sessions(db: Session) -> Callable[[], Session]:
+    """Factory for extra sessions bound to the same engine as `db`"""
+    bind = db.get_bind()
+    return lambda: Session(bind=bind, autoflush=False)
+
+
+def _run_section(session_factory: Callable[[], Session], func: Callable[[Session], Dict[str, Any]]):
+    session = session_factory()
+    try:
+        return func(session)
+    finally:
+        session.close()
+
+
+async def compose_sections(sections: List[Section], session_factory: Callable[[], Session],
+                           timeout: float) -> Dict[str, Any]:
+    """Run the sections concurrently and merge their results
+
+    The merged dict has a `sections` entry with each section's status
+    ("ok", "timeout" or "error") and elapsed milliseconds. A timed-out
+    section's thread finishes in the background; its result is discarded.
+    """
+    async def run(section: Section):
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                run_in_threadpool(_run_section, session_factory, section.func),
+                section.timeout or timeout
+            )
+            status = "ok"
+        except asyncio.TimeoutError:
+            logger.warning("Section %s timed out", section.name)
+            result, status = None, "timeout"
+        except Exception:  # noqa: BLE001 - one failing section must not fail the response
+            logger.exception("Section %s failed", section.name)
+            result, status = None, "error"
+        return section, status, result, time.monotonic() - started
+
+    merged: Dict[str, Any] = {}
+    statuses: Dict[str, Dict[str, Any]] = {}
+    for section, status, result, elapsed in await asyncio.gather(*(run(section) for section in sections)):
+        if status == "ok":
+            merged.update(result)
+        else:
+            for key in section.keys:
+                merged.setdefault(key, None)
+        statuses[section.name] = {"status": status, "elapsed_ms": round(elapsed * 1000, 1)}
+    merged[SECTIONS_KEY] = statuses
+    return merged
@@ -0,0 +1,60 @@
+"""
+Dialect-aware SQL building blocks for analytics queries
+"""
+
+from typing import Sequence
+
+from sqlalchemy import Integer, case, cast, func, literal_column, select
+from sqlalchemy.orm import Session
+
+DEFAULT_PERCENTILES = (0.5, 0.85, 0.95)
+
+
+def dialect_name(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def seconds_between(db: Session, start, end):
+    """SQL expression for the number of seconds from `start` to `end`"""
+    dialect = dialect_name(db)
+    if dialect == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400.0
+    if dialect == "mysql":
+        return func.timestampdiff(literal_column("SECOND"), start, end)
+    return func.extract("epoch", end - start)
+
+
+def nearest_rank(fraction: float, count):
+    """1-based nearest-rank position of a percentile among `count` ordered rows"""
+    position = count * fraction
+    truncated = cast(position, Integer)
+    return truncated + case((position > truncated, 1), else_=0)
+
+
+def percentile_summary(db: Session, durations, percentiles: Sequence[float] = DEFAULT_PERCENTILES):
+    """Count, average and nearest-rank percentiles of `durations.c.seconds` per `durations.c.group_key`
+
+    `durations` is a subquery; ranking is done with window functions so only
+    one row per group leaves the database. Percentile columns are labelled
+    p50, p85, ...
+    """
+    partition = durations.c.group_key
+    ranked = select(
+        partition.label("group_key"),
+        durations.c.seconds.label("seconds"),
+        func.row_number().over(partition_by=partition, order_by=durations.c.seconds).label("position"),
+        func.count().over(partition_by=partition).label("total"),
+        func.avg(durations.c.seconds).over(partition_by=partition).label("average")
+    ).subquery()
+
+    columns = [
+        ranked.c.group_key,
+        func.max(ranked.c.total).label("count"),
+        func.max(ranked.c.average).label("average")
+    ]
+    for fraction in percentiles:
+        columns.append(func.max(case(
+            (ranked.c.position == nearest_rank(fraction, ranked.c.total), ranked.c.seconds)
+        )).label(f"p{round(fraction * 100)}"))
+
+    return db.execute(select(*columns).group_by(ranked.c.group_key)).all()
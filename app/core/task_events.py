@@ -0,0 +1,113 @@
+"""
+Domain side effects of task writes
+
+Registered on every Session so that endpoints, bulk paths and background
+jobs all produce the same records in the same transaction as the change:
+
+* a TaskStatusHistory row for every status change, including creation;
+* a CompletedStoryPoints row when a task moves to DONE, removed again when
+  the task is reopened.
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.completed_sp import CompletedStoryPoints
+from app.models.enums import TaskStatus
+from app.models.task import Task
+from app.models.task_status_history import TaskStatusHistory
+
+CURRENT_USER_KEY = "current_user_id"
+
+
+def _status_change(session: Session, task: Task):
+    """(old, new) status for a task being flushed, or None if the status did not change"""
+    state = inspect(task)
+    if state.pending:
+        # The column default is only applied on insert
+        return None, task.status or TaskStatus.TODO
+    history = state.attrs.status.history
+    if not history.has_changes():
+        return None
+    new = history.added[0] if history.added else None
+    if history.deleted:
+        old = history.deleted[0]
+    else:
+        # Assigned on an expired instance, so the previous value was never loaded
+        with session.no_autoflush:
+            old = session.query(Task.status).filter(Task.id == task.id).scalar()
+    if old == new:
+        return None
+    return old, new
+
+
+def completion_record(task: Task, user_id: int = None) -> CompletedStoryPoints:
+    return CompletedStoryPoints(
+        story_points=task.story_points or 0,
+        sprint_id=task.sprint_id,
+        project_id=task.project_id,
+        task=task,
+        user_id=task.assignee_id or user_id or task.created_by_id
+    )
+
+
+def _status_changes(session: Session) -> list:
+    changes = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Task):
+            continue
+        change = _status_change(session, obj)
+        if change is not None:
+            changes.append((obj, *change))
+    return changes
+
+
+def record_status_history(session: Session, changes: list, user_id: int = None):
+    """Append a history row per status change"""
+    for task, old, new in changes:
+        session.add(TaskStatusHistory(
+            task=task,
+            project_id=task.project_id,
+            from_status=old,
+            to_status=new,
+            user_id=user_id
+        ))
+
+
+def record_task_completions(session: Session, changes: list, user_id: int = None):
+    """Add or retract completion records for tasks whose status is changing"""
+    completed = [task for task, old, new in changes if new == TaskStatus.DONE and old != TaskStatus.DONE]
+    reopened = [task for task, old, new in changes if old == TaskStatus.DONE and new != TaskStatus.DONE]
+
+    with session.no_autoflush:
+        for task in reopened:
+            if task.id is None:
+                continue
+            for record in session.query(CompletedStoryPoints).filter(
+                CompletedStoryPoints.task_id == task.id
+            ).all():
+                session.delete(record)
+        for task in completed:
+            session.add(completion_record(task, user_id))
+
+
+@event.listens_for(Session, "before_flush")
+def _before_flush(session, flush_context, instances):
+    changes = _status_changes(session)
+    if not changes:
+        return
+    user_id = session.info.get(CURRENT_USER_KEY)
+    record_status_history(session, changes, user_id)
+    record_task_completions(session, changes, user_id)
+
+
+def backfill_completed_story_points(db: Session) -> int:
+    """Create completion records for DONE tasks that have none"""
+    recorded = db.query(CompletedStoryPoints.task_id).filter(CompletedStoryPoints.task_id.isnot(None))
+    tasks = db.query(Task).filter(Task.status == TaskStatus.DONE, Task.id.notin_(recorded)).all()
+    for task in tasks:
+        record = completion_record(task)
+        record.completed_at = task.updated_at or task.created_at
+        db.add(record)
+    db.commit()
+    return len(tasks)
@@ -0,0 +1,74 @@
+"""
+Calendar buckets (day, week, month, quarter) in the Gregorian or Jalali calendar
+
+Reports aggregate per day in SQL and fold the daily rows into buckets with
+the day-to-bucket map built here, so the cost depends on the number of days
+in the range rather than the number of rows behind them.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+import jdatetime
+
+BUCKETS = ("day", "week", "month", "quarter")
+CALENDARS = ("gregorian", "jalali")
+
+
+def bucket_start(day: date, bucket: str, calendar: str = "gregorian") -> date:
+    """Gregorian date on which the bucket containing `day` starts"""
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        # ISO weeks start on Monday, Jalali weeks on Saturday
+        offset = day.weekday() if calendar == "gregorian" else (day.weekday() + 2) % 7
+        return day - timedelta(days=offset)
+    if calendar == "jalali":
+        jalali = jdatetime.date.fromgregorian(date=day)
+        month = jalali.month if bucket == "month" else (jalali.month - 1) // 3 * 3 + 1
+        return jdatetime.date(jalali.year, month, 1).togregorian()
+    month = day.month if bucket == "month" else (day.month - 1) // 3 * 3 + 1
+    return date(day.year, month, 1)
+
+
+def bucket_label(start: date, bucket: str, calendar: str = "gregorian") -> str:
+    if calendar == "jalali":
+        jalali = jdatetime.date.fromgregorian(date=start)
+        year, month, day = jalali.year, jalali.month, jalali.day
+    else:
+        year, month, day = start.year, start.month, start.day
+    if bucket == "month":
+        return f"{year:04d}-{month:02d}"
+    if bucket == "quarter":
+        return f"{year:04d}-Q{(month - 1) // 3 + 1}"
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def previous_bucket_start(start: date, bucket: str, calendar: str = "gregorian") -> date:
+    return bucket_start(start - timedelta(days=1), bucket, calendar)
+
+
+def last_buckets_start(today: date, bucket: str, calendar: str, count: int) -> date:
+    """Start of the earliest of the `count` buckets ending with the one containing `today`"""
+    start = bucket_start(today, bucket, calendar)
+    for _ in range(count - 1):
+        start = previous_bucket_start(start, bucket, calendar)
+    return start
+
+
+def bucket_map(start_date: date, end_date: date, bucket: str,
+               calendar: str = "gregorian") -> Tuple[List[Tuple[date, date]], Dict[date, int]]:
+    """Buckets covering the range (clipped to it) and each day's bucket index"""
+    buckets: List[Tuple[date, date]] = []
+    index: Dict[date, int] = {}
+    day = start_date
+    current = None
+    while day <= end_date:
+        start = bucket_start(day, bucket, calendar)
+        if start != current:
+            current = start
+            buckets.append((day, day))
+        buckets[-1] = (buckets[-1][0], day)
+        index[day] = len(buckets) - 1
+        day += timedelta(days=1)
+    return buckets, index
@@ -0,0 +1,180 @@
+"""
+Background maintenance for live timers
+
+Stale timers (running longer than the configured maximum or past the end of
+the user's working day) are stopped with a capped time log, and inactive timer
+rows are purged in batches so the `active_timers` table stays small.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.scheduler import register_periodic_job
+from app.models.active_timer import ActiveTimer
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.models.working_hours import WorkingHours
+
+TIMER_SWEEPER_JOB = "timer_sweeper"
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    """Timers are stored as naive UTC; normalise aware values coming back from the driver"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _get_zone(name: Optional[str]):
+    try:
+        return ZoneInfo(name) if name else timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def stop_active_timer(db: Session, timer: ActiveTimer, end_time: datetime, description: str = "") -> TimeLog:
+    """Close a running timer at `end_time` and record the elapsed time as a time log (caller commits)"""
+    start_time = _as_naive_utc(timer.start_time)
+    elapsed_seconds = max(0, int((end_time - start_time).total_seconds()))
+    elapsed_hours = elapsed_seconds / 3600
+
+    time_log = TimeLog(
+        task_id=timer.task_id,
+        user_id=timer.user_id,
+        date=timer.start_time,
+        hours=elapsed_hours,
+        description=description or f"Live timer session: {elapsed_hours:.2f} hours"
+    )
+    db.add(time_log)
+
+    task = db.query(Task).filter(Task.id == timer.task_id).first()
+    if task:
+        task.actual_hours = (task.actual_hours or 0) + elapsed_hours
+
+    timer.is_active = False
+    return time_log
+
+
+def _effective_schedules(db: Session, user_ids: List[int], day) -> Dict[int, WorkingHours]:
+    """Latest WorkingHours schedule in effect on `day` for each user, in one query"""
+    if not user_ids:
+        return {}
+    schedules = db.query(WorkingHours).filter(
+        WorkingHours.user_id.in_(user_ids),
+        WorkingHours.effective_from <= day,
+        or_(WorkingHours.effective_to.is_(None), WorkingHours.effective_to >= day)
+    ).all()
+    result: Dict[int, WorkingHours] = {}
+    for schedule in schedules:
+        current = result.get(schedule.user_id)
+        if current is None or schedule.effective_from > current.effective_from:
+            result[schedule.user_id] = schedule
+    return result
+
+
+def _working_day_end(start_time: datetime, schedule: Optional[WorkingHours]) -> Optional[datetime]:
+    """End of the user's working day on the day the timer started, as naive UTC"""
+    if schedule is None or schedule.end_time is None:
+        return None
+    zone = _get_zone(schedule.timezone)
+    local_start = start_time.replace(tzinfo=timezone.utc).astimezone(zone)
+    if local_start.time() >= schedule.end_time:
+        # Timer was started after hours; only the max-duration cap applies
+        return None
+    local_end = datetime.combine(local_start.date(), schedule.end_time, tzinfo=zone)
+    return _as_naive_utc(local_end)
+
+
+def sweep_stale_timers(db: Session, now: Optional[datetime] = None,
+                       max_duration_hours: Optional[float] = None) -> List[int]:
+    """Auto-stop timers past the maximum duration or the end of the working day
+
+    Returns the ids of the timers that were stopped.
+    """
+    now = now or datetime.utcnow()
+    if max_duration_hours is None:
+        max_duration_hours = settings.TIMER_MAX_DURATION_HOURS
+    max_duration = timedelta(hours=max_duration_hours)
+
+    active_timers = db.query(ActiveTimer).filter(ActiveTimer.is_active.is_(True)).all()
+    if not active_timers:
+        return []
+
+    users_by_day: Dict = {}
+    for timer in active_timers:
+        users_by_day.setdefault(_as_naive_utc(timer.start_time).date(), set()).add(timer.user_id)
+    schedules_by_day = {
+        day: _effective_schedules(db, list(user_ids), day)
+        for day, user_ids in users_by_day.items()
+    }
+
+    stopped: List[int] = []
+    for timer in active_timers:
+        start_time = _as_naive_utc(timer.start_time)
+        day = start_time.date()
+        cutoffs = [start_time + max_duration]
+        day_end = _working_day_end(start_time, schedules_by_day[day].get(timer.user_id))
+        if day_end is not None:
+            cutoffs.append(day_end)
+        cutoff = min(cutoffs)
+        if cutoff > now:
+            continue
+
+        elapsed_hours = (cutoff - start_time).total_seconds() / 3600
+        stop_active_timer(
+            db, timer, cutoff,
+            description=f"Auto-stopped timer session: {elapsed_hours:.2f} hours (capped)"
+        )
+        stopped.append(timer.id)
+
+    if stopped:
+        db.commit()
+    return stopped
+
+
+def purge_inactive_timers(db: Session, now: Optional[datetime] = None,
+                          retention_days: Optional[int] = None,
+                          batch_size: Optional[int] = None) -> int:
+    """Delete inactive timer rows older than the retention window, one batch per transaction"""
+    now = now or datetime.utcnow()
+    if retention_days is None:
+        retention_days = settings.INACTIVE_TIMER_RETENTION_DAYS
+    batch_size = batch_size or settings.TIMER_PURGE_BATCH_SIZE
+    cutoff = now - timedelta(days=retention_days)
+
+    purged = 0
+    while True:
+        ids = [row.id for row in db.query(ActiveTimer.id).filter(
+            ActiveTimer.is_active.is_(False),
+            func.coalesce(ActiveTimer.updated_at, ActiveTimer.created_at) <= cutoff
+        ).order_by(ActiveTimer.id).limit(batch_size).all()]
+        if not ids:
+            break
+        db.query(ActiveTimer).filter(ActiveTimer.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        purged += len(ids)
+        if len(ids) < batch_size:
+            break
+    return purged
+
+
+def run_timer_maintenance() -> Dict[str, int]:
+    """Sweep stale timers and purge old inactive rows using a fresh session"""
+    db = SessionLocal()
+    try:
+        stopped = sweep_stale_timers(db)
+        purged = purge_inactive_timers(db)
+        return {"stopped_timers": len(stopped), "purged_timers": purged}
+    finally:
+        db.close()
+
+
+def register_timer_sweeper():
+    """Register the timer sweeper with the background scheduler"""
+    register_periodic_job(TIMER_SWEEPER_JOB, settings.TIMER_SWEEP_INTERVAL_SECONDS, run_timer_maintenance)
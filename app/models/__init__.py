@@ -19,18 +19,34 @@ from .bug_report import BugReport
 from .time_log import TimeLog
 from .active_timer import ActiveTimer
 from .completed_sp import CompletedStoryPoints
+from .task_status_history import TaskStatusHistory
+from .cfd_snapshot import CFDSnapshot
 from .version import Version
 from .task_statistics import TaskStatistics
 from .translation import Translation
 from .working_hours import WorkingHours, Holiday, TimeOff
+from .idempotency_key import IdempotencyKey
+from .export_job import ExportJob
+from .dashboard_snapshot import DashboardSnapshot
+from .kanban_event import KanbanEvent
+from .kanban_board_version import KanbanBoardVersion
+from .project_stats import ProjectStats
 
 # Configure relationships that depend on multiple models
 configure_task_tags_relationship()
 
+# Register session hooks that keep derived task records in sync
+from app.core import task_events  # noqa: E402,F401
+from app.core import dashboard_snapshots  # noqa: E402,F401
+from app.core import ranking  # noqa: E402,F401
+from app.core import kanban_events  # noqa: E402,F401
+from app.core import project_stats  # noqa: E402,F401
+
 __all__ = [
     "User", "UserRole", "TaskStatus", "TaskPriority", "ProjectStatus", "SprintStatus",
     "BugSeverity", "BugStatus", "Tag", "task_tags", "Project", "Phase", "Team", "team_members", 
     "team_projects", "Sprint", "Milestone", "Task", "TaskDependency", "Backlog", 
-    "BugReport", "TimeLog", "ActiveTimer", "CompletedStoryPoints", "Version", "TaskStatistics", "Translation",
-    "PlannerEvent", "PersonalTodo", "WorkingHours", "Holiday", "TimeOff"
+    "BugReport", "TimeLog", "ActiveTimer", "CompletedStoryPoints", "TaskStatusHistory", "CFDSnapshot", "Version", "TaskStatistics", "Translation",
+    "PlannerEvent", "PersonalTodo", "WorkingHours", "Holiday", "TimeOff", "IdempotencyKey",
+    "ExportJob", "DashboardSnapshot", "KanbanEvent", "KanbanBoardVersion", "ProjectStats"
 ]
\ No newline at end of file
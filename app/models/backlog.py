@@ -2,7 +2,7 @@
 Backlog model
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -15,6 +15,7 @@ class Backlog(Base):
     title = Column(String(200), nullable=False, index=True)
     description = Column(Text)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    rank = Column(String(64), nullable=True)  # Order within the project backlog, see app.core.ranking
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -23,3 +24,7 @@ class Backlog(Base):
 
     def __repr__(self):
         return f"<Backlog {self.title}>"
+
+
+# Add indexes for better performance
+Index("idx_backlog_project_rank", Backlog.project_id, Backlog.rank)
@@ -0,0 +1,32 @@
+"""
+Cumulative flow diagram snapshot model
+"""
+
+from sqlalchemy import Column, Integer, Date, Enum, ForeignKey, Index
+
+from app.core.database import Base
+from app.models.enums import TaskStatus
+
+class CFDSnapshot(Base):
+    """Per-day task counts and story points by status
+
+    Rows with a NULL sprint_id hold the whole project; rows with a sprint_id
+    hold that sprint's tasks.
+    """
+    __tablename__ = "cfd_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_date = Column(Date, nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    sprint_id = Column(Integer, ForeignKey("sprints.id", ondelete="CASCADE"), nullable=True)
+    status = Column(Enum(TaskStatus), nullable=False)
+    task_count = Column(Integer, nullable=False, default=0)
+    story_points = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CFDSnapshot {self.snapshot_date} project={self.project_id} {self.status}: {self.task_count}>"
+
+
+# Add indexes for better performance
+Index("idx_cfd_project_sprint_date", CFDSnapshot.project_id, CFDSnapshot.sprint_id, CFDSnapshot.snapshot_date)
+Index("idx_cfd_snapshot_date", CFDSnapshot.snapshot_date)
@@ -2,7 +2,7 @@
 Completed Story Points model
 """
 
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -13,14 +13,26 @@ class CompletedStoryPoints(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     story_points = Column(Integer, nullable=False)
-    sprint_id = Column(Integer, ForeignKey("sprints.id"), nullable=False)
+    sprint_id = Column(Integer, ForeignKey("sprints.id"), nullable=True)  # Tasks may be completed outside a sprint
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Denormalized from the task so reports can aggregate without joining tasks
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True)
     completed_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     sprint = relationship("Sprint")
     user = relationship("User")
+    project = relationship("Project")
+    task = relationship("Task")
 
     def __repr__(self):
         return f"<CompletedStoryPoints {self.story_points} by {self.user.username}>"
+
+
+# Add indexes for better performance
+Index("idx_completed_sp_project_completed_at", CompletedStoryPoints.project_id, CompletedStoryPoints.completed_at)
+Index("idx_completed_sp_user_completed_at", CompletedStoryPoints.user_id, CompletedStoryPoints.completed_at)
+Index("idx_completed_sp_sprint_id", CompletedStoryPoints.sprint_id)
+Index("idx_completed_sp_task_id", CompletedStoryPoints.task_id)
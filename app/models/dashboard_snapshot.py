@@ -0,0 +1,30 @@
+"""
+Dashboard snapshot model: a user's precomputed dashboard
+"""
+
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+class DashboardSnapshot(Base):
+    __tablename__ = "dashboard_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True)
+
+    payload = Column(Text, nullable=False)  # JSON-encoded dashboard response
+    version = Column(Integer, nullable=False, default=1)  # Incremented on every rebuild
+    computed_at = Column(DateTime, nullable=False)
+    # Set by the first write touching the user's dashboard after computed_at
+    dirty_since = Column(DateTime, nullable=True)
+
+    # Relationships
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<DashboardSnapshot user={self.user_id} v{self.version}>"
+
+
+# Add indexes for better performance
+Index("idx_dashboard_snapshots_dirty_since", DashboardSnapshot.dirty_since)
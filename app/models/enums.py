@@ -60,3 +60,10 @@ class TimeOffStatus(enum.Enum):
     PENDING = "pending"
     APPROVED = "approved"
     REJECTED = "rejected"
+
+class ExportJobStatus(enum.Enum):
+    """Lifecycle of a background export job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
@@ -0,0 +1,48 @@
+"""
+Export job model for background exports and reports
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Enum as SAEnum
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.models.enums import ExportJobStatus
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # What to produce
+    kind = Column(String(50), nullable=False)
+    format = Column(String(10), nullable=False)
+    parameters = Column(Text, nullable=True)  # JSON-encoded filters
+
+    status = Column(SAEnum(ExportJobStatus, name="export_job_status"),
+                    nullable=False,
+                    default=ExportJobStatus.QUEUED)
+    error = Column(Text, nullable=True)
+
+    # Gzip-compressed result on local disk
+    file_path = Column(String(500), nullable=True)
+    file_size = Column(Integer, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # Removed by the cleanup job after this
+
+    # Relationships
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<ExportJob {self.id} {self.kind} {self.status}>"
+
+
+# Add indexes for better performance
+Index("idx_export_jobs_user_created", ExportJob.user_id, ExportJob.created_at)
+Index("idx_export_jobs_status", ExportJob.status)
+Index("idx_export_jobs_expires_at", ExportJob.expires_at)
@@ -0,0 +1,38 @@
+"""
+Idempotency key model for replaying responses to retried requests
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner = Column(String(80), nullable=False)  # Username from the access token
+    key = Column(String(255), nullable=False)
+    method = Column(String(10), nullable=False)
+    path = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+
+    # Cached response; status_code is NULL while the original request is in flight
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_idempotency_owner_key", "owner", "key", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.owner}:{self.key}>"
+
+
+# Add indexes for better performance
+Index("idx_idempotency_created_at", IdempotencyKey.created_at)
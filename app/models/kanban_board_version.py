@@ -0,0 +1,17 @@
+"""
+Kanban board version model: the per-project counter that numbers kanban events
+"""
+
+from sqlalchemy import Column, Integer, ForeignKey
+
+from app.core.database import Base
+
+class KanbanBoardVersion(Base):
+    """Latest version of a project's board; the row is locked by each writer until it commits"""
+    __tablename__ = "kanban_board_versions"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<KanbanBoardVersion project={self.project_id} version={self.version}>"
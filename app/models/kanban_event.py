@@ -0,0 +1,29 @@
+"""
+Kanban event model: the card-level change log behind the kanban WebSocket channel
+"""
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class KanbanEvent(Base):
+    """One card change, numbered by the project's board version"""
+    __tablename__ = "kanban_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    # Allocated from kanban_board_versions in commit order; ids are not
+    version = Column(Integer, nullable=False)
+    task_id = Column(Integer, nullable=True)  # No FK: deleted tasks keep their events
+    op = Column(String(20), nullable=False)  # created, updated, moved, deleted or reset
+    payload = Column(Text, nullable=False)  # JSON-encoded patch operation
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<KanbanEvent {self.id} project={self.project_id} v{self.version} {self.op}>"
+
+
+# Add indexes for better performance
+Index("idx_kanban_events_project_version", KanbanEvent.project_id, KanbanEvent.version, unique=True)
+Index("idx_kanban_events_created_at", KanbanEvent.created_at)
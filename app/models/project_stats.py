@@ -0,0 +1,39 @@
+"""
+Project stats model: per-project counters maintained on write
+"""
+
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+class ProjectStats(Base):
+    __tablename__ = "project_stats"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+
+    # Task counts per status
+    total_tasks = Column(Integer, nullable=False, default=0)
+    todo_tasks = Column(Integer, nullable=False, default=0)
+    in_progress_tasks = Column(Integer, nullable=False, default=0)
+    review_tasks = Column(Integer, nullable=False, default=0)
+    done_tasks = Column(Integer, nullable=False, default=0)
+    blocked_tasks = Column(Integer, nullable=False, default=0)
+
+    # Story points and hours
+    total_story_points = Column(Integer, nullable=False, default=0)
+    done_story_points = Column(Integer, nullable=False, default=0)
+    estimated_task_hours = Column(Float, nullable=False, default=0.0)  # Sum of task estimates
+    actual_task_hours = Column(Float, nullable=False, default=0.0)  # Sum of task actual_hours
+    spent_hours = Column(Float, nullable=False, default=0.0)  # Sum of time logs
+
+    # Sprint-weighted completion of the project's estimated hours
+    completion_percentage = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, nullable=False)
+
+    # Relationships
+    project = relationship("Project")
+
+    def __repr__(self):
+        return f"<ProjectStats project={self.project_id} tasks={self.total_tasks}>"
@@ -21,6 +21,7 @@ class Task(Base):
     estimated_hours = Column(Float, CheckConstraint("estimated_hours >= 0"), default=0.0)
     actual_hours = Column(Float, CheckConstraint("actual_hours >= 0"), default=0.0)
     is_subtask = Column(Boolean, default=False)
+    rank = Column(String(64), nullable=True)  # Order within the kanban column, see app.core.ranking
     
     # Foreign keys
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -44,6 +45,7 @@ class Task(Base):
     time_logs = relationship("TimeLog", back_populates="task", cascade="all, delete-orphan")
     active_timers = relationship("ActiveTimer", back_populates="task", cascade="all, delete-orphan")
     bug_reports = relationship("BugReport", back_populates="task", cascade="all, delete-orphan")
+    status_history = relationship("TaskStatusHistory", back_populates="task", cascade="all, delete-orphan")
     # tags relationship will be configured after all models are loaded
 
     def __repr__(self):
@@ -62,5 +64,6 @@ Index("idx_task_project_id", Task.project_id)
 Index("idx_task_sprint_id", Task.sprint_id)
 Index("idx_task_assignee_id", Task.assignee_id)
 Index("idx_task_status", Task.status)
+Index("idx_task_project_status_rank", Task.project_id, Task.status, Task.rank)
 Index("idx_task_priority", Task.priority)
 Index("idx_task_parent_task_id", Task.parent_task_id)
@@ -0,0 +1,34 @@
+"""
+Task status history model
+"""
+
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.models.enums import TaskStatus
+
+class TaskStatusHistory(Base):
+    """Append-only log of task status transitions"""
+    __tablename__ = "task_status_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)  # Denormalized from the task
+    from_status = Column(Enum(TaskStatus), nullable=True)  # NULL for the row written on creation
+    to_status = Column(Enum(TaskStatus), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relationships
+    task = relationship("Task", back_populates="status_history")
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<TaskStatusHistory task={self.task_id} {self.from_status} -> {self.to_status}>"
+
+
+# Add indexes for better performance
+Index("idx_task_status_history_task_changed", TaskStatusHistory.task_id, TaskStatusHistory.changed_at)
+Index("idx_task_status_history_project_changed", TaskStatusHistory.project_id, TaskStatusHistory.changed_at)
@@ -2,7 +2,7 @@
 Backlog schemas for request/response validation
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Optional
 from datetime import datetime
 
@@ -17,9 +17,20 @@ class BacklogUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
 
+class BacklogMove(BaseModel):
+    before_id: Optional[int] = None  # Place the item right before this one
+    after_id: Optional[int] = None  # Place the item right after this one
+
+    @model_validator(mode="after")
+    def check_single_anchor(self):
+        if self.before_id is not None and self.after_id is not None:
+            raise ValueError("Give either before_id or after_id, not both")
+        return self
+
 class BacklogResponse(BacklogBase):
     id: int
     project_id: int
+    rank: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
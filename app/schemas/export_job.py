@@ -0,0 +1,28 @@
+"""
+Export job schemas for request/response validation
+"""
+
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+from app.models.enums import ExportJobStatus
+
+class ExportJobCreate(BaseModel):
+    kind: str  # "time_logs", "story_points_report" or "workload_analysis"
+    format: Optional[str] = None  # Defaults to the first format the kind supports
+    parameters: Dict[str, Any] = {}
+
+class ExportJobResponse(BaseModel):
+    id: int
+    kind: str
+    format: str
+    parameters: Dict[str, Any] = {}
+    status: ExportJobStatus
+    error: Optional[str] = None
+    file_size: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    download_url: Optional[str] = None
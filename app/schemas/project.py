@@ -67,6 +67,7 @@ class ProjectResponse(ProjectBase):
             "id": project.id,
             "name": project.name,
             "description": project.description,
+            "estimated_hours": project.estimated_hours or 0.0,
             "start_date": project.start_date,
             "end_date": project.end_date,
             "status": project.status,
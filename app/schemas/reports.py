@@ -24,6 +24,7 @@ class TimeLogReport(BaseModel):
     description: Optional[str] = None
 
 class ProjectTimeStats(BaseModel):
+    project_id: Optional[int] = None
     project_name: str
     total_minutes: int
     total_hours: float
@@ -31,6 +32,7 @@ class ProjectTimeStats(BaseModel):
     user_count: int
 
 class UserTimeStats(BaseModel):
+    user_id: Optional[int] = None
     user_name: str
     total_minutes: int
     total_hours: float
@@ -50,6 +52,7 @@ class StoryPointsReport(BaseModel):
     completed_at: datetime
 
 class UserStoryPerformance(BaseModel):
+    user_id: Optional[int] = None
     user_name: str
     planned_points: int
     completed_points: int
@@ -58,6 +61,7 @@ class UserStoryPerformance(BaseModel):
     completed_tasks: int
 
 class ProjectStoryStats(BaseModel):
+    project_id: Optional[int] = None
     project_name: str
     total_points_planned: int
     total_points_completed: int
@@ -66,6 +70,7 @@ class ProjectStoryStats(BaseModel):
     completed_tasks: int
 
 class TeamProductivityReport(BaseModel):
+    team_id: Optional[int] = None
     team_name: str
     team_leader: str
     member_count: int
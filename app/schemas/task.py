@@ -2,7 +2,7 @@
 Task schemas for request/response validation
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from app.models.enums import TaskStatus, TaskPriority
@@ -39,6 +39,18 @@ class TaskUpdate(BaseModel):
 class TaskStatusUpdate(BaseModel):
     status: TaskStatus
 
+class TaskMove(BaseModel):
+    """Target of a kanban move: a column, and a neighbouring card in it (or the end)"""
+    status: Optional[TaskStatus] = None  # Defaults to the task's current column
+    before_id: Optional[int] = None  # Place the task right before this card
+    after_id: Optional[int] = None  # Place the task right after this card
+
+    @model_validator(mode="after")
+    def check_single_anchor(self):
+        if self.before_id is not None and self.after_id is not None:
+            raise ValueError("Give either before_id or after_id, not both")
+        return self
+
 class TaskResponse(TaskBase):
     id: int
     project_id: int
@@ -48,6 +60,7 @@ class TaskResponse(TaskBase):
     parent_task_id: Optional[int] = None
     actual_hours: float = 0.0
     is_subtask: bool = False
+    rank: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -84,6 +97,7 @@ class TaskResponse(TaskBase):
             "created_by_id": task.created_by_id,
             "parent_task_id": task.parent_task_id,
             "actual_hours": task.actual_hours,
+            "rank": task.rank,
             "created_at": task.created_at,
             "updated_at": task.updated_at,
         }
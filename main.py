@@ -10,6 +10,15 @@ import uvicorn
 from app.core.config import settings
 from app.core.database import engine, Base
 from app.api.v1 import api_router
+from app.core.scheduler import run_job_now, start_scheduler, stop_scheduler
+from app.core.timer_sweeper import register_timer_sweeper
+from app.core.idempotency import IdempotencyMiddleware, register_idempotency_cleanup
+from app.core.cfd_snapshots import register_cfd_snapshot_job
+from app.core.export_jobs import register_export_cleanup, resume_queued_exports, shutdown_export_workers
+from app.core.dashboard_snapshots import register_dashboard_snapshot_job
+from app.core.ranking import RANK_REBALANCE_JOB, register_rank_rebalance_job
+from app.core.kanban_events import register_kanban_event_cleanup
+from app.core.project_stats import PROJECT_STATS_CHECK_JOB, register_project_stats_check
 # Import models to ensure all relationships are configured
 import app.models  # noqa: F401
 
@@ -25,6 +34,11 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Replay stored responses for retried requests carrying an Idempotency-Key.
+# Added before CORS so that CORS wraps it (the last middleware added is the
+# outermost) and the 400/409/422 responses it writes itself get CORS headers.
+app.add_middleware(IdempotencyMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +51,31 @@ app.add_middleware(
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("startup")
+def start_background_jobs():
+    """Register periodic maintenance jobs and start the scheduler"""
+    register_timer_sweeper()
+    register_idempotency_cleanup()
+    register_cfd_snapshot_job()
+    register_export_cleanup()
+    register_dashboard_snapshot_job()
+    register_rank_rebalance_job()
+    register_kanban_event_cleanup()
+    register_project_stats_check()
+    resume_queued_exports()
+    if settings.SCHEDULER_ENABLED:
+        # Catch up on unranked rows and drifted project stats now rather than
+        # one interval after boot; failures are logged, not raised, so a
+        # worker always starts
+        run_job_now(RANK_REBALANCE_JOB)
+        run_job_now(PROJECT_STATS_CHECK_JOB)
+        start_scheduler()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    stop_scheduler()
+    shutdown_export_workers()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Ginga Tek Task Management API"}
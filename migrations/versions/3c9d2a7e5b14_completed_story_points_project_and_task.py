@@ -0,0 +1,62 @@
+"""Completed story points: project and task columns
+
+Revision ID: 3c9d2a7e5b14
+Revises: 951511c241ab
+Create Date: 2026-10-19 09:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2a7e5b14'
+down_revision: Union[str, None] = '951511c241ab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = 'completed_story_points'
+INDEXES = {
+    'idx_completed_sp_project_completed_at': ['project_id', 'completed_at'],
+    'idx_completed_sp_user_completed_at': ['user_id', 'completed_at'],
+    'idx_completed_sp_sprint_id': ['sprint_id'],
+    'idx_completed_sp_task_id': ['task_id'],
+}
+
+
+def upgrade() -> None:
+    # main.py creates missing tables on startup, so a database created after
+    # the model change already has some of these columns and indexes
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns(TABLE)}
+    indexes = {index['name'] for index in inspector.get_indexes(TABLE)}
+
+    # Batch mode recreates the table on SQLite, which cannot alter columns
+    with op.batch_alter_table(TABLE) as batch_op:
+        if 'project_id' not in columns:
+            batch_op.add_column(sa.Column('project_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_completed_sp_project_id', 'projects', ['project_id'], ['id'])
+        if 'task_id' not in columns:
+            batch_op.add_column(sa.Column('task_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_completed_sp_task_id', 'tasks', ['task_id'], ['id'],
+                                        ondelete='SET NULL')
+        batch_op.alter_column('sprint_id', existing_type=sa.Integer(), nullable=True)
+
+    for name, index_columns in INDEXES.items():
+        if name not in indexes:
+            op.create_index(name, TABLE, index_columns)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name=TABLE)
+
+    # Completions recorded outside a sprint cannot satisfy NOT NULL again; the
+    # foreign keys go with their columns
+    op.execute(sa.text(f'DELETE FROM {TABLE} WHERE sprint_id IS NULL'))
+    with op.batch_alter_table(TABLE) as batch_op:
+        batch_op.alter_column('sprint_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('task_id')
+        batch_op.drop_column('project_id')
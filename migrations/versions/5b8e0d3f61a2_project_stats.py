@@ -0,0 +1,106 @@
+"""Project stats counters
+
+Revision ID: 5b8e0d3f61a2
+Revises: 7e1f4b2a9c63
+Create Date: 2026-10-19 10:31:52.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e0d3f61a2'
+down_revision: Union[str, None] = '7e1f4b2a9c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNT_COLUMNS = ['total_tasks', 'todo_tasks', 'in_progress_tasks', 'review_tasks', 'done_tasks',
+                 'blocked_tasks', 'total_story_points', 'done_story_points']
+HOUR_COLUMNS = ['estimated_task_hours', 'actual_task_hours', 'spent_hours', 'completion_percentage']
+
+# Task statuses are stored by enum member name
+BACKFILL = """
+INSERT INTO project_stats (
+    project_id, total_tasks, todo_tasks, in_progress_tasks, review_tasks, done_tasks, blocked_tasks,
+    total_story_points, done_story_points, estimated_task_hours, actual_task_hours, spent_hours,
+    completion_percentage, updated_at
+)
+SELECT
+    projects.id,
+    COALESCE(task_totals.total_tasks, 0),
+    COALESCE(task_totals.todo_tasks, 0),
+    COALESCE(task_totals.in_progress_tasks, 0),
+    COALESCE(task_totals.review_tasks, 0),
+    COALESCE(task_totals.done_tasks, 0),
+    COALESCE(task_totals.blocked_tasks, 0),
+    COALESCE(task_totals.total_story_points, 0),
+    COALESCE(task_totals.done_story_points, 0),
+    COALESCE(task_totals.estimated_task_hours, 0),
+    COALESCE(task_totals.actual_task_hours, 0),
+    COALESCE(spent.spent_hours, 0),
+    CASE WHEN COALESCE(projects.estimated_hours, 0) = 0 THEN 0
+         ELSE ROUND(COALESCE(sprint_progress.done_hours, 0) * 100.0 / projects.estimated_hours, 2) END,
+    CURRENT_TIMESTAMP
+FROM projects
+LEFT OUTER JOIN (
+    SELECT
+        project_id,
+        COUNT(id) AS total_tasks,
+        SUM(CASE WHEN status = 'TODO' THEN 1 ELSE 0 END) AS todo_tasks,
+        SUM(CASE WHEN status = 'IN_PROGRESS' THEN 1 ELSE 0 END) AS in_progress_tasks,
+        SUM(CASE WHEN status = 'REVIEW' THEN 1 ELSE 0 END) AS review_tasks,
+        SUM(CASE WHEN status = 'DONE' THEN 1 ELSE 0 END) AS done_tasks,
+        SUM(CASE WHEN status = 'BLOCKED' THEN 1 ELSE 0 END) AS blocked_tasks,
+        SUM(story_points) AS total_story_points,
+        SUM(CASE WHEN status = 'DONE' THEN story_points ELSE 0 END) AS done_story_points,
+        SUM(estimated_hours) AS estimated_task_hours,
+        SUM(actual_hours) AS actual_task_hours
+    FROM tasks
+    GROUP BY project_id
+) task_totals ON task_totals.project_id = projects.id
+LEFT OUTER JOIN (
+    SELECT tasks.project_id, SUM(time_logs.hours) AS spent_hours
+    FROM time_logs JOIN tasks ON time_logs.task_id = tasks.id
+    GROUP BY tasks.project_id
+) spent ON spent.project_id = projects.id
+LEFT OUTER JOIN (
+    SELECT project_id, SUM(estimated_hours * done / tasks) AS done_hours
+    FROM (
+        SELECT
+            sprints.project_id,
+            sprints.estimated_hours,
+            COUNT(tasks.id) AS tasks,
+            SUM(CASE WHEN tasks.status = 'DONE' THEN 1.0 ELSE 0 END) AS done
+        FROM sprints JOIN tasks ON tasks.sprint_id = sprints.id
+        WHERE sprints.estimated_hours > 0
+        GROUP BY sprints.id, sprints.project_id, sprints.estimated_hours
+    ) sprint_tasks
+    GROUP BY project_id
+) sprint_progress ON sprint_progress.project_id = projects.id
+WHERE projects.id NOT IN (SELECT project_id FROM project_stats)
+"""
+
+
+def upgrade() -> None:
+    # main.py creates missing tables on startup, so the table may already exist
+    if 'project_stats' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'project_stats',
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'),
+                      primary_key=True),
+            *[sa.Column(name, sa.Integer(), nullable=False) for name in COUNT_COLUMNS],
+            *[sa.Column(name, sa.Float(), nullable=False) for name in HOUR_COLUMNS],
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+        )
+
+    # One-off backfill, so that counters are right without waiting for the
+    # periodic consistency check (which does not run with the scheduler off).
+    # Mirrors app.core.project_stats.compute_project_stats as of this revision.
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table('project_stats')
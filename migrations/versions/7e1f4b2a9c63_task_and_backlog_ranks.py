@@ -0,0 +1,42 @@
+"""Task and backlog ranks
+
+Revision ID: 7e1f4b2a9c63
+Revises: 3c9d2a7e5b14
+Create Date: 2026-10-19 09:47:05.620931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1f4b2a9c63'
+down_revision: Union[str, None] = '3c9d2a7e5b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'tasks': ('idx_task_project_status_rank', ['project_id', 'status', 'rank']),
+    'backlogs': ('idx_backlog_project_rank', ['project_id', 'rank']),
+}
+
+
+def upgrade() -> None:
+    # Existing rows stay unranked; the rank rebalance job ranks them in their
+    # current order. main.py creates missing tables on startup, so skip what
+    # is already there.
+    inspector = sa.inspect(op.get_bind())
+    for table, (index, columns) in INDEXES.items():
+        if 'rank' not in {column['name'] for column in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column('rank', sa.String(length=64), nullable=True))
+        if index not in {existing['name'] for existing in inspector.get_indexes(table)}:
+            op.create_index(index, table, columns)
+
+
+def downgrade() -> None:
+    for table, (index, _) in INDEXES.items():
+        op.drop_index(index, table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('rank')
@@ -0,0 +1,60 @@
+"""Per-project kanban board versions
+
+Revision ID: 9a4c6e1d2b57
+Revises: 5b8e0d3f61a2
+Create Date: 2026-10-19 12:05:17.482630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c6e1d2b57'
+down_revision: Union[str, None] = '5b8e0d3f61a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # main.py creates missing tables on startup, so skip what is already there
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    if 'kanban_board_versions' not in tables:
+        op.create_table(
+            'kanban_board_versions',
+            sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'),
+                      primary_key=True),
+            sa.Column('version', sa.Integer(), nullable=False),
+        )
+    if 'kanban_events' not in tables:
+        return
+
+    if 'version' not in {column['name'] for column in inspector.get_columns('kanban_events')}:
+        # Existing ids grow within each project, so they serve as its first versions
+        op.add_column('kanban_events', sa.Column('version', sa.Integer(), nullable=True))
+        op.execute('UPDATE kanban_events SET version = id')
+        with op.batch_alter_table('kanban_events') as batch_op:
+            batch_op.alter_column('version', existing_type=sa.Integer(), nullable=False)
+    indexes = {index['name'] for index in inspector.get_indexes('kanban_events')}
+    if 'idx_kanban_events_project_id' in indexes:
+        op.drop_index('idx_kanban_events_project_id', table_name='kanban_events')
+    if 'idx_kanban_events_project_version' not in indexes:
+        op.create_index('idx_kanban_events_project_version', 'kanban_events', ['project_id', 'version'],
+                        unique=True)
+    op.execute(
+        'INSERT INTO kanban_board_versions (project_id, version) '
+        'SELECT project_id, MAX(version) FROM kanban_events '
+        'WHERE project_id NOT IN (SELECT project_id FROM kanban_board_versions) '
+        'GROUP BY project_id'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_kanban_events_project_version', table_name='kanban_events')
+    op.create_index('idx_kanban_events_project_id', 'kanban_events', ['project_id', 'id'])
+    with op.batch_alter_table('kanban_events') as batch_op:
+        batch_op.drop_column('version')
+    op.drop_table('kanban_board_versions')
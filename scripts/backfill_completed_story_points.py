@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Create CompletedStoryPoints records for tasks that were completed before
+completions were recorded automatically
+
+Run `alembic upgrade head` first: the records need the project_id and
+task_id columns added by revision 3c9d2a7e5b14.
+"""
+
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+import app.models  # noqa: F401
+from app.core.task_events import backfill_completed_story_points
+
+def main():
+    db = SessionLocal()
+    try:
+        created = backfill_completed_story_points(db)
+        print(f"Created {created} completion records")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark project endpoints against a synthetic dataset
+
+Seeds the same throwaway database as benchmark_reports.py and prints wall
+time and SQL statement count for the project list (one page of every
+project) with and without expansion, and for one project's detail view, per-user statistics and hierarchy.
+
+    python scripts/benchmark_projects.py --projects 500
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from benchmark_reports import create_benchmark_engine, measure, seed
+from app.core.project_stats import check_project_stats
+from app.models.user import User
+from app.models.project import Project
+from app.models.sprint import Sprint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--tasks-per-user", type=int, default=10)
+    parser.add_argument("--teams", type=int, default=20)
+    args = parser.parse_args()
+
+    from app.api.v1.endpoints.projects import (
+        get_projects, get_project, get_project_users, get_project_hierarchy
+    )
+
+    engine = create_benchmark_engine()
+    print(f"Seeding {args.projects} projects, {args.users} users, "
+          f"{args.users * args.tasks_per_user} tasks, {args.teams} teams...")
+    seed(engine, args.projects, args.users, args.tasks_per_user, args.teams)
+    with engine.begin() as conn:
+        # Give completion percentages something to weigh
+        conn.execute(update(Project).values(estimated_hours=100))
+        conn.execute(update(Sprint).values(estimated_hours=40))
+
+    db = sessionmaker(bind=engine)()
+    try:
+        # The seed bypasses the ORM hooks; fill project_stats with the periodic consistency check
+        check_project_stats(db)
+        admin = db.query(User).filter(User.username == "admin").one()
+        page = dict(skip=0, limit=args.projects, show_closed=True, status=None)
+        measure(engine, "projects (expand)", lambda: get_projects(
+            expand=True, db=db, current_user=admin, **page
+        ))
+        measure(engine, "projects", lambda: get_projects(
+            expand=False, db=db, current_user=admin, **page
+        ))
+        project_id = db.query(Project.id).order_by(Project.id).limit(1).scalar()
+        measure(engine, "project detail", lambda: get_project(
+            project_id=project_id, expand=True, include_details=True, include_users=False,
+            sprint_done=False, db=db, current_user=admin
+        ))
+        measure(engine, "project users", lambda: get_project_users(
+            project_id=project_id, db=db, current_user=admin
+        ))
+        measure(engine, "project hierarchy", lambda: get_project_hierarchy(
+            project_id=project_id, depth=4, fields=None, db=db, current_user=admin
+        ))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
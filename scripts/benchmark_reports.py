@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark report endpoints against a synthetic dataset
+
+Seeds a throwaway database (in-memory SQLite unless BENCHMARK_DATABASE_URL is
+set) and prints wall time and SQL statement count for each report.
+
+    python scripts/benchmark_reports.py --projects 100 --users 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+import app.models  # noqa: F401
+from app.models.enums import UserRole, TaskStatus
+from app.models.user import User
+from app.models.project import Project
+from app.models.phase import Phase
+from app.models.milestone import Milestone
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.completed_sp import CompletedStoryPoints
+from app.models.time_log import TimeLog
+from app.models.team import Team, team_members, team_projects
+
+
+def create_benchmark_engine():
+    url = os.getenv("BENCHMARK_DATABASE_URL", "sqlite://")
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    return create_engine(url)
+
+
+def seed(engine, projects: int, users: int, tasks_per_user: int, teams: int):
+    """Bulk insert users, projects with one sprint each, tasks, completions and teams
+
+    All teams are led by the admin user (id 1); users are spread evenly over them.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": 1, "username": "admin", "email": "admin@example.com", "password_hash": "x",
+             "first_name": "Bench", "last_name": "Admin", "role": UserRole.ADMIN, "is_active": True}
+        ] + [
+            {"id": i + 2, "username": f"user{i}", "email": f"user{i}@example.com", "password_hash": "x",
+             "first_name": "User", "last_name": str(i), "role": UserRole.DEVELOPER, "is_active": True}
+            for i in range(users)
+        ])
+        conn.execute(insert(Project), [
+            {"id": p + 1, "name": f"Project {p}", "created_by_id": 1} for p in range(projects)
+        ])
+        conn.execute(insert(Phase), [
+            {"id": p + 1, "name": "Phase", "project_id": p + 1} for p in range(projects)
+        ])
+        conn.execute(insert(Milestone), [
+            {"id": p + 1, "name": "Milestone", "phase_id": p + 1, "project_id": p + 1} for p in range(projects)
+        ])
+        conn.execute(insert(Sprint), [
+            {"id": p + 1, "name": "Sprint", "milestone_id": p + 1, "project_id": p + 1} for p in range(projects)
+        ])
+
+        # Each user works on tasks spread round-robin over the projects
+        tasks = []
+        completions = []
+        for u in range(users):
+            for t in range(tasks_per_user):
+                project_id = (u * tasks_per_user + t) % projects + 1
+                done = t % 2 == 0
+                tasks.append({
+                    "title": f"Task {u}-{t}", "project_id": project_id, "created_by_id": 1,
+                    "assignee_id": u + 2, "story_points": 3, "is_subtask": False,
+                    "status": TaskStatus.DONE if done else TaskStatus.IN_PROGRESS
+                })
+                if done:
+                    completions.append({
+                        "story_points": 3, "sprint_id": project_id, "project_id": project_id,
+                        "task_id": len(tasks), "user_id": u + 2, "completed_at": now
+                    })
+        conn.execute(insert(Task), tasks)
+        conn.execute(insert(CompletedStoryPoints), completions)
+        conn.execute(insert(TimeLog), [
+            {"task_id": task_id, "user_id": task["assignee_id"], "hours": 1.5, "date": now}
+            for task_id, task in enumerate(tasks, start=1)
+        ])
+
+        conn.execute(insert(Team), [
+            {"id": t + 1, "name": f"Team {t}", "team_leader_id": 1} for t in range(teams)
+        ])
+        conn.execute(insert(team_members), [
+            {"team_id": u % teams + 1, "user_id": u + 2} for u in range(users)
+        ])
+        conn.execute(insert(team_projects), [
+            {"team_id": p % teams + 1, "project_id": p + 1} for p in range(projects)
+        ])
+
+
+def measure(engine, name: str, func):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    started = time.perf_counter()
+    try:
+        func()
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "before_cursor_execute", record)
+    print(f"{name:<30} {elapsed * 1000:>10.1f} ms {len(statements):>6} statements")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks-per-user", type=int, default=10)
+    parser.add_argument("--teams", type=int, default=60)
+    args = parser.parse_args()
+
+    from app.api.v1.endpoints.reports import get_story_points_report, get_team_report
+
+    engine = create_benchmark_engine()
+    print(f"Seeding {args.projects} projects, {args.users} users, "
+          f"{args.users * args.tasks_per_user} tasks, {args.teams} teams...")
+    seed(engine, args.projects, args.users, args.tasks_per_user, args.teams)
+
+    db = sessionmaker(bind=engine)()
+    try:
+        admin = db.query(User).filter(User.username == "admin").one()
+        filters = dict(project_id=None, user_id=None, team_id=None, start_date=None, end_date=None)
+        measure(engine, "reports/story-points", lambda: get_story_points_report(
+            db=db, current_user=admin, **filters
+        ))
+        # The admin leads every team, so this is the team-leader view
+        measure(engine, "reports/teams", lambda: get_team_report(
+            db=db, current_user=admin, team_id=None, project_id=None, start_date=None, end_date=None
+        ))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Tests for SQL-aggregated burndown and burnup charts
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.phase import Phase
+from app.models.milestone import Milestone
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.completed_sp import CompletedStoryPoints
+from app.api.v1.endpoints.advanced_reports import get_burndown_chart, get_sprint_burndown_charts
+
+
+@pytest.fixture
+def plan(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Burn", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    phase = Phase(name="Phase", project_id=project.id)
+    db.add(phase)
+    db.flush()
+    milestone = Milestone(name="Milestone", phase_id=phase.id, project_id=project.id)
+    db.add(milestone)
+    db.flush()
+    sprints = [
+        Sprint(name=f"Sprint {i}", milestone_id=milestone.id, project_id=project.id,
+               start_date=datetime(2025, 5, 1 + 10 * i), end_date=datetime(2025, 5, 4 + 10 * i))
+        for i in range(2)
+    ]
+    db.add_all(sprints)
+    db.flush()
+    for sprint, points in zip(sprints, (8, 5)):
+        db.add_all([
+            Task(title=f"{sprint.name} a", project_id=project.id, sprint_id=sprint.id,
+                 created_by_id=admin.id, story_points=points),
+            Task(title=f"{sprint.name} b", project_id=project.id, sprint_id=sprint.id,
+                 created_by_id=admin.id, story_points=2),
+        ])
+    db.commit()
+    # Complete the first task of each sprint on its second day
+    for sprint in sprints:
+        task = db.query(Task).filter(Task.sprint_id == sprint.id).order_by(Task.id).first()
+        task.status = TaskStatus.DONE
+        db.commit()
+        record = db.query(CompletedStoryPoints).filter(CompletedStoryPoints.task_id == task.id).one()
+        record.completed_at = datetime(sprint.start_date.year, sprint.start_date.month, sprint.start_date.day + 1, 15)
+    db.commit()
+    return admin, project, phase, milestone, sprints
+
+
+def test_sprint_burndown_uses_grouped_completions(db, plan):
+    admin, project, phase, milestone, sprints = plan
+
+    chart = get_burndown_chart(project_id=project.id, sprint_id=sprints[0].id, milestone_id=None,
+                               phase_id=None, db=db, current_user=admin)
+
+    assert chart["total_story_points"] == 10
+    assert [point["actual_remaining"] for point in chart["burndown_data"]] == [10, 2, 2, 2]
+    assert chart["burndown_data"][1]["completed_today"] == 8
+    assert chart["burndown_data"][-1]["completed_total"] == 8
+    assert chart["summary"]["total_days"] == 4
+
+
+def test_phase_burndown_covers_all_sprints(db, plan):
+    admin, project, phase, milestone, sprints = plan
+
+    chart = get_burndown_chart(project_id=project.id, sprint_id=None, milestone_id=None,
+                               phase_id=phase.id, db=db, current_user=admin)
+
+    assert chart["total_story_points"] == 17
+    assert chart["summary"]["current_remaining"] == 4
+
+
+def test_batched_sprint_charts(db, plan):
+    admin, project, phase, milestone, sprints = plan
+
+    result = get_sprint_burndown_charts(sprint_ids=[sprints[0].id, sprints[1].id, 999], db=db, current_user=admin)
+
+    assert [chart["sprint_id"] for chart in result["charts"]] == [sprints[0].id, sprints[1].id]
+    assert result["charts"][1]["summary"]["current_remaining"] == 2
+    assert result["missing_sprint_ids"] == [999]
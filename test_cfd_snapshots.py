@@ -0,0 +1,114 @@
+"""
+Tests for cumulative flow snapshots
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.cfd_snapshots import take_cfd_snapshot, backfill_cfd_snapshots
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.phase import Phase
+from app.models.milestone import Milestone
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.task_status_history import TaskStatusHistory
+from app.models.cfd_snapshot import CFDSnapshot
+from app.api.v1.endpoints.flow_metrics import get_cumulative_flow
+
+
+@pytest.fixture
+def board(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Flow", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    phase = Phase(name="Phase", project_id=project.id)
+    db.add(phase)
+    db.flush()
+    milestone = Milestone(name="Milestone", phase_id=phase.id, project_id=project.id)
+    db.add(milestone)
+    db.flush()
+    sprint = Sprint(name="Sprint", milestone_id=milestone.id, project_id=project.id)
+    db.add(sprint)
+    db.flush()
+    db.add_all([
+        Task(title="A", project_id=project.id, sprint_id=sprint.id, created_by_id=admin.id,
+             story_points=3, status=TaskStatus.DONE),
+        Task(title="B", project_id=project.id, sprint_id=sprint.id, created_by_id=admin.id,
+             story_points=5, status=TaskStatus.IN_PROGRESS),
+        Task(title="C", project_id=project.id, created_by_id=admin.id, story_points=2),
+    ])
+    db.commit()
+    return admin, project, sprint
+
+
+def counts(db, day, sprint_id=None):
+    rows = db.query(CFDSnapshot).filter(
+        CFDSnapshot.snapshot_date == day,
+        CFDSnapshot.sprint_id == sprint_id if sprint_id else CFDSnapshot.sprint_id.is_(None)
+    ).all()
+    return {row.status: (row.task_count, row.story_points) for row in rows}
+
+
+def test_snapshot_stores_project_and_sprint_rows(db, board):
+    admin, project, sprint = board
+    day = date(2025, 3, 1)
+    take_cfd_snapshot(db, day)
+    take_cfd_snapshot(db, day)  # re-running replaces the day's rows
+
+    assert counts(db, day) == {
+        TaskStatus.DONE: (1, 3), TaskStatus.IN_PROGRESS: (1, 5), TaskStatus.TODO: (1, 2)
+    }
+    assert counts(db, day, sprint.id) == {TaskStatus.DONE: (1, 3), TaskStatus.IN_PROGRESS: (1, 5)}
+
+
+def test_backfill_replays_history_as_of_each_day(db, board):
+    admin, project, sprint = board
+    task = db.query(Task).filter(Task.title == "A").one()
+    db.query(TaskStatusHistory).delete()
+    start = datetime(2025, 3, 1, 10, 0)
+    db.add_all([
+        TaskStatusHistory(task_id=task.id, project_id=project.id, to_status=TaskStatus.TODO, changed_at=start),
+        TaskStatusHistory(task_id=task.id, project_id=project.id, from_status=TaskStatus.TODO,
+                          to_status=TaskStatus.DONE, changed_at=start + timedelta(days=2)),
+    ])
+    db.commit()
+
+    written = backfill_cfd_snapshots(db, end_date=date(2025, 3, 4))
+
+    assert written == 4
+    assert counts(db, date(2025, 3, 2)) == {TaskStatus.TODO: (1, 3)}
+    assert counts(db, date(2025, 3, 4)) == {TaskStatus.DONE: (1, 3)}
+    assert backfill_cfd_snapshots(db, end_date=date(2025, 3, 4)) == 0
+
+    result = get_cumulative_flow(project_id=project.id, sprint_id=None, start_date=date(2025, 3, 1),
+                                 end_date=date(2025, 3, 4), db=db, current_user=admin)
+    assert [point["date"] for point in result["series"]] == [
+        "2025-03-01", "2025-03-02", "2025-03-03", "2025-03-04"
+    ]
+    assert result["series"][-1]["task_counts"]["done"] == 1
+    assert result["series"][0]["story_points"]["todo"] == 3
+
+
+def test_backfill_counts_tasks_without_history(db, board):
+    admin, project, sprint = board
+    db.query(TaskStatusHistory).delete()
+    # Tasks that predate the status history table have no rows at all
+    db.query(Task).update({Task.created_at: datetime(2025, 2, 1)})
+    task = db.query(Task).filter(Task.title == "B").one()
+    db.add(TaskStatusHistory(task_id=task.id, project_id=project.id, from_status=TaskStatus.TODO,
+                             to_status=TaskStatus.IN_PROGRESS, changed_at=datetime(2025, 3, 3, 9, 0)))
+    db.commit()
+
+    backfill_cfd_snapshots(db, start_date=date(2025, 3, 2), end_date=date(2025, 3, 3))
+    take_cfd_snapshot(db, date(2025, 3, 4))
+
+    assert counts(db, date(2025, 3, 2)) == {TaskStatus.DONE: (1, 3), TaskStatus.TODO: (2, 7)}
+    assert counts(db, date(2025, 3, 3)) == counts(db, date(2025, 3, 4)) == {
+        TaskStatus.DONE: (1, 3), TaskStatus.IN_PROGRESS: (1, 5), TaskStatus.TODO: (1, 2)
+    }
@@ -0,0 +1,161 @@
+"""
+Tests for aggregated dashboard endpoints
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.models.enums import TaskStatus, SprintStatus, UserRole
+from app.models.user import User
+from app.models.team import Team
+from app.models.project import Project
+from app.models.phase import Phase
+from app.models.milestone import Milestone
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.core.sections import Section, compose_sections
+from app.api.v1.endpoints.dashboard import get_dashboard_data, get_user_dashboard_data
+from app.api.v1.endpoints.reports import get_dashboard_report
+from conftest import engine, TestingSessionLocal
+
+
+@pytest.fixture
+def workspace(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    lead = User(username="lead", email="lead@example.com", password_hash="x",
+                first_name="Lea", last_name="Lead", role=UserRole.TEAM_LEADER)
+    dev = User(username="dev", email="dev@example.com", password_hash="x",
+               first_name="Dev", last_name="One", role=UserRole.DEVELOPER)
+    db.add_all([admin, lead, dev])
+    db.flush()
+    visible = Project(name="Visible", created_by_id=admin.id)
+    hidden = Project(name="Hidden", created_by_id=admin.id)
+    db.add_all([visible, hidden])
+    db.flush()
+    team = Team(name="Core", team_leader_id=lead.id)
+    team.members.append(dev)
+    team.projects.append(visible)
+    db.add(team)
+    phase = Phase(name="Phase", project_id=visible.id)
+    db.add(phase)
+    db.flush()
+    milestone = Milestone(name="Milestone", phase_id=phase.id, project_id=visible.id)
+    db.add(milestone)
+    db.flush()
+    db.add(Sprint(name="Sprint", milestone_id=milestone.id, project_id=visible.id, status=SprintStatus.ACTIVE))
+    tasks = [
+        Task(title="Todo", project_id=visible.id, created_by_id=dev.id, assignee_id=dev.id,
+             status=TaskStatus.TODO, story_points=3),
+        Task(title="Done", project_id=visible.id, created_by_id=admin.id, assignee_id=dev.id,
+             status=TaskStatus.DONE, story_points=5),
+        Task(title="Other", project_id=hidden.id, created_by_id=admin.id),
+    ]
+    db.add_all(tasks)
+    db.flush()
+    db.add(TimeLog(task_id=tasks[0].id, user_id=dev.id, hours=2.5, date=datetime.now()))
+    db.commit()
+    return {"admin": admin, "lead": lead, "dev": dev, "visible": visible}
+
+
+def count_statements(func):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_dashboard_counts_by_status(db, workspace):
+    dev = workspace["dev"]
+    data = asyncio.run(get_dashboard_data(live=True, db=db, current_user=dev))
+
+    assert data["projects"]["total"] == 1
+    assert data["tasks"]["my_assigned_total"] == 2
+    assert data["tasks"]["my_todo"] == 1
+    assert data["tasks"]["my_completed"] == 1
+    assert data["tasks"]["accessible_total"] == 2
+    assert data["story_points"] == {"my_total": 8, "my_completed": 5, "completion_rate": 62.5}
+    assert data["sprints"] == {"total": 1, "active": 1}
+    assert data["time_logs"]["total_hours"] == 2.5
+    assert data["teams"]["team_details"][0]["member_count"] == 1
+    assert {task["project_name"] for task in data["recent_tasks"]} == {"Visible"}
+
+
+def test_dashboard_cost_does_not_grow_with_project_size(db, workspace):
+    dev, visible = workspace["dev"], workspace["visible"]
+    dev.id  # load the expired user before counting
+    _, before = count_statements(lambda: asyncio.run(get_dashboard_data(live=True, db=db, current_user=dev)))
+
+    db.add_all([
+        Task(title=f"Bulk {i}", project_id=visible.id, created_by_id=dev.id, assignee_id=dev.id)
+        for i in range(50)
+    ])
+    db.commit()
+    dev.id
+    data, after = count_statements(lambda: asyncio.run(get_dashboard_data(live=True, db=db, current_user=dev)))
+
+    assert data["tasks"]["accessible_total"] == 52
+    assert len(data["recent_tasks"]) == 5
+    assert after == before
+
+
+def test_team_leader_sees_member_dashboard(db, workspace):
+    lead, dev = workspace["lead"], workspace["dev"]
+    data = asyncio.run(get_user_dashboard_data(user_id=dev.id, db=db, current_user=lead))
+
+    assert data["tasks"]["assigned_total"] == 2
+    assert data["tasks"]["created_total"] == 1
+    assert data["teams"]["team_details"][0]["projects"] == [{"id": workspace["visible"].id, "name": "Visible"}]
+    assert data["time_logs"]["hours_by_project"] == [{"project_name": "Visible", "hours": 2.5}]
+
+
+def test_dashboard_report_uses_logged_hours(db, workspace):
+    report = get_dashboard_report(db=db, current_user=workspace["admin"])
+
+    assert report.dashboard_summary.total_hours_logged == 2.5
+    assert report.dashboard_summary.active_tasks == 2
+    assert report.recent_activities[0].duration_minutes == 150
+    visible = next(item for item in report.project_progress if item.project_name == "Visible")
+    assert (visible.total_points_planned, visible.total_points_completed) == (8, 5)
+
+
+def test_sections_run_concurrently_with_partial_failures(db):
+    def slow(name):
+        def section(session):
+            time.sleep(0.2)
+            return {name: 1}
+        return section
+
+    def broken(session):
+        raise RuntimeError("boom")
+
+    def stuck(session):
+        time.sleep(1)
+        return {"stuck": 1}
+
+    started = time.monotonic()
+    result = asyncio.run(compose_sections([
+        Section("a", slow("a")),
+        Section("b", slow("b")),
+        Section("c", slow("c")),
+        Section("broken", broken),
+        Section("stuck", stuck, timeout=0.3),
+    ], TestingSessionLocal, timeout=5))
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.55
+    assert (result["a"], result["b"], result["c"]) == (1, 1, 1)
+    assert result["broken"] is None and result["stuck"] is None
+    assert result["sections"]["broken"]["status"] == "error"
+    assert result["sections"]["stuck"]["status"] == "timeout"
@@ -0,0 +1,160 @@
+"""
+Tests for materialized per-user dashboard snapshots
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.dashboard_snapshots import get_snapshot, refresh_dirty_snapshots
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.team import Team
+from app.models.project import Project
+from app.models.phase import Phase
+from app.models.milestone import Milestone
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.api.v1.endpoints.dashboard import get_dashboard_data
+
+
+@pytest.fixture
+def workspace(db):
+    lead = User(username="lead", email="lead@example.com", password_hash="x", role=UserRole.TEAM_LEADER)
+    dev = User(username="dev", email="dev@example.com", password_hash="x", role=UserRole.DEVELOPER)
+    other = User(username="other", email="other@example.com", password_hash="x", role=UserRole.DEVELOPER)
+    db.add_all([lead, dev, other])
+    db.flush()
+    project = Project(name="Snap", created_by_id=lead.id)
+    db.add(project)
+    db.flush()
+    team = Team(name="Core", team_leader_id=lead.id)
+    team.members.append(dev)
+    team.projects.append(project)
+    db.add(team)
+    task = Task(title="Todo", project_id=project.id, created_by_id=lead.id, assignee_id=dev.id,
+                status=TaskStatus.TODO, story_points=3)
+    db.add(task)
+    db.commit()
+    return {"lead": lead, "dev": dev, "other": other, "team": team, "task": task}
+
+
+def dashboard(db, user, live=False):
+    return asyncio.run(get_dashboard_data(live=live, db=db, current_user=user))
+
+
+def test_first_request_computes_live_and_stores_snapshot(db, workspace):
+    dev = workspace["dev"]
+    first = dashboard(db, dev)
+
+    assert first["snapshot"]["source"] == "live"
+    assert first["snapshot"]["version"] == 1
+    assert first["tasks"]["my_todo"] == 1
+
+    second = dashboard(db, dev)
+    assert second["snapshot"]["source"] == "snapshot"
+    assert second["snapshot"]["stale"] is False
+    assert second["tasks"] == first["tasks"]
+
+
+def test_writes_mark_affected_users_dirty(db, workspace):
+    dev, other, task = workspace["dev"], workspace["other"], workspace["task"]
+    dashboard(db, dev)
+    dashboard(db, other)
+
+    task.status = TaskStatus.DONE
+    db.commit()
+    assert get_snapshot(db, dev.id).dirty_since is not None
+    assert get_snapshot(db, other.id).dirty_since is None
+
+    stale = dashboard(db, dev)
+    assert stale["snapshot"]["source"] == "snapshot"
+    assert stale["snapshot"]["stale"] is True
+    assert stale["tasks"]["my_todo"] == 1
+
+    db.add(TimeLog(task_id=task.id, user_id=other.id, hours=1, date=datetime.now() - timedelta(minutes=1)))
+    db.commit()
+    assert get_snapshot(db, other.id).dirty_since is not None
+
+
+def test_shared_project_writes_mark_everyone_with_access_dirty(db, workspace):
+    lead, dev, other = workspace["lead"], workspace["dev"], workspace["other"]
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(admin)
+    db.commit()
+    users = (admin, lead, dev, other)
+
+    def dirty():
+        db.expire_all()
+        return [get_snapshot(db, user.id).dirty_since is not None for user in users]
+
+    def refresh():
+        for user in users:
+            dashboard(db, user, live=True)
+        assert dirty() == [False] * 4
+
+    project_id = workspace["task"].project_id
+    refresh()
+    # Another user's unassigned task changes the accessible task count
+    db.add(Task(title="Shared", project_id=project_id, created_by_id=lead.id))
+    db.commit()
+    assert dirty() == [True, True, True, False]
+    assert dashboard(db, dev)["snapshot"]["stale"] is True
+
+    refresh()
+    phase = Phase(name="Phase", project_id=project_id)
+    db.add(phase)
+    db.flush()
+    milestone = Milestone(name="Milestone", phase_id=phase.id, project_id=project_id)
+    db.add(milestone)
+    db.flush()
+    db.add(Sprint(name="Sprint", milestone_id=milestone.id, project_id=project_id))
+    db.commit()
+    assert dirty() == [True, True, True, False]
+
+    refresh()
+    db.add(Project(name="Elsewhere", created_by_id=admin.id))
+    db.commit()
+    assert dirty() == [True, False, False, False]
+
+
+def test_team_membership_change_marks_member_dirty(db, workspace):
+    other, team = workspace["other"], workspace["team"]
+    dashboard(db, other)
+
+    team.members.append(other)
+    db.commit()
+
+    assert get_snapshot(db, other.id).dirty_since is not None
+
+
+def test_refresh_job_rebuilds_dirty_snapshots(db, workspace):
+    dev, task = workspace["dev"], workspace["task"]
+    dashboard(db, dev)
+    task.status = TaskStatus.DONE
+    db.commit()
+
+    assert refresh_dirty_snapshots(db) == 1
+
+    data = dashboard(db, dev)
+    assert data["snapshot"]["version"] == 2
+    assert data["snapshot"]["stale"] is False
+    assert data["tasks"]["my_completed"] == 1
+
+
+def test_long_dirty_snapshot_falls_back_to_live(db, workspace):
+    dev, task = workspace["dev"], workspace["task"]
+    dashboard(db, dev)
+    task.status = TaskStatus.DONE
+    db.commit()
+    snapshot = get_snapshot(db, dev.id)
+    snapshot.dirty_since = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+
+    data = dashboard(db, dev)
+
+    assert data["snapshot"]["source"] == "live"
+    assert data["tasks"]["my_completed"] == 1
+    assert get_snapshot(db, dev.id).dirty_since is None
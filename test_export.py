@@ -0,0 +1,92 @@
+"""
+Tests for streamed time log exports
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.export_stream import csv_chunks
+from app.models.enums import UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.api.v1.endpoints.advanced_reports import export_time_logs
+
+
+@pytest.fixture
+def admin(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x",
+                 first_name="Ada", last_name="Admin", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Export", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="Write", project_id=project.id, created_by_id=admin.id)
+    db.add(task)
+    db.flush()
+    db.add_all([
+        TimeLog(task_id=task.id, user_id=admin.id, hours=1.5, date=datetime(2025, 6, 2, 9, 30),
+                description="Planning"),
+        TimeLog(task_id=task.id, user_id=admin.id, hours=2, date=datetime(2025, 6, 3, 14, 0),
+                description="Live timer session"),
+    ])
+    db.commit()
+    return admin
+
+
+def read_body(response) -> bytes:
+    async def collect():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(collect())
+
+
+def export(db, admin, **kwargs):
+    params = dict(format="csv", project_id=None, start_date=None, end_date=None, gzip=False)
+    params.update(kwargs)
+    return export_time_logs(db=db, current_user=admin, **params)
+
+
+def test_csv_export_streams_rows(db, admin):
+    response = export(db, admin)
+    rows = list(csv.reader(io.StringIO(read_body(response).decode())))
+
+    assert response.media_type == "text/csv"
+    assert rows[0][0] == "Date"
+    assert rows[1] == ["2025-06-02 09:30:00", "Ada Admin", "Export", "Write", "1.5", "90", "Manual", "Planning"]
+    assert rows[2][6] == "Timer"
+
+
+def test_ndjson_export_is_gzipped_on_request(db, admin):
+    response = export(db, admin, format="ndjson", gzip=True)
+    lines = gzip.decompress(read_body(response)).decode().splitlines()
+
+    assert response.media_type == "application/gzip"
+    assert "time_logs.ndjson.gz" in response.headers["content-disposition"]
+    assert [json.loads(line)["duration_minutes"] for line in lines] == [90, 120]
+
+
+def test_json_export_is_a_single_array(db, admin):
+    data = json.loads(read_body(export(db, admin, format="json")))
+
+    assert [item["date"] for item in data] == ["2025-06-02T09:30:00", "2025-06-03T14:00:00"]
+
+
+def test_unknown_format_is_rejected(db, admin):
+    with pytest.raises(HTTPException) as error:
+        export(db, admin, format="xml")
+    assert error.value.status_code == 400
+
+
+def test_csv_chunks_send_header_first_then_batches():
+    chunks = list(csv_chunks(["n"], ([i] for i in range(5)), batch_rows=2))
+
+    assert chunks == ["n\r\n", "0\r\n1\r\n", "2\r\n3\r\n", "4\r\n"]
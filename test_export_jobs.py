@@ -0,0 +1,133 @@
+"""
+Tests for background export jobs
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.export_jobs import run_export_job, purge_expired_exports
+from app.models.enums import ExportJobStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.models.export_job import ExportJob
+from app.schemas.export_job import ExportJobCreate
+from app.api.v1.endpoints import exports
+from conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def db(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    return db
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    job_ids = []
+    monkeypatch.setattr(exports, "submit_export_job", job_ids.append)
+    return job_ids
+
+
+@pytest.fixture
+def admin(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x",
+                 first_name="Ada", last_name="Admin", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Export", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="Write", project_id=project.id, created_by_id=admin.id)
+    db.add(task)
+    db.flush()
+    db.add(TimeLog(task_id=task.id, user_id=admin.id, hours=1.5, date=datetime(2025, 6, 2, 9, 30)))
+    db.commit()
+    return admin
+
+
+def create(db, admin, **kwargs):
+    return exports.create_export_job(job_in=ExportJobCreate(**kwargs), db=db, current_user=admin)
+
+
+def test_time_log_export_job_produces_gzip_file(db, admin, submitted):
+    job = create(db, admin, kind="time_logs", format="csv", parameters={"start_date": "2025-06-01"})
+    assert job.status == ExportJobStatus.QUEUED
+    assert submitted == [job.id]
+
+    run_export_job(job.id, session_factory=TestingSessionLocal)
+    db.expire_all()
+    status = exports.get_export_job(job_id=job.id, db=db, current_user=admin)
+    assert status.status == ExportJobStatus.COMPLETED
+    assert status.download_url.endswith(f"/exports/{job.id}/download")
+
+    response = exports.download_export(job_id=job.id, db=db, current_user=admin)
+    with open(response.path, "rb") as handle:
+        rows = list(csv.reader(io.StringIO(gzip.decompress(handle.read()).decode())))
+    assert rows[1][:4] == ["2025-06-02 09:30:00", "Ada Admin", "Export", "Write"]
+
+
+def test_report_job_writes_json(db, admin, submitted):
+    job = create(db, admin, kind="workload_analysis", format="json", parameters={"period_days": 7})
+    run_export_job(job.id, session_factory=TestingSessionLocal)
+    db.expire_all()
+
+    stored = db.get(ExportJob, job.id)
+    with gzip.open(stored.file_path, "rt") as handle:
+        report = json.load(handle)
+    assert report["analysis_period"]["days"] == 7
+    assert stored.expires_at > stored.finished_at
+
+
+def test_format_defaults_to_the_kinds_first_format(db, admin, submitted):
+    assert create(db, admin, kind="story_points_report").format == "json"
+    assert create(db, admin, kind="time_logs").format == "csv"
+
+
+def test_invalid_requests_are_rejected(db, admin, submitted):
+    for kwargs in (
+        dict(kind="payroll"),
+        dict(kind="story_points_report", format="csv"),
+        dict(kind="time_logs", parameters={"project": 1}),
+    ):
+        with pytest.raises(HTTPException) as error:
+            create(db, admin, **kwargs)
+        assert error.value.status_code == 400
+    assert submitted == []
+
+
+def test_pending_jobs_are_bounded(db, admin, submitted, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_MAX_PENDING_JOBS", 1)
+    create(db, admin, kind="time_logs")
+    with pytest.raises(HTTPException) as error:
+        create(db, admin, kind="time_logs")
+    assert error.value.status_code == 429
+
+
+def test_failed_jobs_record_the_error_and_expired_jobs_are_purged(db, admin, submitted):
+    developer = User(username="dev", email="dev@example.com", password_hash="x", role=UserRole.DEVELOPER)
+    db.add(developer)
+    db.commit()
+    failing = create(db, developer, kind="workload_analysis", format="json")
+    done = create(db, admin, kind="time_logs")
+    for job_id in (failing.id, done.id):
+        run_export_job(job_id, session_factory=TestingSessionLocal)
+    db.expire_all()
+
+    failed = db.get(ExportJob, failing.id)
+    assert failed.status == ExportJobStatus.FAILED
+    assert "Access denied" in failed.error
+
+    path = db.get(ExportJob, done.id).file_path
+    assert purge_expired_exports(db, now=datetime.utcnow() + timedelta(hours=settings.EXPORT_RETENTION_HOURS + 1)) == 2
+    assert db.query(ExportJob).count() == 0
+    assert not os.path.exists(path)
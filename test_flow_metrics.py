@@ -0,0 +1,110 @@
+"""
+Tests for task status history and flow metrics
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.task_status_history import TaskStatusHistory
+from app.api.v1.endpoints.flow_metrics import get_cycle_time, get_lead_time, get_time_in_status
+
+
+@pytest.fixture
+def admin(db):
+    user = User(username="admin", email="admin@example.com", password_hash="x",
+                first_name="Ada", last_name="Admin", role=UserRole.ADMIN)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def flow_params(**overrides):
+    params = dict(project_id=None, sprint_id=None, assignee_id=None, start_date=None, end_date=None)
+    params.update(overrides)
+    return params
+
+
+def test_status_changes_are_recorded(db, admin):
+    project = Project(name="History", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="Track me", project_id=project.id, created_by_id=admin.id)
+    db.add(task)
+    db.commit()
+    db.info["current_user_id"] = admin.id
+    task.status = TaskStatus.IN_PROGRESS
+    db.commit()
+    task.status = TaskStatus.DONE
+    db.commit()
+
+    rows = db.query(TaskStatusHistory).order_by(TaskStatusHistory.id).all()
+    assert [(row.from_status, row.to_status) for row in rows] == [
+        (None, TaskStatus.TODO),
+        (TaskStatus.TODO, TaskStatus.IN_PROGRESS),
+        (TaskStatus.IN_PROGRESS, TaskStatus.DONE),
+    ]
+    assert rows[-1].user_id == admin.id
+
+
+def seed_flow(db, admin, project_name, cycle_hours):
+    """One completed task per entry in cycle_hours, each created a day before it started"""
+    project = Project(name=project_name, created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    base = datetime(2025, 1, 1, 9, 0, 0)
+    for i, hours in enumerate(cycle_hours):
+        task = Task(title=f"{project_name} {i}", project_id=project.id, created_by_id=admin.id,
+                    status=TaskStatus.DONE, created_at=base)
+        db.add(task)
+        db.flush()
+        db.query(TaskStatusHistory).filter(TaskStatusHistory.task_id == task.id).delete()
+        started = base + timedelta(days=1)
+        db.add_all([
+            TaskStatusHistory(task_id=task.id, project_id=project.id, from_status=None,
+                              to_status=TaskStatus.TODO, changed_at=base),
+            TaskStatusHistory(task_id=task.id, project_id=project.id, from_status=TaskStatus.TODO,
+                              to_status=TaskStatus.IN_PROGRESS, changed_at=started),
+            TaskStatusHistory(task_id=task.id, project_id=project.id, from_status=TaskStatus.IN_PROGRESS,
+                              to_status=TaskStatus.DONE, changed_at=started + timedelta(hours=hours)),
+        ])
+    db.commit()
+    return project
+
+
+def test_cycle_time_percentiles_per_project(db, admin):
+    alpha = seed_flow(db, admin, "Alpha", [1, 2, 3, 4, 10])
+    seed_flow(db, admin, "Beta", [6])
+
+    result = get_cycle_time(db=db, current_user=admin, group_by="project", **flow_params())
+    groups = {group["name"]: group for group in result["groups"]}
+
+    assert groups["Alpha"]["key"] == alpha.id
+    assert groups["Alpha"]["count"] == 5
+    assert groups["Alpha"]["p50_hours"] == 3
+    assert groups["Alpha"]["p85_hours"] == 10
+    assert groups["Alpha"]["average_hours"] == 4
+    assert groups["Beta"]["p95_hours"] == 6
+
+
+def test_lead_time_includes_time_before_start(db, admin):
+    seed_flow(db, admin, "Alpha", [2])
+
+    result = get_lead_time(db=db, current_user=admin, group_by=None, **flow_params())
+
+    assert result["groups"][0]["p50_hours"] == 26
+
+
+def test_time_in_status_uses_next_transition(db, admin):
+    seed_flow(db, admin, "Alpha", [5, 7])
+
+    result = get_time_in_status(db=db, current_user=admin, **flow_params())
+    statuses = {row["status"]: row for row in result["statuses"]}
+
+    assert statuses["todo"]["p50_hours"] == 24
+    assert statuses["in_progress"]["count"] == 2
+    assert statuses["in_progress"]["p95_hours"] == 7
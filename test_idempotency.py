@@ -0,0 +1,125 @@
+"""
+Tests for Idempotency-Key handling on mutating endpoints
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.auth import create_access_token
+from app.core.database import get_db
+from app.core.idempotency import _request_hash, idempotency_store
+from app.models.enums import UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from main import app
+from conftest import TestingSessionLocal
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(db):
+    idempotency_store.clear()
+    previous_override = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        if previous_override:
+            app.dependency_overrides[get_db] = previous_override
+        else:
+            app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def setup_data(client, db):
+    user = User(username="idem", email="idem@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(user)
+    db.flush()
+    project = Project(name="Idempotent", created_by_id=user.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="Retry me", project_id=project.id, created_by_id=user.id, assignee_id=user.id)
+    db.add(task)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+    return headers, task.id
+
+
+def test_retry_with_same_key_is_replayed(client, setup_data):
+    headers, task_id = setup_data
+    payload = {"task_id": task_id, "hours": 1.5, "date": "2025-01-01T10:00:00"}
+
+    first = client.post("/api/v1/time-logs/", json=payload, headers={**headers, "Idempotency-Key": "abc"})
+    second = client.post("/api/v1/time-logs/", json=payload, headers={**headers, "Idempotency-Key": "abc"})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers.get("idempotent-replayed") == "true"
+
+    db = TestingSessionLocal()
+    assert db.query(TimeLog).count() == 1
+    db.close()
+
+
+def test_replay_survives_cache_eviction(client, setup_data):
+    headers, task_id = setup_data
+    params = {"task_id": task_id, "duration_minutes": 30}
+
+    first = client.post("/api/v1/time-logs/log-time", params=params, headers={**headers, "Idempotency-Key": "k1"})
+    idempotency_store.clear()
+    second = client.post("/api/v1/time-logs/log-time", params=params, headers={**headers, "Idempotency-Key": "k1"})
+
+    assert second.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+
+
+def test_reusing_key_for_different_request_is_rejected(client, setup_data):
+    headers, task_id = setup_data
+    client.post("/api/v1/time-logs/log-time", params={"task_id": task_id, "duration_minutes": 30},
+                headers={**headers, "Idempotency-Key": "k2"})
+    response = client.post("/api/v1/time-logs/log-time", params={"task_id": task_id, "duration_minutes": 45},
+                           headers={**headers, "Idempotency-Key": "k2"})
+
+    assert response.status_code == 422
+
+
+def test_failed_request_does_not_consume_key(client, setup_data):
+    headers, task_id = setup_data
+    payload = {"title": "New", "project_id": 999}
+
+    failed = client.post("/api/v1/tasks/", json=payload, headers={**headers, "Idempotency-Key": "k3"})
+    assert failed.status_code == 404
+
+    payload["project_id"] = 1
+    # Same key with a different body is allowed because the failed attempt released it
+    created = client.post("/api/v1/tasks/", json=payload, headers={**headers, "Idempotency-Key": "k3"})
+    assert created.status_code == 200
+
+
+def test_rejections_carry_cors_headers(client, setup_data, db):
+    headers, task_id = setup_data
+    headers = {**headers, "Origin": "https://app.example.com"}
+    client.post("/api/v1/time-logs/log-time", params={"task_id": task_id, "duration_minutes": 30},
+                headers={**headers, "Idempotency-Key": "cors"})
+    mismatch = client.post("/api/v1/time-logs/log-time", params={"task_id": task_id, "duration_minutes": 45},
+                           headers={**headers, "Idempotency-Key": "cors"})
+
+    path = "/api/v1/time-logs/log-time"
+    query = f"task_id={task_id}&duration_minutes=30".encode()
+    idempotency_store.claim(db, "idem", "in-flight", "POST", path, _request_hash("POST", path, query, b""))
+    in_progress = client.post(path, params={"task_id": task_id, "duration_minutes": 30},
+                              headers={**headers, "Idempotency-Key": "in-flight"})
+
+    assert (mismatch.status_code, in_progress.status_code) == (422, 409)
+    for response in (mismatch, in_progress):
+        assert response.headers.get("access-control-allow-origin") in ("*", "https://app.example.com")
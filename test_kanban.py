@@ -0,0 +1,86 @@
+"""
+Tests for the paginated kanban board
+"""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.api.v1.endpoints.dashboard import get_kanban_board, get_kanban_column
+from conftest import engine
+
+
+@pytest.fixture
+def board(db):
+    dev = User(username="dev", email="dev@example.com", password_hash="x",
+               first_name="Dev", last_name="One", role=UserRole.DEVELOPER)
+    db.add(dev)
+    db.flush()
+    project = Project(name="Board", created_by_id=dev.id)
+    db.add(project)
+    db.flush()
+    db.add_all([
+        Task(title=f"Todo {i}", description="long text", project_id=project.id, created_by_id=dev.id,
+             assignee_id=dev.id if i % 2 == 0 else None, status=TaskStatus.TODO, story_points=1)
+        for i in range(7)
+    ])
+    db.add_all([
+        Task(title=f"Done {i}", project_id=project.id, created_by_id=dev.id, status=TaskStatus.DONE, story_points=2)
+        for i in range(2)
+    ])
+    db.commit()
+    return {"dev": dev, "project": project}
+
+
+def test_board_returns_counts_and_first_page(db, board):
+    data = get_kanban_board(project_id=board["project"].id, limit=3, db=db, current_user=board["dev"])
+    todo, done = data["columns"]["todo"], data["columns"]["done"]
+
+    assert (todo["count"], todo["story_points"], len(todo["cards"])) == (7, 7, 3)
+    assert todo["next_cursor"] is not None
+    assert (done["count"], len(done["cards"]), done["next_cursor"]) == (2, 2, None)
+    assert data["columns"]["blocked"] == {"count": 0, "story_points": 0, "cards": [], "next_cursor": None}
+    assert "description" not in todo["cards"][0]
+    assert todo["cards"][0]["assignee"]["full_name"] == "Dev One"
+    assert todo["cards"][1]["assignee"] is None
+
+
+def test_column_pages_follow_cursor(db, board):
+    project, dev = board["project"], board["dev"]
+    first = get_kanban_board(project_id=project.id, limit=3, db=db, current_user=dev)["columns"]["todo"]
+    titles = [card["title"] for card in first["cards"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = get_kanban_column(project_id=project.id, status=TaskStatus.TODO, cursor=cursor, limit=3,
+                                 db=db, current_user=dev)
+        titles += [card["title"] for card in page["cards"]]
+        cursor = page["next_cursor"]
+
+    assert titles == [f"Todo {i}" for i in range(7)]
+
+
+def test_board_query_count_is_constant(db, board):
+    project_id, dev = board["project"].id, board["dev"]
+    dev.id  # load the expired user before counting
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        get_kanban_board(project_id=project_id, limit=20, db=db, current_user=dev)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 4
+
+
+def test_invalid_cursor_is_rejected(db, board):
+    with pytest.raises(HTTPException) as exc:
+        get_kanban_column(project_id=board["project"].id, status=TaskStatus.TODO, cursor="not-a-cursor",
+                          limit=3, db=db, current_user=board["dev"])
+    assert exc.value.status_code == 400
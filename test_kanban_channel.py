@@ -0,0 +1,196 @@
+"""
+Tests for the kanban WebSocket channel and its event log
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.auth import create_access_token
+from app.core.kanban_channel import KanbanHub, kanban_hub
+from app.core.kanban_events import _insert_events, events_since, purge_kanban_events
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.kanban_event import KanbanEvent
+from app.api.v1.endpoints import dashboard
+from app.api.v1.endpoints.dashboard import get_kanban_board
+from conftest import engine, TestingSessionLocal
+
+app = FastAPI()
+app.include_router(dashboard.router, prefix="/dashboard")
+
+
+@pytest.fixture
+def db(db):
+    kanban_hub.session_factory = TestingSessionLocal
+    return db
+
+
+@pytest.fixture
+def board(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    outsider = User(username="outsider", email="out@example.com", password_hash="x", role=UserRole.DEVELOPER)
+    db.add_all([admin, outsider])
+    db.flush()
+    project = Project(name="Live", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="First", project_id=project.id, created_by_id=admin.id, assignee_id=admin.id)
+    db.add(task)
+    db.commit()
+    return {"admin": admin, "outsider": outsider, "project": project, "task": task}
+
+
+def channel_url(project_id, username, version=None):
+    url = f"/dashboard/kanban/{project_id}/ws?token={create_access_token({'sub': username})}"
+    return url if version is None else f"{url}&version={version}"
+
+
+def board_version(db, board):
+    return get_kanban_board(project_id=board["project"].id, limit=20, db=db, current_user=board["admin"])["version"]
+
+
+def test_writes_record_card_operations(db, board):
+    task = board["task"]
+    task.title = "Renamed"
+    db.commit()
+    task.status = TaskStatus.IN_PROGRESS
+    db.commit()
+    task.description = "Not on the card"
+    db.commit()
+    db.delete(task)
+    db.commit()
+
+    ops = [json.loads(payload) for (payload,) in db.query(KanbanEvent.payload).order_by(KanbanEvent.id)]
+    assert [op["op"] for op in ops] == ["created", "updated", "moved", "deleted"]
+    assert ops[0]["card"]["assignee"]["username"] == "admin"
+    assert ops[2]["status"] == "in_progress" and ops[2]["card"]["title"] == "Renamed"
+
+
+def test_subscriber_receives_patches(db, board):
+    project_id, task = board["project"].id, board["task"]
+    version = board_version(db, board)
+
+    with TestClient(app).websocket_connect(channel_url(project_id, "admin", version)) as websocket:
+        assert websocket.receive_json() == {"type": "hello", "version": version}
+
+        task.status = TaskStatus.DONE
+        db.commit()
+        patch = websocket.receive_json()
+        assert patch["type"] == "patch" and patch["version"] > version
+        assert patch["ops"][0]["op"] == "moved" and patch["ops"][0]["status"] == "done"
+
+        db.add(Task(title="Second", project_id=project_id, created_by_id=board["admin"].id))
+        db.commit()
+        created = websocket.receive_json()
+        assert created["ops"][0]["op"] == "created" and created["ops"][0]["card"]["title"] == "Second"
+    assert kanban_hub.subscriber_count(project_id) == 0
+
+
+def test_reconnect_catches_up_from_version(db, board):
+    project_id, task = board["project"].id, board["task"]
+    version = board_version(db, board)
+    task.title = "Offline edit"
+    db.commit()
+
+    with TestClient(app).websocket_connect(channel_url(project_id, "admin", version)) as websocket:
+        patch = websocket.receive_json()
+        assert [op["op"] for op in patch["ops"]] == ["updated"]
+        assert websocket.receive_json() == {"type": "hello", "version": patch["version"]}
+
+
+def test_purged_history_requires_resync(db, board):
+    project_id, task = board["project"].id, board["task"]
+    version = board_version(db, board)
+    task.title = "Edit one"
+    db.commit()
+    task.title = "Edit two"
+    db.commit()
+    purge_kanban_events(db, now=datetime.utcnow() + timedelta(days=30))
+    task.title = "Edit three"
+    db.commit()
+
+    with TestClient(app).websocket_connect(channel_url(project_id, "admin", version)) as websocket:
+        message = websocket.receive_json()
+    assert message["type"] == "resync"
+    assert message["version"] == board_version(db, board)
+
+
+def test_events_committed_out_of_id_order_are_delivered(db, board):
+    project_id = board["project"].id
+    hub = KanbanHub()
+    hub.session_factory = TestingSessionLocal
+    since = board_version(db, board)
+
+    def commit_event(event_id, title):
+        session = TestingSessionLocal()
+        try:
+            _insert_events(session, [{
+                "id": event_id, "project_id": project_id, "task_id": None, "op": "updated",
+                "payload": json.dumps({"op": "updated", "title": title}), "created_at": datetime.utcnow()
+            }])
+            session.commit()
+        finally:
+            session.close()
+
+    async def scenario():
+        subscriber, _ = await hub.subscribe(project_id, since)
+        # Transaction A took id 10 but commits after transaction B (id 11)
+        commit_event(11, "B")
+        await hub.broadcast(project_id)
+        commit_event(10, "A")
+        await hub.broadcast(project_id)
+        messages = []
+        while not subscriber.queue.empty():
+            messages.append(subscriber.render(subscriber.queue.get_nowait()))
+        hub.unsubscribe(subscriber)
+        return messages
+
+    messages = asyncio.run(scenario())
+    assert [op["title"] for message in messages for op in message["ops"]] == ["B", "A"]
+    assert [version for version, _ in events_since(db, project_id, since, 10)] == [since + 1, since + 2]
+    assert board_version(db, board) == since + 2
+
+
+def test_outsider_is_rejected(db, board):
+    with pytest.raises(WebSocketDisconnect):
+        with TestClient(app).websocket_connect(channel_url(board["project"].id, "outsider")) as websocket:
+            websocket.receive_json()
+
+
+def test_broadcast_cost_does_not_grow_with_subscribers(db, board):
+    project_id, task = board["project"].id, board["task"]
+    hub = KanbanHub()
+    hub.session_factory = TestingSessionLocal
+
+    async def scenario():
+        subscribers = [(await hub.subscribe(project_id, None))[0] for _ in range(500)]
+        task.status = TaskStatus.REVIEW
+        db.commit()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            await hub.broadcast(project_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        messages = [subscriber.render(subscriber.queue.get_nowait()) for subscriber in subscribers]
+        for subscriber in subscribers:
+            hub.unsubscribe(subscriber)
+        return statements, messages
+
+    statements, messages = asyncio.run(scenario())
+    assert len(statements) == 1
+    assert all(message["ops"][0]["status"] == "review" for message in messages)
+    assert hub.subscriber_count() == 0
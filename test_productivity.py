@@ -0,0 +1,105 @@
+"""
+Tests for calendar-bucketed productivity analytics
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.core.time_buckets import bucket_start, bucket_label, bucket_map
+from app.models.enums import UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.models.completed_sp import CompletedStoryPoints
+from app.api.v1.endpoints.advanced_reports import get_productivity_series, get_productivity_summary
+from conftest import engine
+
+
+@pytest.fixture
+def admin(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Velocity", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="Work", project_id=project.id, created_by_id=admin.id)
+    db.add(task)
+    db.flush()
+    for day, hours in ((date(2025, 5, 20), 4), (date(2025, 5, 21), 2), (date(2025, 6, 2), 5)):
+        db.add(TimeLog(task_id=task.id, user_id=admin.id, hours=hours, date=datetime.combine(day, datetime.min.time())))
+    for day, points in ((date(2025, 5, 21), 3), (date(2025, 6, 3), 5)):
+        db.add(CompletedStoryPoints(user_id=admin.id, project_id=project.id, story_points=points,
+                                    completed_at=datetime.combine(day, datetime.min.time())))
+    db.commit()
+    return admin
+
+
+def series(db, admin, **kwargs):
+    params = dict(bucket="week", calendar="gregorian", periods=12, start_date=None, end_date=None,
+                  team_id=None, project_id=None)
+    params.update(kwargs)
+    return get_productivity_series(db=db, current_user=admin, **params)
+
+
+def test_bucket_boundaries():
+    # Wednesday 4 June 2025 is 14 Khordad 1404
+    day = date(2025, 6, 4)
+    assert bucket_start(day, "week") == date(2025, 6, 2)
+    assert bucket_start(day, "week", "jalali") == date(2025, 5, 31)
+    assert bucket_start(day, "quarter") == date(2025, 4, 1)
+    assert bucket_start(day, "month", "jalali") == date(2025, 5, 22)
+    assert bucket_start(day, "quarter", "jalali") == date(2025, 3, 21)
+    assert bucket_label(date(2025, 5, 22), "month", "jalali") == "1404-03"
+    assert bucket_label(date(2025, 4, 1), "quarter") == "2025-Q2"
+
+    buckets, index = bucket_map(date(2025, 5, 30), date(2025, 6, 3), "week")
+    assert buckets == [(date(2025, 5, 30), date(2025, 6, 1)), (date(2025, 6, 2), date(2025, 6, 3))]
+    assert index[date(2025, 6, 1)] == 0
+
+
+def test_monthly_series_sums_hours_and_points(db, admin):
+    result = series(db, admin, bucket="month", start_date=date(2025, 5, 1), end_date=date(2025, 6, 30))
+
+    assert [item["label"] for item in result["series"]] == ["2025-05", "2025-06"]
+    may, june = result["series"]
+    assert (may["hours"], may["story_points"], may["efficiency_points_per_hour"]) == (6, 3, 0.5)
+    assert (june["hours"], june["story_points"]) == (5, 5)
+    assert result["totals"] == {"hours": 11, "story_points": 8, "efficiency_points_per_hour": 0.73}
+
+
+def test_jalali_months_split_at_khordad(db, admin):
+    result = series(db, admin, bucket="month", calendar="jalali",
+                    start_date=date(2025, 5, 1), end_date=date(2025, 6, 30))
+
+    labels = [item["label"] for item in result["series"]]
+    assert labels == ["1404-02", "1404-03", "1404-04"]
+    # 20 and 21 May fall in Ordibehesht, 2 and 3 June in Khordad
+    assert [item["hours"] for item in result["series"]] == [6, 5, 0]
+
+
+def test_series_cost_does_not_depend_on_bucket_count(db, admin):
+    statements = []
+    admin.role  # load the expired user before counting
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        series(db, admin, bucket="day", start_date=date(2025, 6, 1), end_date=date(2025, 6, 7))
+        weekly = len(statements)
+        series(db, admin, bucket="month", end_date=date(2025, 6, 30), periods=12)
+        yearly = len(statements) - weekly
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert weekly == yearly
+
+
+def test_summary_aggregates_in_sql(db, admin):
+    result = get_productivity_summary(period="year", team_id=None, project_id=None, db=db, current_user=admin)
+
+    assert set(result["metrics"]) >= {"total_hours", "total_story_points", "active_users", "active_projects"}
@@ -0,0 +1,169 @@
+"""
+Tests for the write-maintained project_stats counters and their consistency check
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.core.project_stats import (
+    COUNTER_COLUMNS, check_project_stats, compute_project_stats, load_project_stats, refresh_project_stats
+)
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.phase import Phase
+from app.models.milestone import Milestone
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.models.project_stats import ProjectStats
+from app.api.v1.endpoints.dashboard import get_project_report
+from conftest import engine
+
+
+@pytest.fixture
+def project(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Apollo", created_by_id=admin.id, estimated_hours=100)
+    db.add(project)
+    db.flush()
+    phase = Phase(name="Phase", project_id=project.id)
+    db.add(phase)
+    db.flush()
+    milestone = Milestone(name="Milestone", phase_id=phase.id, project_id=project.id)
+    db.add(milestone)
+    db.flush()
+    sprint = Sprint(name="Sprint", milestone_id=milestone.id, project_id=project.id, estimated_hours=40)
+    db.add(sprint)
+    db.flush()
+    tasks = [
+        Task(title="Done", project_id=project.id, sprint_id=sprint.id, created_by_id=admin.id,
+             status=TaskStatus.DONE, story_points=5, estimated_hours=4, actual_hours=3),
+        Task(title="Doing", project_id=project.id, sprint_id=sprint.id, created_by_id=admin.id,
+             status=TaskStatus.IN_PROGRESS, story_points=3, estimated_hours=2),
+    ]
+    db.add_all(tasks)
+    db.flush()
+    db.add(TimeLog(task_id=tasks[0].id, user_id=admin.id, hours=3, date=datetime.now()))
+    db.commit()
+    return {"admin": admin, "project": project, "sprint": sprint, "tasks": tasks}
+
+
+def stats_of(db, project_id):
+    db.expire_all()
+    return load_project_stats(db, project_id)
+
+
+def test_counters_follow_writes(db, project):
+    project_id, sprint, (done, doing) = project["project"].id, project["sprint"], project["tasks"]
+
+    stats = stats_of(db, project_id)
+    assert (stats.total_tasks, stats.done_tasks, stats.in_progress_tasks) == (2, 1, 1)
+    assert (stats.total_story_points, stats.done_story_points, stats.spent_hours) == (8, 5, 3.0)
+    assert stats.completion_percentage == 20.0
+
+    doing.status = TaskStatus.DONE
+    db.add(TimeLog(task_id=doing.id, user_id=project["admin"].id, hours=1.5, date=datetime.now()))
+    db.commit()
+    stats = stats_of(db, project_id)
+    assert (stats.done_tasks, stats.in_progress_tasks, stats.spent_hours) == (2, 0, 4.5)
+    assert stats.completion_percentage == 40.0
+
+    sprint.estimated_hours = 20
+    project["project"].estimated_hours = 50
+    db.commit()
+    assert stats_of(db, project_id).completion_percentage == 40.0
+
+    db.delete(done)
+    db.commit()
+    stats = stats_of(db, project_id)
+    assert (stats.total_tasks, stats.total_story_points, stats.spent_hours) == (1, 3, 1.5)
+
+
+def test_moving_a_task_updates_both_projects(db, project):
+    other = Project(name="Other", created_by_id=project["admin"].id)
+    db.add(other)
+    db.commit()
+    project["tasks"][0].project_id = other.id
+    project["tasks"][0].sprint_id = None
+    db.commit()
+
+    assert stats_of(db, project["project"].id).total_tasks == 1
+    moved = stats_of(db, other.id)
+    assert (moved.total_tasks, moved.done_tasks, moved.spent_hours) == (1, 1, 3.0)
+
+
+def test_deleting_a_project_removes_its_row(db, project):
+    empty = Project(name="Empty", created_by_id=project["admin"].id)
+    db.add(empty)
+    db.commit()
+    empty_id = empty.id
+    assert db.get(ProjectStats, empty_id).total_tasks == 0
+
+    db.delete(empty)
+    db.commit()
+    assert db.get(ProjectStats, empty_id) is None
+
+
+def test_consistency_check_repairs_drift(db, project):
+    project_id = project["project"].id
+    assert check_project_stats(db) == []
+
+    # Bulk updates bypass the flush hook
+    db.query(Task).filter(Task.project_id == project_id).update(
+        {Task.status: TaskStatus.BLOCKED}, synchronize_session=False
+    )
+    db.commit()
+    assert stats_of(db, project_id).blocked_tasks == 0
+
+    assert check_project_stats(db, repair=False) == [project_id]
+    assert check_project_stats(db) == [project_id]
+    assert stats_of(db, project_id).blocked_tasks == 2
+    assert check_project_stats(db) == []
+
+
+def test_write_tolerates_a_concurrent_insert(db, project):
+    project_id = project["project"].id
+    db.query(ProjectStats).delete()
+    db.commit()
+    inserted = []
+
+    def insert_after_lookup(conn, cursor, statement, parameters, context, executemany):
+        # Another worker inserts the row between the lookup and our insert
+        if statement.startswith("SELECT project_stats.project_id") and not inserted:
+            inserted.append(project_id)
+            conn.connection.driver_connection.execute(
+                f"INSERT INTO project_stats (project_id, {', '.join(COUNTER_COLUMNS)}, updated_at) "
+                f"VALUES ({project_id}, {', '.join('0' * len(COUNTER_COLUMNS))}, '2025-01-01')"
+            )
+
+    event.listen(engine, "after_cursor_execute", insert_after_lookup)
+    try:
+        refresh_project_stats(db.connection(), [project_id])
+    finally:
+        event.remove(engine, "after_cursor_execute", insert_after_lookup)
+    db.commit()
+
+    assert inserted == [project_id]
+    stats = stats_of(db, project_id)
+    assert (stats.total_tasks, stats.done_tasks, stats.spent_hours) == (2, 1, 3.0)
+
+
+def test_stored_counters_match_recomputation(db, project):
+    stored = stats_of(db, project["project"].id)
+    expected = compute_project_stats(db.connection())[project["project"].id]
+
+    assert {column: getattr(stored, column) for column in expected} == expected
+
+
+def test_project_report_reads_counters(db, project):
+    report = get_project_report(project_id=project["project"].id, db=db, current_user=project["admin"])
+
+    assert report["tasks"]["by_status"] == {"done": 1, "in_progress": 1}
+    assert report["tasks"]["story_points"]["total"] == 8
+    assert report["tasks"]["story_points"]["completed"] == 5
+    assert report["time_tracking"] == {"estimated_hours": 6.0, "actual_hours": 3.0, "efficiency": 200.0}
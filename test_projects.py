@@ -0,0 +1,281 @@
+"""
+Tests for project list and detail statistics
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models.enums import TaskStatus, SprintStatus, UserRole, ProjectStatus
+from app.models.user import User
+from app.models.project import Project
+from app.models.phase import Phase
+from app.models.milestone import Milestone
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.models.project_stats import ProjectStats
+from app.api.v1.endpoints.projects import get_projects, get_project, get_project_users, get_project_hierarchy
+from conftest import engine
+
+
+def add_project(db, owner, name, estimated_hours=100.0):
+    project = Project(name=name, created_by_id=owner.id, estimated_hours=estimated_hours)
+    db.add(project)
+    db.flush()
+    phase = Phase(name=f"{name} phase", project_id=project.id, estimated_hours=60)
+    db.add(phase)
+    db.flush()
+    milestone = Milestone(name=f"{name} milestone", phase_id=phase.id, project_id=project.id, estimated_hours=50)
+    db.add(milestone)
+    db.flush()
+    return project, phase, milestone
+
+
+@pytest.fixture
+def workspace(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x",
+                 first_name="Ada", last_name="Admin", role=UserRole.ADMIN)
+    dev = User(username="dev", email="dev@example.com", password_hash="x",
+               first_name="Dev", last_name="One", role=UserRole.DEVELOPER)
+    db.add_all([admin, dev])
+    db.flush()
+    project, phase, milestone = add_project(db, admin, "Apollo")
+    weighted = Sprint(name="Weighted", milestone_id=milestone.id, project_id=project.id,
+                      estimated_hours=40, status=SprintStatus.ACTIVE)
+    unweighted = Sprint(name="Unweighted", milestone_id=milestone.id, project_id=project.id,
+                        estimated_hours=0, status=SprintStatus.PLANNED)
+    db.add_all([weighted, unweighted])
+    db.flush()
+    tasks = [
+        Task(title="Done", project_id=project.id, sprint_id=weighted.id, created_by_id=admin.id,
+             assignee_id=dev.id, status=TaskStatus.DONE, story_points=5),
+        Task(title="Doing", project_id=project.id, sprint_id=weighted.id, created_by_id=admin.id,
+             assignee_id=dev.id, status=TaskStatus.IN_PROGRESS, story_points=3),
+        Task(title="Other sprint", project_id=project.id, sprint_id=unweighted.id, created_by_id=admin.id,
+             assignee_id=admin.id, status=TaskStatus.DONE, story_points=2),
+        Task(title="Loose", project_id=project.id, created_by_id=admin.id),
+    ]
+    db.add_all(tasks)
+    db.flush()
+    logged = datetime.now() - timedelta(days=1)
+    db.add_all([
+        TimeLog(task_id=tasks[0].id, user_id=dev.id, hours=3, date=logged),
+        TimeLog(task_id=tasks[1].id, user_id=dev.id, hours=1.5, date=logged),
+        TimeLog(task_id=tasks[2].id, user_id=admin.id, hours=2, date=logged),
+    ])
+    empty, _, _ = add_project(db, admin, "Empty", estimated_hours=0)
+    db.commit()
+    return {"admin": admin, "dev": dev, "project": project, "empty": empty, "tasks": tasks,
+            "sprints": [weighted, unweighted], "phase": phase, "milestone": milestone}
+
+
+def count_statements(func):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def list_projects(db, user, expand=True):
+    return get_projects(skip=0, limit=100, show_closed=False, status=None, expand=expand,
+                        db=db, current_user=user)
+
+
+def test_project_list_metrics(db, workspace):
+    for expand in (True, False):
+        projects = {project.name: project for project in list_projects(db, workspace["admin"], expand)}
+        apollo = projects["Apollo"]
+        assert (apollo.total_tasks, apollo.done_tasks, apollo.total_spent_hours) == (4, 2, 6.5)
+        # 40 estimated sprint hours, half of the sprint's tasks done, out of 100
+        assert apollo.completion_percentage == 20.0
+        assert apollo.estimated_hours == 100
+        assert (projects["Empty"].total_tasks, projects["Empty"].completion_percentage) == (0, 0.0)
+    assert projects["Apollo"].created_by_username is None
+    assert list_projects(db, workspace["admin"])[0].created_by_name == "Ada Admin"
+
+
+def project_detail(db, workspace, **options):
+    params = dict(expand=True, include_details=True, include_users=True, sprint_done=False)
+    params.update(options)
+    return get_project(project_id=workspace["project"].id, db=db, current_user=workspace["admin"], **params)
+
+
+def test_project_detail_summaries(db, workspace):
+    detail = project_detail(db, workspace)
+    tasks, sprints = detail.task_summary, detail.sprint_summary
+
+    assert (tasks.total, tasks.done, tasks.in_progress, tasks.todo, tasks.done_percentage) == (4, 2, 1, 1, 50.0)
+    assert (sprints.total, sprints.active, sprints.planned, sprints.active_estimated_hours) == (2, 1, 1, 40)
+    assert (detail.milestone_summary.total, detail.milestone_summary.pending_estimated_hours) == (1, 50)
+    assert (detail.phase_summary.total, detail.phase_summary.total_estimated_hours) == (1, 60)
+    assert detail.completion_percentage == 20.0
+    assert [sprint["task_count"] for sprint in detail.sprints] == [2, 1]
+    assert detail.milestones[0]["sprint_count"] == 2
+    assert detail.phases[0]["milestone_count"] == 1
+    assert detail.created_by_name == "Ada Admin"
+
+
+def test_project_detail_statement_count(db, workspace):
+    workspace["admin"].role
+    workspace["project"].id
+    _, statements = count_statements(lambda: project_detail(db, workspace, include_users=False))
+
+    assert statements < 10
+
+
+def test_developer_sees_projects_with_assigned_tasks(db, workspace):
+    projects = list_projects(db, workspace["dev"])
+
+    assert [project.name for project in projects] == ["Apollo"]
+    assert projects[0].total_tasks == 4
+
+
+def test_project_list_cost_does_not_grow_with_page_size(db, workspace):
+    admin = workspace["admin"]
+    admin.role  # load the expired user before counting
+    _, few = count_statements(lambda: list_projects(db, admin))
+
+    for index in range(20):
+        project, _, milestone = add_project(db, admin, f"Bulk {index}")
+        sprint = Sprint(name="Sprint", milestone_id=milestone.id, project_id=project.id, estimated_hours=10)
+        db.add(sprint)
+        db.flush()
+        db.add(Task(title="Task", project_id=project.id, sprint_id=sprint.id, created_by_id=admin.id))
+    db.commit()
+    admin.role
+    projects, many = count_statements(lambda: list_projects(db, admin))
+
+    assert len(projects) == 22
+    assert many == few
+
+
+def test_closed_projects_are_filtered(db, workspace):
+    workspace["empty"].status = ProjectStatus.ARCHIVED
+    db.commit()
+
+    assert [project.name for project in list_projects(db, workspace["admin"])] == ["Apollo"]
+
+
+def test_project_user_stats(db, workspace):
+    response = get_project_users(project_id=workspace["project"].id, db=db, current_user=workspace["admin"])
+
+    stats = {user["username"]: user for user in response["users_stats"]}
+    assert (stats["dev"]["tasks_total"], stats["dev"]["tasks_completed"], stats["dev"]["tasks_in_progress"]) == (2, 1, 1)
+    assert (stats["dev"]["total_story_points"], stats["dev"]["total_hours"]) == (8, 4.5)
+    assert (stats["admin"]["tasks_total"], stats["admin"]["total_hours"], stats["admin"]["full_name"]) == (1, 2.0, "Ada Admin")
+    assert (response["total_project_hours"], response["total_project_story_points"]) == (6.5, 10)
+    assert project_detail(db, workspace).users_summary.active_users_count == 2
+
+
+def test_project_user_stats_cost_does_not_grow_with_users(db, workspace):
+    admin, project = workspace["admin"], workspace["project"]
+    project_id = project.id
+    admin.role
+    _, few = count_statements(lambda: get_project_users(project_id=project_id, db=db, current_user=admin))
+
+    for index in range(20):
+        user = User(username=f"user{index}", email=f"user{index}@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        task = Task(title="Task", project_id=project_id, created_by_id=admin.id, assignee_id=user.id,
+                    status=TaskStatus.REVIEW, story_points=1)
+        db.add(task)
+        db.flush()
+        db.add(TimeLog(task_id=task.id, user_id=user.id, hours=1, date=datetime.now()))
+    db.commit()
+    admin.role
+    response, many = count_statements(lambda: get_project_users(project_id=project_id, db=db, current_user=admin))
+
+    assert response["active_users_count"] == 22
+    assert many == few
+
+
+def project_hierarchy(db, workspace, depth=4, fields=None):
+    return get_project_hierarchy(project_id=workspace["project"].id, depth=depth, fields=fields,
+                                 db=db, current_user=workspace["admin"])
+
+
+def test_project_hierarchy_rollups(db, workspace):
+    tree = project_hierarchy(db, workspace)
+
+    assert (tree["estimated_hours"], tree["actual_hours"], tree["completion_percentage"]) == (100, 6.5, 20.0)
+    phase = tree["phases"][0]
+    assert (phase["estimated_hours"], phase["actual_hours"], phase["completion_percentage"]) == (60, 6.5, 33.33)
+    milestone = phase["milestones"][0]
+    assert (milestone["actual_hours"], milestone["completion_percentage"]) == (6.5, 40.0)
+    weighted, unweighted = milestone["sprints"]
+    assert (weighted["name"], weighted["actual_hours"], weighted["completion_percentage"]) == ("Weighted", 4.5, 50.0)
+    assert (unweighted["actual_hours"], unweighted["completion_percentage"]) == (2.0, 100.0)
+    assert [(task["name"], task["status"], task["actual_hours"]) for task in weighted["tasks"]] == [
+        ("Done", "done", 3.0), ("Doing", "in_progress", 1.5)
+    ]
+
+
+def test_project_hierarchy_counts_unsprinted_tasks(db, workspace):
+    loose = workspace["tasks"][3]
+    loose.estimated_hours = 4
+    db.add(TimeLog(task_id=loose.id, user_id=workspace["admin"].id, hours=2.5, date=datetime.now()))
+    db.commit()
+    spent_hours = db.get(ProjectStats, workspace["project"].id).spent_hours
+
+    for depth in (4, 3):
+        tree = project_hierarchy(db, workspace, depth=depth)
+        assert tree["actual_hours"] == spent_hours == 9.0
+        assert tree["completion_percentage"] == 20.0
+        assert tree["phases"][0]["actual_hours"] == 6.5
+        unscheduled = tree["unscheduled"]
+        assert (unscheduled["estimated_hours"], unscheduled["actual_hours"], unscheduled["completion_percentage"]) == (
+            4, 2.5, 0.0
+        )
+    assert "tasks" not in unscheduled
+    assert [(task["name"], task["actual_hours"])
+            for task in project_hierarchy(db, workspace)["unscheduled"]["tasks"]] == [("Loose", 2.5)]
+    assert "unscheduled" not in project_hierarchy(db, workspace, depth=0)
+
+
+def test_project_hierarchy_depth_and_fields(db, workspace):
+    tree = project_hierarchy(db, workspace, depth=2, fields="status, due_date")
+
+    milestone = tree["phases"][0]["milestones"][0]
+    assert "sprints" not in milestone and "description" not in milestone
+    assert set(milestone) == {"id", "name", "due_date", "estimated_hours", "actual_hours", "completion_percentage"}
+    assert milestone["completion_percentage"] == 40.0
+    assert "phases" not in project_hierarchy(db, workspace, depth=0)
+
+    sprint = project_hierarchy(db, workspace, fields="status")["phases"][0]["milestones"][0]["sprints"][0]
+    assert sprint["status"] == "active" and "start_date" not in sprint
+    assert set(sprint["tasks"][0]) == {"id", "name", "status", "estimated_hours", "actual_hours", "completion_percentage"}
+
+    with pytest.raises(HTTPException) as error:
+        project_hierarchy(db, workspace, fields="status,secret")
+    assert error.value.status_code == 400
+
+
+def test_project_hierarchy_loads_one_query_per_level(db, workspace):
+    workspace["admin"].role
+    project_id = workspace["project"].id
+    milestone_id = workspace["milestone"].id
+    for index in range(5):
+        sprint = Sprint(name=f"Extra {index}", milestone_id=milestone_id, project_id=project_id, estimated_hours=8)
+        db.add(sprint)
+        db.flush()
+        db.add(Task(title="Task", project_id=project_id, sprint_id=sprint.id, created_by_id=workspace["admin"].id))
+    db.commit()
+    workspace["admin"].role
+    workspace["project"].id
+
+    for depth in (4, 3):
+        tree, statements = count_statements(lambda: project_hierarchy(db, workspace, depth=depth))
+        # project, phases, milestones, sprints, tasks (or per-sprint task totals)
+        assert statements == 5
+        assert len(tree["phases"][0]["milestones"][0]["sprints"]) == 7
@@ -0,0 +1,173 @@
+"""
+Tests for rank-based kanban and backlog ordering
+"""
+
+import random
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.core.ranking import rank_between, spaced_ranks, rebalance_ranks
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.backlog import Backlog
+from app.schemas.task import TaskMove
+from app.schemas.backlog import BacklogMove
+from app.api.v1.endpoints.tasks import move_task
+from app.api.v1.endpoints.backlogs import move_backlog
+from app.api.v1.endpoints.dashboard import get_kanban_board, get_kanban_column
+from conftest import engine
+
+
+@pytest.fixture
+def board(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Ranked", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    tasks = [Task(title=f"Task {i}", project_id=project.id, created_by_id=admin.id) for i in range(4)]
+    db.add_all(tasks)
+    db.commit()
+    return {"admin": admin, "project": project, "tasks": tasks}
+
+
+def column_titles(db, board, status="todo"):
+    data = get_kanban_board(project_id=board["project"].id, limit=50, db=db, current_user=board["admin"])
+    return [card["title"] for card in data["columns"][status]["cards"]]
+
+
+def test_rank_between_orders_strictly():
+    generator = random.Random(7)
+    ranks = [rank_between(None, None)]
+    for _ in range(500):
+        index = generator.randint(0, len(ranks))
+        before = ranks[index - 1] if index > 0 else None
+        after = ranks[index] if index < len(ranks) else None
+        rank = rank_between(before, after)
+        assert (before is None or before < rank) and (after is None or rank < after)
+        assert not rank.endswith("0")
+        ranks.insert(index, rank)
+    assert ranks == sorted(ranks)
+
+    spaced = spaced_ranks(1000)
+    assert spaced == sorted(spaced) and len(set(spaced)) == 1000
+    assert max(len(rank) for rank in spaced) == 2
+    with pytest.raises(ValueError):
+        rank_between("b", "b")
+
+
+def test_new_tasks_append_to_their_column(db, board):
+    assert column_titles(db, board) == ["Task 0", "Task 1", "Task 2", "Task 3"]
+
+
+def test_move_updates_only_the_moved_row(db, board):
+    tasks, admin = board["tasks"], board["admin"]
+    task_id, anchor_id = tasks[3].id, tasks[0].id
+    admin.role  # load the expired user before counting
+    updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE tasks"):
+            updates.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        moved = move_task(task_id=task_id, move=TaskMove(after_id=anchor_id), db=db, current_user=admin)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(updates) == 1
+    assert moved.rank is not None
+    assert column_titles(db, board) == ["Task 0", "Task 3", "Task 1", "Task 2"]
+
+
+def test_move_to_another_column(db, board):
+    tasks, admin = board["tasks"], board["admin"]
+    move_task(task_id=tasks[1].id, move=TaskMove(status=TaskStatus.IN_PROGRESS), db=db, current_user=admin)
+    move_task(task_id=tasks[2].id, move=TaskMove(status=TaskStatus.IN_PROGRESS, before_id=tasks[1].id),
+              db=db, current_user=admin)
+
+    assert column_titles(db, board, "in_progress") == ["Task 2", "Task 1"]
+    assert column_titles(db, board) == ["Task 0", "Task 3"]
+
+    with pytest.raises(HTTPException) as exc:
+        move_task(task_id=tasks[0].id, move=TaskMove(after_id=tasks[1].id), db=db, current_user=admin)
+    assert exc.value.status_code == 400
+
+
+def test_move_to_another_column_moves_subtasks(db, board):
+    parent, admin = board["tasks"][0], board["admin"]
+    subtasks = [Task(title=f"Subtask {i}", project_id=board["project"].id, created_by_id=admin.id,
+                     parent_task_id=parent.id, is_subtask=True) for i in range(2)]
+    db.add_all(subtasks)
+    db.commit()
+
+    move_task(task_id=parent.id, move=TaskMove(status=TaskStatus.REVIEW), db=db, current_user=admin)
+
+    db.expire_all()
+    assert [subtask.status for subtask in subtasks] == [TaskStatus.REVIEW, TaskStatus.REVIEW]
+    assert all(subtask.rank > parent.rank for subtask in subtasks)
+
+
+def test_status_change_appends_to_new_column(db, board):
+    tasks = board["tasks"]
+    tasks[0].status = TaskStatus.DONE
+    tasks[2].status = TaskStatus.DONE
+    db.commit()
+
+    assert column_titles(db, board, "done") == ["Task 0", "Task 2"]
+
+
+def test_column_pages_follow_board_order_with_unranked_cards(db, board):
+    tasks = board["tasks"]
+    db.query(Task).filter(Task.id.in_([tasks[1].id, tasks[3].id])).update({"rank": None})
+    db.commit()
+
+    titles, cursor = [], None
+    while True:
+        page = get_kanban_column(project_id=board["project"].id, status=TaskStatus.TODO, cursor=cursor, limit=1,
+                                 db=db, current_user=board["admin"])
+        titles += [card["title"] for card in page["cards"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == column_titles(db, board) == ["Task 1", "Task 3", "Task 0", "Task 2"]
+
+
+def test_backlog_move(db, board):
+    project, admin = board["project"], board["admin"]
+    items = [Backlog(title=f"Item {i}", project_id=project.id) for i in range(3)]
+    db.add_all(items)
+    db.commit()
+
+    move_backlog(backlog_id=items[2].id, move=BacklogMove(before_id=items[0].id), db=db, current_user=admin)
+
+    ordered = db.query(Backlog).order_by(Backlog.rank).all()
+    assert [item.title for item in ordered] == ["Item 2", "Item 0", "Item 1"]
+
+
+def test_rebalance_shortens_long_and_fills_missing_ranks(db, board):
+    tasks, admin = board["tasks"], board["admin"]
+    # Repeatedly dropping into the same gap grows the rank
+    for _ in range(30):
+        move_task(task_id=tasks[3].id, move=TaskMove(before_id=tasks[1].id), db=db, current_user=admin)
+        move_task(task_id=tasks[2].id, move=TaskMove(before_id=tasks[3].id), db=db, current_user=admin)
+    order = column_titles(db, board)
+    db.query(Task).filter(Task.id == tasks[1].id).update({"rank": None})
+    db.commit()
+    # Unranked cards sort first, and rebalancing keeps the order on screen
+    unranked_first = ["Task 1"] + [title for title in order if title != "Task 1"]
+    assert column_titles(db, board) == unranked_first
+
+    assert rebalance_ranks(db, max_length=8) == 1
+
+    ranks = [rank for (rank,) in db.query(Task.rank).order_by(Task.rank).all()]
+    assert all(rank is not None and len(rank) == 1 for rank in ranks)
+    assert column_titles(db, board) == unranked_first
+    assert rebalance_ranks(db, max_length=8) == 0
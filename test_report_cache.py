@@ -0,0 +1,103 @@
+"""
+Tests for the report result cache
+"""
+
+import threading
+from datetime import datetime
+
+
+from app.core.report_cache import ReportCache, TableVersions, report_cache_key, table_versions
+from app.models.enums import UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.api.v1.endpoints.reports import get_time_report
+
+
+def test_key_ignores_filter_order_and_missing_values():
+    first = report_cache_key("r", {"a": 1, "b": None, "c": [3, 2]}, [2, 1])
+    second = report_cache_key("r", {"c": (2, 3), "a": 1}, [1, 2, 2])
+
+    assert first == second
+    assert first != report_cache_key("r", {"a": 1, "c": [2, 3]}, [1])
+
+
+def test_entry_is_invalidated_by_version_bump():
+    versions = TableVersions()
+    cache = ReportCache(versions=versions)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute(("k",), ["tasks"], compute) == 1
+    assert cache.get_or_compute(("k",), ["tasks"], compute) == 1
+    versions.bump(["sprints"])
+    assert cache.get_or_compute(("k",), ["tasks"], compute) == 1
+    versions.bump(["tasks"])
+    assert cache.get_or_compute(("k",), ["tasks"], compute) == 2
+
+
+def test_stale_value_is_served_while_one_caller_recomputes():
+    versions = TableVersions()
+    cache = ReportCache(versions=versions)
+    cache.get_or_compute(("k",), ["tasks"], lambda: "old")
+    versions.bump(["tasks"])
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_compute():
+        started.set()
+        release.wait(5)
+        return "new"
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(cache.get_or_compute(("k",), ["tasks"], slow_compute)))
+    worker.start()
+    started.wait(5)
+
+    assert cache.get_or_compute(("k",), ["tasks"], lambda: "unexpected") == "old"
+    release.set()
+    worker.join(5)
+    assert results == ["new"]
+    assert cache.get_or_compute(("k",), ["tasks"], lambda: "unexpected") == "new"
+
+
+def test_committed_writes_invalidate_cached_report(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x",
+                 first_name="Ada", last_name="Admin", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Cached", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="T", project_id=project.id, created_by_id=admin.id)
+    db.add(task)
+    db.flush()
+    db.add(TimeLog(task_id=task.id, user_id=admin.id, hours=1.0, date=datetime.now()))
+    db.commit()
+
+    params = dict(project_id=None, user_id=None, team_id=None, start_date=None, end_date=None,
+                  include_details=False, details_limit=100)
+    first = get_time_report(db=db, current_user=admin, **params)
+    assert get_time_report(db=db, current_user=admin, **params) is first
+
+    db.add(TimeLog(task_id=task.id, user_id=admin.id, hours=2.0, date=datetime.now()))
+    db.rollback()
+    assert get_time_report(db=db, current_user=admin, **params) is first
+
+    db.add(TimeLog(task_id=task.id, user_id=admin.id, hours=2.0, date=datetime.now()))
+    db.commit()
+    refreshed = get_time_report(db=db, current_user=admin, **params)
+    assert refreshed.summary["total_hours"] == 3.0
+
+
+def test_bulk_updates_bump_versions(db):
+    before = table_versions.snapshot(["tasks"])
+    db.query(Task).filter(Task.id == 0).update({"title": "x"}, synchronize_session=False)
+    db.commit()
+
+    assert table_versions.snapshot(["tasks"]) != before
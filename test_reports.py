@@ -0,0 +1,221 @@
+"""
+Tests for the aggregated report endpoints
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models.enums import UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.models.phase import Phase
+from app.models.milestone import Milestone
+from app.models.sprint import Sprint
+from app.models.enums import TaskStatus
+from app.models.team import Team
+from app.api.v1.endpoints.reports import get_time_report, get_story_points_report, get_team_report
+from conftest import engine
+
+
+@pytest.fixture
+def time_data(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x",
+                 first_name="Ada", last_name="Admin", role=UserRole.ADMIN)
+    dev = User(username="dev", email="dev@example.com", password_hash="x",
+               first_name="Dev", last_name="Eloper", role=UserRole.DEVELOPER)
+    db.add_all([admin, dev])
+    db.flush()
+    alpha = Project(name="Alpha", created_by_id=admin.id)
+    beta = Project(name="Beta", created_by_id=admin.id)
+    db.add_all([alpha, beta])
+    db.flush()
+    task_a = Task(title="A1", project_id=alpha.id, created_by_id=admin.id)
+    task_b = Task(title="B1", project_id=beta.id, created_by_id=admin.id)
+    db.add_all([task_a, task_b])
+    db.flush()
+    now = datetime.now()
+    db.add_all([
+        TimeLog(task_id=task_a.id, user_id=dev.id, hours=1.5, date=now, description="Manual entry"),
+        TimeLog(task_id=task_a.id, user_id=admin.id, hours=0.5, date=now - timedelta(days=1),
+                description="Live timer session: 30 minutes"),
+        TimeLog(task_id=task_b.id, user_id=dev.id, hours=2.0, date=now - timedelta(days=30)),
+    ])
+    db.commit()
+    return admin, dev, alpha, beta
+
+
+def time_report(db, user, **overrides):
+    params = dict(project_id=None, user_id=None, team_id=None, start_date=None, end_date=None,
+                  include_details=True, details_limit=100)
+    params.update(overrides)
+    return get_time_report(db=db, current_user=user, **params)
+
+
+def test_time_report_totals_are_grouped(db, time_data):
+    admin, dev, alpha, beta = time_data
+    report = time_report(db, admin)
+
+    assert report.summary["total_hours"] == 4.0
+    assert report.summary["total_minutes"] == 240
+    assert report.summary["entries_count"] == 3
+    projects = {stats.project_name: stats for stats in report.project_stats}
+    assert projects["Alpha"].total_minutes == 120
+    assert projects["Alpha"].user_count == 2
+    assert projects["Beta"].task_count == 1
+    users = {stats.user_id: stats for stats in report.user_stats}
+    assert users[dev.id].total_hours == 3.5
+    assert users[dev.id].project_count == 2
+    assert sum(day.minutes for day in report.weekly_trend) == 120
+
+
+def test_time_report_details_are_latest_first_and_limited(db, time_data):
+    admin, dev, alpha, beta = time_data
+    report = time_report(db, admin, details_limit=2)
+
+    assert [log.task_title for log in report.detailed_logs] == ["A1", "A1"]
+    assert report.detailed_logs[0].log_type == "Manual"
+    assert report.detailed_logs[1].log_type == "Timer"
+
+
+def test_time_report_applies_filters(db, time_data):
+    admin, dev, alpha, beta = time_data
+    start = (datetime.now() - timedelta(days=7)).date()
+    report = time_report(db, admin, user_id=dev.id, start_date=start)
+
+    assert report.summary["total_hours"] == 1.5
+    assert [stats.project_name for stats in report.project_stats] == ["Alpha"]
+
+
+def seed_members(db, users):
+    admin = User(username="admin", email="admin@example.com", password_hash="x",
+                 first_name="Ada", last_name="Admin", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    members = []
+    for i in range(users):
+        # Identical display names must not be merged
+        member = User(username=f"dev{i}", email=f"dev{i}@example.com", password_hash="x",
+                      first_name="Sam", last_name="Same", role=UserRole.DEVELOPER)
+        db.add(member)
+        members.append(member)
+    db.commit()
+    return admin, members
+
+
+def seed_sprint_work(db, admin, members, name):
+    project = Project(name=name, created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    phase = Phase(name="Phase", project_id=project.id)
+    db.add(phase)
+    db.flush()
+    milestone = Milestone(name="Milestone", phase_id=phase.id, project_id=project.id)
+    db.add(milestone)
+    db.flush()
+    sprint = Sprint(name="Sprint", milestone_id=milestone.id, project_id=project.id)
+    db.add(sprint)
+    db.flush()
+    for i, member in enumerate(members):
+        # Completion records are written by the task status hook
+        db.add(Task(title=f"Done {name}-{i}", project_id=project.id, sprint_id=sprint.id, created_by_id=admin.id,
+                    assignee_id=member.id, story_points=3, status=TaskStatus.DONE))
+        db.add(Task(title=f"Open {name}-{i}", project_id=project.id, created_by_id=admin.id,
+                    assignee_id=member.id, story_points=5, status=TaskStatus.TODO))
+    db.commit()
+    return project
+
+
+def story_points_report(db, user, **overrides):
+    params = dict(project_id=None, user_id=None, team_id=None, start_date=None, end_date=None)
+    params.update(overrides)
+    return get_story_points_report(db=db, current_user=user, **params)
+
+
+def count_statements(func):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_story_points_report_is_keyed_by_id(db):
+    admin, members = seed_members(db, users=3)
+    seed_sprint_work(db, admin, members, "Alpha")
+    seed_sprint_work(db, admin, members, "Beta")
+    report = story_points_report(db, admin)
+
+    assert len(report.user_performance) == 3
+    for performance in report.user_performance:
+        assert performance.planned_points == 16
+        assert performance.completed_points == 6
+        assert performance.active_tasks == 2
+        assert performance.completed_tasks == 2
+    project = report.project_stats[0]
+    assert project.total_points_planned == 24
+    assert project.total_points_completed == 9
+    assert project.completion_rate == 37.5
+    assert report.summary["total_story_points_completed"] == 18
+    assert len(report.detailed_completions) == 6
+
+
+def test_story_points_report_statement_count_is_fixed(db):
+    admin, members = seed_members(db, users=10)
+    seed_sprint_work(db, admin, members[:2], "Small")
+    small_report, small = count_statements(lambda: story_points_report(db, admin))
+
+    for p in range(5):
+        seed_sprint_work(db, admin, members, f"Extra {p}")
+    large_report, large = count_statements(lambda: story_points_report(db, admin))
+
+    assert len(large_report.project_stats) > len(small_report.project_stats)
+    assert large == small
+
+
+def team_report(db, user, **overrides):
+    params = dict(team_id=None, project_id=None, start_date=None, end_date=None)
+    params.update(overrides)
+    return get_team_report(db=db, current_user=user, **params)
+
+
+def test_team_report_aggregates_per_team(db):
+    admin, members = seed_members(db, users=4)
+    project = seed_sprint_work(db, admin, members[:2], "Alpha")
+    leader = User(username="lead", email="lead@example.com", password_hash="x",
+                  first_name="Lee", last_name="Der", role=UserRole.TEAM_LEADER)
+    db.add(leader)
+    db.flush()
+    first = Team(name="First", team_leader_id=leader.id, members=members[:2], projects=[project])
+    second = Team(name="Second", team_leader_id=leader.id, members=members[2:])
+    db.add_all([first, second])
+    db.flush()
+    task = db.query(Task).filter(Task.assignee_id == members[0].id).first()
+    db.add(TimeLog(task_id=task.id, user_id=members[0].id, hours=2.5, date=datetime.now()))
+    db.commit()
+
+    report, statements = count_statements(lambda: team_report(db, leader))
+    teams = {team.team_name: team for team in report.team_productivity}
+
+    assert teams["First"].member_count == 2
+    assert teams["First"].total_hours == 2.5
+    assert teams["First"].total_story_points == 6
+    assert teams["First"].avg_completion_rate == 50.0
+    assert teams["First"].projects_count == 1
+    assert teams["Second"].total_hours == 0
+    assert report.summary == {"teams_count": 2, "total_members": 4, "total_projects": 1}
+
+    for i in range(5):
+        db.add(Team(name=f"More {i}", team_leader_id=leader.id, members=members))
+    db.commit()
+    _, more_statements = count_statements(lambda: team_report(db, leader))
+    assert more_statements == statements
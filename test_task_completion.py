@@ -0,0 +1,74 @@
+"""
+Tests for automatic CompletedStoryPoints records on task completion
+"""
+
+import pytest
+
+from app.core.task_events import backfill_completed_story_points
+from app.models.enums import TaskStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.completed_sp import CompletedStoryPoints
+from app.schemas.task import TaskStatusUpdate
+from app.api.v1.endpoints.tasks import update_task_status
+
+
+@pytest.fixture
+def task(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    dev = User(username="dev", email="dev@example.com", password_hash="x")
+    db.add_all([admin, dev])
+    db.flush()
+    project = Project(name="Points", created_by_id=admin.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="Ship it", project_id=project.id, created_by_id=admin.id,
+                assignee_id=dev.id, story_points=5)
+    db.add(task)
+    db.commit()
+    return task
+
+
+def test_completion_is_recorded_and_retracted(db, task):
+    task.status = TaskStatus.DONE
+    db.commit()
+
+    record = db.query(CompletedStoryPoints).one()
+    assert (record.task_id, record.project_id, record.user_id, record.story_points) == \
+        (task.id, task.project_id, task.assignee_id, 5)
+
+    # Saving again without a status change does not duplicate the record
+    task.title = "Shipped"
+    db.commit()
+    assert db.query(CompletedStoryPoints).count() == 1
+
+    task.status = TaskStatus.IN_PROGRESS
+    db.commit()
+    assert db.query(CompletedStoryPoints).count() == 0
+
+
+def test_status_endpoint_records_subtask_completions(db, task):
+    subtask = Task(title="Sub", project_id=task.project_id, created_by_id=task.created_by_id,
+                   parent_task_id=task.id, is_subtask=True, story_points=2)
+    db.add(subtask)
+    db.commit()
+    admin = db.query(User).filter(User.username == "admin").one()
+
+    update_task_status(task_id=task.id, status_update=TaskStatusUpdate(status=TaskStatus.DONE),
+                       db=db, current_user=admin)
+
+    points = {record.task_id: record.story_points for record in db.query(CompletedStoryPoints).all()}
+    assert points == {task.id: 5, subtask.id: 2}
+
+
+def test_tasks_created_done_are_recorded_and_backfill_skips_them(db, task):
+    done = Task(title="Already done", project_id=task.project_id, created_by_id=task.created_by_id,
+                story_points=3, status=TaskStatus.DONE)
+    db.add(done)
+    db.commit()
+
+    record = db.query(CompletedStoryPoints).one()
+    assert record.task_id == done.id
+    assert record.user_id == done.created_by_id
+    assert backfill_completed_story_points(db) == 0
@@ -0,0 +1,80 @@
+"""
+Tests for the stale timer sweeper and inactive timer purge
+"""
+
+from datetime import datetime, timedelta, time, date
+
+import pytest
+
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.models.active_timer import ActiveTimer
+from app.models.working_hours import WorkingHours
+from app.core.timer_sweeper import sweep_stale_timers, purge_inactive_timers
+
+
+def create_task(db):
+    user = User(username="timer", email="timer@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    project = Project(name="Timers", created_by_id=user.id)
+    db.add(project)
+    db.flush()
+    task = Task(title="Tracked", project_id=project.id, created_by_id=user.id, assignee_id=user.id)
+    db.add(task)
+    db.commit()
+    return user, task
+
+
+def test_sweeper_caps_timer_at_max_duration(db):
+    user, task = create_task(db)
+    now = datetime(2025, 1, 10, 12, 0, 0)
+    stale = ActiveTimer(task_id=task.id, user_id=user.id, start_time=now - timedelta(hours=30), is_active=True)
+    fresh = ActiveTimer(task_id=task.id, user_id=user.id, start_time=now - timedelta(hours=1), is_active=True)
+    db.add_all([stale, fresh])
+    db.commit()
+
+    stopped = sweep_stale_timers(db, now=now, max_duration_hours=8)
+
+    assert stopped == [stale.id]
+    db.refresh(stale)
+    db.refresh(fresh)
+    assert stale.is_active is False
+    assert fresh.is_active is True
+    time_log = db.query(TimeLog).one()
+    assert time_log.hours == pytest.approx(8.0)
+    db.refresh(task)
+    assert task.actual_hours == pytest.approx(8.0)
+
+
+def test_sweeper_caps_timer_at_end_of_working_day(db):
+    user, task = create_task(db)
+    db.add(WorkingHours(
+        user_id=user.id, start_time=time(9, 0), end_time=time(17, 0),
+        timezone="UTC", set_by_id=user.id, effective_from=date(2025, 1, 1)
+    ))
+    timer = ActiveTimer(task_id=task.id, user_id=user.id, start_time=datetime(2025, 1, 10, 15, 0), is_active=True)
+    db.add(timer)
+    db.commit()
+
+    stopped = sweep_stale_timers(db, now=datetime(2025, 1, 10, 20, 0), max_duration_hours=12)
+
+    assert stopped == [timer.id]
+    assert db.query(TimeLog).one().hours == pytest.approx(2.0)
+
+
+def test_purge_removes_old_inactive_timers_in_batches(db):
+    user, task = create_task(db)
+    old = datetime(2025, 1, 1)
+    for _ in range(5):
+        db.add(ActiveTimer(task_id=task.id, user_id=user.id, start_time=old, is_active=False,
+                           created_at=old, updated_at=old))
+    db.add(ActiveTimer(task_id=task.id, user_id=user.id, start_time=old, is_active=True, created_at=old))
+    db.commit()
+
+    purged = purge_inactive_timers(db, now=datetime(2025, 2, 1), retention_days=7, batch_size=2)
+
+    assert purged == 5
+    assert db.query(ActiveTimer).count() == 1
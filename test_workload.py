@@ -0,0 +1,118 @@
+"""
+Tests for calendar-aware workload analysis
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import event
+
+from app.core.capacity import user_capacities
+from app.core.report_cache import report_cache
+from app.models.enums import TaskStatus, TimeOffStatus, UserRole
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.models.time_log import TimeLog
+from app.models.working_hours import WorkingHours, Holiday, TimeOff
+from app.api.v1.endpoints.advanced_reports import get_workload_analysis
+from conftest import engine
+
+
+def add_users(db, count, offset=0):
+    users = [
+        User(username=f"user{offset + i}", email=f"user{offset + i}@example.com", password_hash="x",
+             first_name="User", last_name=str(offset + i), role=UserRole.DEVELOPER)
+        for i in range(count)
+    ]
+    db.add_all(users)
+    db.flush()
+    return users
+
+
+def count_statements(func):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_capacity_uses_schedule_holidays_and_time_off(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(admin)
+    scheduled, default = add_users(db, 2)
+    # Monday to Friday, six hours a day
+    db.add(WorkingHours(
+        user_id=scheduled.id, set_by_id=admin.id, start_time=time(9), end_time=time(15), work_hours_per_day=6,
+        thursday_enabled=True, friday_enabled=True, saturday_enabled=False, sunday_enabled=False,
+        effective_from=date(2025, 1, 1)
+    ))
+    db.add_all([
+        Holiday(name="Holiday", date=date(2025, 6, 3), created_by_id=admin.id),
+        Holiday(name="Yearly", date=date(2020, 6, 7), is_recurring=True, created_by_id=admin.id),
+        TimeOff(user_id=scheduled.id, start_date=date(2025, 6, 4), end_date=date(2025, 6, 4),
+                status=TimeOffStatus.APPROVED),
+        TimeOff(user_id=scheduled.id, start_date=date(2025, 6, 5), end_date=date(2025, 6, 6),
+                status=TimeOffStatus.PENDING),
+    ])
+    db.commit()
+
+    # Monday 2 June to Sunday 8 June 2025
+    capacities = user_capacities(db, [scheduled.id, default.id], date(2025, 6, 2), date(2025, 6, 8))
+
+    assert capacities[scheduled.id].as_dict() == {
+        "working_days": 3, "capacity_hours": 18, "holiday_days": 1, "time_off_days": 1
+    }
+    # Default week is Saturday to Wednesday; Tuesday and Saturday are holidays
+    assert capacities[default.id].as_dict() == {
+        "working_days": 3, "capacity_hours": 24, "holiday_days": 2, "time_off_days": 0
+    }
+
+
+def test_workload_analysis_uses_capacity_and_constant_queries(db):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(admin)
+    db.flush()
+    project = Project(name="Load", created_by_id=admin.id)
+    db.add(project)
+    busy, idle = add_users(db, 2)
+    db.flush()
+    task = Task(title="Work", project_id=project.id, created_by_id=admin.id, assignee_id=busy.id,
+                status=TaskStatus.IN_PROGRESS, story_points=5)
+    db.add_all([task, Task(title="Done", project_id=project.id, created_by_id=admin.id, assignee_id=busy.id,
+                           status=TaskStatus.DONE, story_points=8)])
+    db.flush()
+    now = datetime.now()
+    db.add_all([
+        TimeLog(task_id=task.id, user_id=busy.id, hours=8, date=now - timedelta(days=day, minutes=1))
+        for day in range(7)
+    ])
+    db.commit()
+
+    result, statements = count_statements(
+        lambda: get_workload_analysis(period_days=7, team_id=None, db=db, current_user=admin)
+    )
+    rows = {row["user_id"]: row for row in result["workload_analysis"]}
+
+    assert rows[busy.id]["total_hours"] == 56
+    assert rows[busy.id]["active_tasks"] == 1
+    assert rows[busy.id]["active_story_points"] == 5
+    assert rows[busy.id]["workload_level"] == "Overloaded"
+    assert rows[busy.id]["capacity_hours"] == rows[busy.id]["working_days"] * 8
+    assert rows[idle.id]["total_hours"] == 0
+    assert rows[idle.id]["workload_level"] == "Low"
+
+    add_users(db, 5, offset=10)
+    db.commit()
+    report_cache.clear()
+    result, more_statements = count_statements(
+        lambda: get_workload_analysis(period_days=7, team_id=None, db=db, current_user=admin)
+    )
+    assert len(result["workload_analysis"]) == 8
+    assert more_statements == statements